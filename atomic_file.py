@@ -0,0 +1,26 @@
+"""
+This module contains atomic_write, which the modules saving state to files (caches,
+matrices, checkpoints and snapshots) use so that a reader never sees a partial file.
+"""
+import os
+from contextlib import contextmanager
+
+@contextmanager
+def atomic_write(filename: str, mode: str = 'w'):
+    """
+    Opens a temporary file next to filename for writing in the given mode, and
+    replaces filename with it once the block exits. If anything fails, the temporary
+    file is removed, filename is left as it was and the error is raised.
+    """
+    temp_name = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(temp_name, mode) as file:
+            yield file
+        os.replace(temp_name, filename)
+    except BaseException:
+        # Leave no partial file behind, and raise the error that stopped the write
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,381 @@
+"""
+This module contains BatchBattle, an engine that fights many independent battles at once
+over columnar team buffers (see TeamColumns), following the rules of Battle exactly.
+"""
+from array import array
+from battle import Battle
+from battle_mode import BattleMode
+from poke_team import Trainer
+from pokemon_base import Pokemon, PokeType, SpeciesRegistry, TypeEffectiveness
+from team_columns import TeamColumns
+
+try:
+    import numpy as np
+except ImportError: # Without NumPy the battles are fought one by one with Battle
+    np = None
+
+# Drawn battles are reported with this winner code, the others with 1 or 2
+DRAW = 0
+
+class BatchBattle:
+    """
+    Fights battle i between team i of teams_1 and team i of teams_2, for every i at once.
+
+    The rows of every team must be in the order of the structure the battle mode uses,
+    as PokeTeam.assemble_team leaves them: stack bottom to top for SET, queue front to
+    rear for ROTATE and ascending criterion for OPTIMISE. The columns are updated in
+    place, every Pokemon ending in the state it ends its battle in, and so are the
+    pokedexes (as BSet bit masks, one per battle and side).
+
+    With NumPy, every round of all the unfinished battles is computed with array
+    operations over the columns; without it, each battle is fought with Battle.
+    """
+
+    def __init__(self, teams_1: TeamColumns, teams_2: TeamColumns, battle_mode: BattleMode,
+                 criterion: str = "health", pokedex_1=None, pokedex_2=None) -> None:
+        """
+        Parameters:
+            teams_1, teams_2 (TeamColumns): The teams of each side, with as many teams each.
+            battle_mode (BattleMode): The battle mode of every battle.
+            criterion (str): The criterion of OPTIMISE battles, one of PokeTeam.CRITERION_LIST.
+            pokedex_1, pokedex_2: The starting pokedex of each side in each battle, as
+                BSet bit masks (BSet.elems); empty if None.
+
+        Raises:
+            ValueError: If the sides do not have as many teams.
+        """
+        if teams_1.team_count() != teams_2.team_count():
+            raise ValueError("Both sides must have the same number of teams.")
+        if battle_mode not in BattleMode:
+            raise ValueError("Invalid battle mode.")
+        self.teams_1 = teams_1
+        self.teams_2 = teams_2
+        self.battle_mode = battle_mode
+        self.criterion = criterion
+        count = teams_1.team_count()
+        self.pokedex_1 = list(pokedex_1) if pokedex_1 is not None else [0] * count
+        self.pokedex_2 = list(pokedex_2) if pokedex_2 is not None else [0] * count
+        self.trainer_pairs = None
+        self.results = None
+
+    @classmethod
+    def from_trainers(cls, trainer_pairs, battle_mode: BattleMode, criterion: str = "health") -> 'BatchBattle':
+        """
+        Prepares one battle per (trainer_1, trainer_2) pair. The trainers' teams are
+        assembled as Battle._create_teams would, but the trainers' Pokemon and pokedexes
+        are left untouched by the battles; see winners.
+
+        Time Complexity: O(n log n), where n is the total number of Pokemon
+        """
+        teams_1 = TeamColumns()
+        teams_2 = TeamColumns()
+        pokedex_1 = []
+        pokedex_2 = []
+        for trainer_1, trainer_2 in trainer_pairs:
+            Battle(trainer_1, trainer_2, battle_mode, criterion)._create_teams()
+            teams_1.add_team(trainer_1.get_team())
+            teams_2.add_team(trainer_2.get_team())
+            pokedex_1.append(trainer_1.pokedex.elems)
+            pokedex_2.append(trainer_2.pokedex.elems)
+        batch = cls(teams_1, teams_2, battle_mode, criterion, pokedex_1, pokedex_2)
+        batch.trainer_pairs = list(trainer_pairs)
+        return batch
+
+    def run(self):
+        """
+        Fights every battle to the end.
+
+        Returns:
+            A sequence with the winner code of every battle: 1 or 2 for the winning side,
+            DRAW for a draw.
+        """
+        if np is None:
+            self.results = self._run_battles()
+        else:
+            self.results = self._run_vectorised()
+        return self.results
+
+    def winners(self) -> list:
+        """
+        Returns the winning Trainer (None for a draw) of every battle, for a batch made
+        with from_trainers, fighting the battles first if needed.
+        """
+        if self.trainer_pairs is None:
+            raise ValueError("winners is only available for batches made with from_trainers.")
+        if self.results is None:
+            self.run()
+        return [None if result == DRAW else pair[result - 1]
+                for pair, result in zip(self.trainer_pairs, self.results)]
+
+    def _run_battles(self) -> array:
+        """
+        Fights every battle with a Battle between Pokemon objects, then stores the final
+        state of the Pokemon back into the columns.
+        """
+        results = array('b')
+        for i in range(self.teams_1.team_count()):
+            trainers = []
+            for teams, pokedex in ((self.teams_1, self.pokedex_1), (self.teams_2, self.pokedex_2)):
+                trainer = Trainer(f"Side {len(trainers) + 1}")
+                trainer.team = teams.to_team(i, self.battle_mode, self.criterion)
+                trainer.set_pokedex(pokedex[i])
+                trainers.append((trainer, list(trainer.team.members())))
+            (trainer_1, members_1), (trainer_2, members_2) = trainers
+            winner = Battle(trainer_1, trainer_2, self.battle_mode, self.criterion).commence_battle()
+            results.append(DRAW if winner is None else 1 if winner is trainer_1 else 2)
+            for teams, members in ((self.teams_1, members_1), (self.teams_2, members_2)):
+                for row, pokemon in zip(teams.team_rows(i), members):
+                    teams.store_pokemon(row, pokemon)
+            self.pokedex_1[i] = trainer_1.pokedex.elems
+            self.pokedex_2[i] = trainer_2.pokedex.elems
+        return results
+
+    def _run_vectorised(self):
+        """
+        Fights every battle at once: each iteration plays one round of every battle that
+        is not over yet.
+        """
+        sides = (_Side(self.teams_1, self.pokedex_1, self.battle_mode, self.criterion),
+                 _Side(self.teams_2, self.pokedex_2, self.battle_mode, self.criterion))
+        side_1, side_2 = sides
+        total_types = len(PokeType)
+        completion = np.array([round(seen / total_types, 2) for seen in range(total_types + 1)])
+        active = np.flatnonzero((side_1.length > 0) & (side_2.length > 0))
+        while active.size:
+            row_1 = side_1.take_fighters(active)
+            row_2 = side_2.take_fighters(active)
+            won_1, won_2 = _battle_round(side_1, row_1, side_2, row_2,
+                                         completion[side_1.seen[active]], completion[side_2.seen[active]])
+            for side, won, rows in ((side_1, won_1, row_1), (side_2, won_2, row_2)):
+                side.level_up(active[won], rows[won])
+                if self.battle_mode == BattleMode.SET:
+                    # Battle.set_battle only pushes back a winner still standing after fatigue
+                    won = won & (side.health[rows] > 0)
+                side.put_back(active[won], rows[won])
+            still_active = (side_1.length[active] > 0) & (side_2.length[active] > 0)
+            active = active[still_active]
+        for side, pokedex in ((side_1, self.pokedex_1), (side_2, self.pokedex_2)):
+            side.store_columns()
+            pokedex[:] = [int(mask) for mask in side.pokedex]
+
+        empty_1 = side_1.length == 0
+        empty_2 = side_2.length == 0
+        if self.battle_mode == BattleMode.SET:
+            # Battle.set_battle: a draw when both teams are empty
+            return np.where(empty_1 & ~empty_2, 2, np.where(~empty_1 & empty_2, 1, DRAW)).astype(np.int8)
+        # Battle.rotate_battle and Battle.optimise_battle: trainer 2 wins when both teams are empty
+        return np.where(empty_1, 2, 1).astype(np.int8)
+
+
+def _battle_round(side_1, row_1, side_2, row_2, completion_1, completion_2):
+    """
+    Plays Battle.battle_round between the Pokemon in rows row_1 of side_1 and row_2 of
+    side_2 (one pair per active battle), updating their health. Returns two boolean
+    masks, telling in which battles each side won the round.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        neutral = (completion_1 == 0) | (completion_2 == 0)
+        multiplier_1 = np.where(neutral, 1.0, completion_1 / completion_2)
+        multiplier_2 = np.where(neutral, 1.0, completion_2 / completion_1)
+
+    stats_1 = side_1.gather(row_1)
+    stats_2 = side_2.gather(row_2)
+    first_is_1 = stats_1['speed'] > stats_2['speed']
+    # The stats of the first and second attacker of every battle
+    first = {name: np.where(first_is_1, stats_1[name], stats_2[name]) for name in stats_1}
+    second = {name: np.where(first_is_1, stats_2[name], stats_1[name]) for name in stats_1}
+    first_multiplier = np.where(first_is_1, multiplier_1, multiplier_2)
+    second_multiplier = np.where(first_is_1, multiplier_2, multiplier_1)
+
+    effectiveness = TypeEffectiveness.get_effectiveness_batch
+    first_health = first['health']
+    second_health = second['health'] - _damage(first, second, first_multiplier, effectiveness)
+    first_wins = second_health <= 0
+
+    # Counterattack if the second attacker is still standing
+    standing = ~first_wins
+    first_health = np.where(standing, first_health - _damage(second, first, second_multiplier, effectiveness),
+                            first_health)
+    second_wins = standing & (first_health <= 0)
+
+    # Battle fatigue if both are still standing
+    tired = standing & ~second_wins
+    first_health = np.where(tired, first_health - 1, first_health)
+    second_health = np.where(tired, second_health - 1, second_health)
+    first_faints = tired & (first_health <= 0)
+    second_wins |= first_faints
+    first_wins |= tired & ~first_faints & (second_health <= 0)
+
+    side_1.health[row_1] = np.where(first_is_1, first_health, second_health)
+    side_2.health[row_2] = np.where(first_is_1, second_health, first_health)
+    return (np.where(first_is_1, first_wins, second_wins),
+            np.where(first_is_1, second_wins, first_wins))
+
+def _damage(attacker: dict, defender: dict, multiplier, effectiveness):
+    """
+    Battle.calculate_damage for arrays of attackers and defenders.
+    """
+    attack_points = attacker['battle_power'] * effectiveness(attacker['poketype'], defender['poketype'])
+    return np.ceil(np.maximum(attack_points - defender['defence'], 0) * multiplier)
+
+
+class _Side:
+    """
+    One side of every battle of a BatchBattle: the columns of its Pokemon and, per battle,
+    its team structure as a row of slots holding column rows, plus its pokedex.
+    """
+    STATS = ('health', 'battle_power', 'defence', 'speed')
+
+    def __init__(self, columns: TeamColumns, pokedex, battle_mode: BattleMode, criterion: str) -> None:
+        self.columns = columns
+        self.battle_mode = battle_mode
+        self.criterion = criterion
+        views = columns.as_numpy()
+        # Work on float copies of the stats and write them back at the end
+        self.health = views['health'].copy()
+        self.battle_power = views['battle_power'].copy()
+        self.defence = views['defence'].copy()
+        self.speed = views['speed'].copy()
+        self.level = views['level'].astype(np.int64)
+        self.stage = views['stage'].astype(np.int64)
+        self.poketype = views['poketype'].astype(np.intp)
+        self.evolved = np.zeros(len(columns), dtype=bool)
+
+        # How far each Pokemon can still evolve: its species' line length and starting stage
+        species = views['species']
+        line_length = np.zeros(max(SpeciesRegistry.count(), 1), dtype=np.int64)
+        start_stage = np.zeros(max(SpeciesRegistry.count(), 1), dtype=np.int64)
+        for species_id in np.unique(species):
+            klass = SpeciesRegistry.get_by_id(int(species_id))
+            line = klass.evolution_line
+            line_length[species_id] = len(line)
+            if klass.BASE_STATS is not None and klass.BASE_STATS.name in line:
+                start_stage[species_id] = line.index(klass.BASE_STATS.name)
+        self.line_length = line_length[species]
+        self.start_stage = start_stage[species]
+
+        starts = views['team_starts']
+        self.length = np.diff(starts).astype(np.int64)
+        capacity = int(self.length.max()) if self.length.size else 0
+        self.capacity = max(capacity, 1)
+        offsets = np.arange(self.capacity)
+        self.slots = np.where(offsets < self.length[:, None], starts[:-1, None] + offsets, 0).astype(np.int64)
+        self.front = np.zeros(len(self.length), dtype=np.int64)
+        self.keys = self.criterion_values(self.slots) if battle_mode == BattleMode.OPTIMISE else None
+
+        self.pokedex = np.array(pokedex, dtype=np.int64)
+        self.seen = np.array([bin(mask).count('1') for mask in pokedex], dtype=np.int64)
+
+    def criterion_values(self, rows):
+        """
+        Returns the value of the OPTIMISE criterion of the Pokemon in the given rows.
+        """
+        return getattr(self, self.criterion)[rows].astype(np.float64)
+
+    def gather(self, rows) -> dict:
+        """
+        Returns the battle stats of the Pokemon in the given rows.
+        """
+        return {
+            'health': self.health[rows],
+            'battle_power': self.battle_power[rows],
+            'defence': self.defence[rows],
+            'speed': self.speed[rows],
+            'poketype': self.poketype[rows],
+        }
+
+    def take_fighters(self, battles):
+        """
+        Removes the next Pokemon to fight from the team of each given battle and returns
+        their rows: the top of the stack (SET), the front of the queue (ROTATE) or the
+        first of the sorted list (OPTIMISE).
+        """
+        self.length[battles] -= 1
+        if self.battle_mode == BattleMode.SET:
+            return self.slots[battles, self.length[battles]]
+        if self.battle_mode == BattleMode.ROTATE:
+            rows = self.slots[battles, self.front[battles]]
+            self.front[battles] = (self.front[battles] + 1) % self.capacity
+            return rows
+        rows = self.slots[battles, 0]
+        self.slots[battles, :-1] = self.slots[battles, 1:]
+        self.keys[battles, :-1] = self.keys[battles, 1:]
+        return rows
+
+    def put_back(self, battles, rows) -> None:
+        """
+        Returns the winning Pokemon in the given rows to the teams of the given battles:
+        pushed (SET), appended (ROTATE) or inserted by criterion as ArraySortedList.add
+        would (OPTIMISE).
+        """
+        if battles.size == 0:
+            return
+        if self.battle_mode == BattleMode.SET:
+            self.slots[battles, self.length[battles]] = rows
+        elif self.battle_mode == BattleMode.ROTATE:
+            self.slots[battles, (self.front[battles] + self.length[battles]) % self.capacity] = rows
+        else:
+            key = self.criterion_values(rows)
+            position = self._index_to_add(battles, key)
+            offsets = np.arange(self.capacity)
+            source = np.where(offsets > position[:, None], offsets - 1, offsets)
+            slots = np.take_along_axis(self.slots[battles], source, axis=1)
+            keys = np.take_along_axis(self.keys[battles], source, axis=1)
+            lines = np.arange(len(battles))
+            slots[lines, position] = rows
+            keys[lines, position] = key
+            self.slots[battles] = slots
+            self.keys[battles] = keys
+        self.length[battles] += 1
+
+    def _index_to_add(self, battles, key):
+        """
+        ArraySortedList._index_to_add for the sorted list of every given battle: a binary
+        search that stops at the first key equal to the new one it meets.
+        """
+        low = np.zeros(len(battles), dtype=np.int64)
+        high = self.length[battles] - 1
+        position = np.full(len(battles), -1, dtype=np.int64)
+        searching = low <= high
+        lines = np.arange(len(battles))
+        while searching.any():
+            middle = np.where(searching, (low + high) // 2, 0)
+            middle_key = self.keys[battles, middle]
+            lower = searching & (middle_key < key)
+            higher = searching & (middle_key > key)
+            equal = searching & ~lower & ~higher
+            position[equal] = middle[equal]
+            low = np.where(lower, middle + 1, low)
+            high = np.where(higher, middle - 1, high)
+            searching &= ~equal & (low <= high)
+        return np.where(position < 0, low, position)
+
+    def level_up(self, battles, rows) -> None:
+        """
+        Pokemon.level_up for the winners in the given rows, and registers their type in
+        the pokedex of their side in the given battles.
+        """
+        if rows.size == 0:
+            return
+        self.level[rows] += 1
+        evolving = rows[self.start_stage[rows] + self.stage[rows] < self.line_length[rows] - 1]
+        self.stage[evolving] += 1
+        self.evolved[evolving] = True
+        for stat in self.STATS:
+            getattr(self, stat)[evolving] *= Pokemon.EVOLUTION_MULTIPLIER
+        bits = np.left_shift(1, self.poketype[rows]).astype(np.int64)
+        new_type = (self.pokedex[battles] & bits) == 0
+        self.pokedex[battles] |= bits
+        self.seen[battles] += new_type
+
+    def store_columns(self) -> None:
+        """
+        Writes the final state of every Pokemon back into the columns. Evolving turns
+        integer stats into floats, as Pokemon._evolve does.
+        """
+        views = self.columns.as_numpy()
+        for stat in self.STATS:
+            views[stat][:] = getattr(self, stat)
+        views['level'][:] = self.level
+        views['stage'][:] = self.stage
+        views['int_stats'][self.evolved] = 0
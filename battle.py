@@ -8,26 +8,47 @@ from data_structures.queue_adt import *
 from data_structures.array_sorted_list import *
 from data_structures.abstract_list import *
 from math import ceil
+from round_cache import RoundCache, RoundOutcome, NO_WINNER, FIRST, SECOND
+from battle_events import *
 
 class Battle:
 
     # Time complexity: O(1), sets up attributes and inializes data structures
-    def __init__(self, trainer_1: Trainer, trainer_2: Trainer, battle_mode: BattleMode, criterion = "health") -> None:
+    def __init__(self, trainer_1: Trainer, trainer_2: Trainer, battle_mode: BattleMode, criterion = "health",
+                 round_cache: RoundCache = None, tracer = None, recorder = None) -> None:
         self.trainer_1 = trainer_1
         self.trainer_2 = trainer_2
         self.battle_mode = battle_mode
         self.criterion = criterion
+        # Optional cache of round outcomes, possibly shared with other battles
+        self.round_cache = round_cache
+        # Optional receiver of the battle's events (see battle_events), None for no tracing
+        self.tracer = tracer
+        self.round_number = 0
+        # Optional recorder of the outcome of every round (see battle_log.BattleLog)
+        self.recorder = recorder
+        # The trainers and pokedex versions the cached multipliers were computed for
+        self._multiplier_key = None
+        self._multipliers = (1.0, 1.0)
 
     # Time complexity: O(1), do not depend on the size of the data
     def commence_battle(self) -> Trainer | None:
         if self.battle_mode == BattleMode.SET:
-            return self.set_battle()
+            battle = self.set_battle
         elif self.battle_mode == BattleMode.ROTATE:
-            return self.rotate_battle()
+            battle = self.rotate_battle
         elif self.battle_mode == BattleMode.OPTIMISE:
-            return self.optimise_battle()
+            battle = self.optimise_battle
         else:
             raise ValueError("Invalid battle mode.")
+        if self.tracer is None:
+            return battle()
+        self.round_number = 0
+        self.tracer.emit(BattleEvent(BATTLE_START, 0, 0))
+        winner = battle()
+        side = 1 if winner is self.trainer_1 else 2 if winner is self.trainer_2 else 0
+        self.tracer.emit(BattleEvent(BATTLE_END, self.round_number, side))
+        return winner
 
     # Time complexity: O(n), where n is the number of Pokémon in the larger team
     def set_battle(self) -> Trainer | None:
@@ -82,33 +103,22 @@ class Battle:
         else:
             return self.trainer_1
 
-    # Time complexity: O(n), ideal situation regarding the order of Pokemon and battle outcomes
+    # Time complexity: O(n log n), where n is the number of Pokémon in the larger team
     # Worst case scenario: O(n^2), if re-sorting as Pokemon are added back to the team
     def optimise_battle(self) -> Trainer | None:
-        team_1 = ArraySortedList(len(self.trainer_1.get_team()))
-        team_2 = ArraySortedList(len(self.trainer_2.get_team()))
-
-        for pokemon in self.trainer_1.get_team():
-            if pokemon is not None:
-                team_1.add(pokemon)
-        for pokemon in self.trainer_2.get_team():
-            if pokemon is not None:
-                team_2.add(pokemon)
-
-        self.trainer_1.get_team().team = team_1
-        self.trainer_2.get_team().team = team_2
+        # The teams are lists sorted by the criterion (see _create_teams), the front Pokémon fight
+        team_1 = self.trainer_1.get_team().team
+        team_2 = self.trainer_2.get_team().team
 
         while len(team_1) > 0 and len(team_2) > 0:
-            pokemon1 = team_1.delete_at_index(0)
-            pokemon2 = team_2.delete_at_index(0)
-
-            if pokemon1.level > pokemon2.level:
-                team_1.add(pokemon1)
-            elif pokemon1.level < pokemon2.level:
-                team_2.add(pokemon2)
-            else:
-                team_1.add(pokemon1)
-                team_2.add(pokemon2)
+            pokemon1 = team_1.delete_at_index(0).value
+            pokemon2 = team_2.delete_at_index(0).value
+            winner = self.battle_round(pokemon1, pokemon2)
+            # The winner goes back into its team, sorted by its updated criterion value
+            if winner is pokemon1:
+                team_1.add(ListItem(pokemon1, getattr(pokemon1, self.criterion)))
+            elif winner is pokemon2:
+                team_2.add(ListItem(pokemon2, getattr(pokemon2, self.criterion)))
 
         if len(team_1) == 0:
             return self.trainer_2
@@ -129,79 +139,161 @@ class Battle:
         # Time complexity: O(n log n), depends on the sorting algorithm used
         # Worst case scenario: O(n^2), depends on the sorting algorithm used
         elif self.battle_mode == BattleMode.OPTIMISE:
-            self.trainer_1.get_team().assemble_team(BattleMode.OPTIMISE)
-            self.trainer_2.get_team().assemble_team(BattleMode.OPTIMISE)
+            self.trainer_1.get_team().assemble_team(BattleMode.OPTIMISE, self.criterion)
+            self.trainer_2.get_team().assemble_team(BattleMode.OPTIMISE, self.criterion)
         else:
             raise ValueError("Invalid battle mode.")
         
     # Time complexity: O(1), do not depend on the size of the data
     def battle_round(self, pokemon1: Pokemon, pokemon2: Pokemon) -> Pokemon | None:
-        p1_multiplier = self.trainer_1.get_pokedex_completion() / self.trainer_2.get_pokedex_completion()
-        p2_multiplier = self.trainer_2.get_pokedex_completion() / self.trainer_1.get_pokedex_completion()
+        if self.tracer is not None:
+            self.round_number += 1
+            self.tracer.emit(BattleEvent(ROUND_START, self.round_number, 0, pokemon1.name, pokemon2.name))
+        if self.round_cache is None:
+            winner = self._fight_round(pokemon1, pokemon2)
+        else:
+            winner = self._cached_round(pokemon1, pokemon2)
+        if self.recorder is not None:
+            self.recorder.record_round(pokemon1, pokemon2, winner)
+        return winner
+
+    # Time complexity: O(1), do not depend on the size of the data
+    def _cached_round(self, pokemon1: Pokemon, pokemon2: Pokemon) -> Pokemon | None:
+        key = self.round_cache.make_key(pokemon1, pokemon2, self.trainer_1.get_pokedex_completion(),
+                                        self.trainer_2.get_pokedex_completion())
+        outcome = self.round_cache.get(key)
+        if outcome is None:
+            winner = self._fight_round(pokemon1, pokemon2)
+            code = FIRST if winner is pokemon1 else SECOND if winner is pokemon2 else NO_WINNER
+            self.round_cache.put(key, RoundOutcome(pokemon1.health, pokemon2.health, code))
+            return winner
+        return self.replay_round(pokemon1, pokemon2, outcome)
+
+    # Time complexity: O(1), do not depend on the size of the data
+    def replay_round(self, pokemon1: Pokemon, pokemon2: Pokemon, outcome: RoundOutcome) -> Pokemon | None:
+        # Replay the round: set both healths as stored at the end of the round, i.e. after
+        # the winner levelled up. Rewarding the winner levels it up (and may evolve it,
+        # scaling its health) again, so its stored health is set back afterwards
+        pokemon1.health = outcome.health_1
+        pokemon2.health = outcome.health_2
+        if self.tracer is not None:
+            self._trace_damage(pokemon1, 1)
+            self._trace_damage(pokemon2, 2)
+        if outcome.winner == FIRST:
+            winner = self._win_round(pokemon1, pokemon2, 1)
+        elif outcome.winner == SECOND:
+            winner = self._win_round(pokemon2, pokemon1, 2)
+        else:
+            return None
+        winner.health = outcome.health_1 if winner is pokemon1 else outcome.health_2
+        return winner
+
+    # Time complexity: O(1), do not depend on the size of the data
+    def _fight_round(self, pokemon1: Pokemon, pokemon2: Pokemon) -> Pokemon | None:
+        tracer = self.tracer
+        p1_multiplier, p2_multiplier = self.get_multipliers()
 
         if pokemon1.speed > pokemon2.speed:
             first_attacker = pokemon1
             second_attacker = pokemon2
             first_multiplier = p1_multiplier
             second_multiplier = p2_multiplier
+            first_side = 1
         else:
             first_attacker = pokemon2
             second_attacker = pokemon1
             first_multiplier = p2_multiplier
             second_multiplier = p1_multiplier
+            first_side = 2
+        second_side = 3 - first_side
 
         damage = self.calculate_damage(first_attacker, second_attacker, first_multiplier)
         second_attacker.health -= damage
-    
-        if second_attacker.health <= 0:
-            first_attacker.level_up()
-            if first_attacker is pokemon1:
-                self.trainer_1.update_pokedex_completion(first_attacker)
-            else:
-                self.trainer_2.update_pokedex_completion(first_attacker)
+        if tracer is not None:
+            self._trace_attack(first_attacker, second_attacker, first_side, damage)
 
-            return first_attacker
+        if second_attacker.health <= 0:
+            return self._win_round(first_attacker, second_attacker, first_side)
 
         # Counterattack if the second attacker is still standing
         if first_attacker.speed == second_attacker.speed or second_attacker.health > 0:
             counter_damage = self.calculate_damage(second_attacker, first_attacker, second_multiplier)
             first_attacker.health -= counter_damage
+            if tracer is not None:
+                self._trace_attack(second_attacker, first_attacker, second_side, counter_damage)
             if first_attacker.health <= 0:
-                second_attacker.level_up()
-                if second_attacker is pokemon2:
-                    self.trainer_2.update_pokedex_completion(second_attacker)
-                else:
-                    self.trainer_1.update_pokedex_completion(second_attacker)
-
-                return second_attacker
+                return self._win_round(second_attacker, first_attacker, second_side)
 
         # Aftermath check: if both Pokemon still stand, each loses 1 HP due to battle fatigue
         if first_attacker.health > 0 and second_attacker.health > 0:
             first_attacker.health -= 1
             second_attacker.health -= 1
+            if tracer is not None:
+                self._trace_damage(first_attacker, first_side)
+                self._trace_damage(second_attacker, second_side)
             # Check for fainting after losing 1 HP
             if first_attacker.health <= 0:
-                second_attacker.level_up()
-                if second_attacker is pokemon2:
-                    self.trainer_2.update_pokedex_completion(second_attacker)
-                else:
-                    self.trainer_1.update_pokedex_completion(second_attacker)
-
-                return second_attacker
+                return self._win_round(second_attacker, first_attacker, second_side)
             elif second_attacker.health <= 0:
-                first_attacker.level_up()
-                if first_attacker is pokemon1:
-                    self.trainer_1.update_pokedex_completion(first_attacker)
-                else:
-                    self.trainer_2.update_pokedex_completion(first_attacker)
-
-                return first_attacker
+                return self._win_round(first_attacker, second_attacker, first_side)
 
         return None
 
+    # Time complexity: O(1), do not depend on the size of the data
+    def _win_round(self, winner: Pokemon, loser: Pokemon, side: int) -> Pokemon:
+        # The winner of the round levels up and is registered in its trainer's pokedex
+        trainer = self.trainer_1 if side == 1 else self.trainer_2
+        if self.tracer is None:
+            winner.level_up()
+            trainer.update_pokedex_completion(winner)
+            return winner
+        round_number = self.round_number
+        self.tracer.emit(BattleEvent(FAINT, round_number, 3 - side, loser.name, winner.name, loser.health))
+        name = winner.name
+        version = trainer.pokedex_version
+        winner.level_up()
+        trainer.update_pokedex_completion(winner)
+        self.tracer.emit(BattleEvent(LEVEL_UP, round_number, side, winner.name, None, winner.level))
+        if winner.name != name:
+            self.tracer.emit(BattleEvent(EVOLUTION, round_number, side, winner.name, name))
+        if trainer.pokedex_version != version:
+            self.tracer.emit(BattleEvent(POKEDEX_UPDATE, round_number, side, winner.name, None,
+                                         trainer.get_pokedex_completion()))
+        return winner
+
+    # Time complexity: O(1), do not depend on the size of the data
+    def _trace_attack(self, attacker: Pokemon, defender: Pokemon, side: int, damage: int) -> None:
+        self.tracer.emit(BattleEvent(ATTACK, self.round_number, side, attacker.name, defender.name, damage))
+        self._trace_damage(defender, 3 - side)
+
+    # Time complexity: O(1), do not depend on the size of the data
+    def _trace_damage(self, pokemon: Pokemon, side: int) -> None:
+        self.tracer.emit(BattleEvent(DAMAGE, self.round_number, side, pokemon.name, None, pokemon.health))
+
+    # Time complexity: O(1), do not depend on the size of the data
+    def get_multipliers(self) -> Tuple[float, float]:
+        # The multipliers only change with the pokedexes, recompute them when either version moves on
+        key = (self.trainer_1, self.trainer_1.pokedex_version, self.trainer_2, self.trainer_2.pokedex_version)
+        if key != self._multiplier_key:
+            completion_1 = self.trainer_1.get_pokedex_completion()
+            completion_2 = self.trainer_2.get_pokedex_completion()
+            self._multipliers = (self.pokedex_multiplier(completion_1, completion_2),
+                                 self.pokedex_multiplier(completion_2, completion_1))
+            self._multiplier_key = key
+        return self._multipliers
+
+    # Time complexity: O(1), do not depend on the size of the data
+    @staticmethod
+    def pokedex_multiplier(completion: float, other_completion: float) -> float:
+        # A trainer's damage is scaled by how its pokedex completion compares to the opponent's;
+        # while either pokedex is still empty the comparison is meaningless and the scale is neutral
+        if completion == 0 or other_completion == 0:
+            return 1.0
+        return completion / other_completion
+
     # Time complexity: O(1), do not depend on the size of the data
     def calculate_damage(self, attacker: Pokemon, defender: Pokemon, multiplier: float) -> int:
-        base_damage = max(attacker.attack - defender.defence, 0)
+        base_damage = max(attacker.attack(defender) - defender.defence, 0)
         return ceil(base_damage * multiplier)
 
 if __name__ == '__main__':
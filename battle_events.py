@@ -0,0 +1,120 @@
+"""
+This module contains the structured events a Battle emits when it is given a tracer,
+and the sinks that can receive them.
+
+A tracer is any object with an emit(event) method, e.g. one of the sinks below or a
+Tracer forwarding every event to several sinks. Without a tracer a battle builds no
+event at all: every emission is guarded by a single `is not None` test.
+"""
+import logging
+from typing import NamedTuple
+
+# Kinds of events
+BATTLE_START = "battle_start"
+ROUND_START = "round_start"
+ATTACK = "attack"
+DAMAGE = "damage"
+FAINT = "faint"
+LEVEL_UP = "level_up"
+EVOLUTION = "evolution"
+POKEDEX_UPDATE = "pokedex_update"
+BATTLE_END = "battle_end"
+
+EVENT_KINDS = (BATTLE_START, ROUND_START, ATTACK, DAMAGE, FAINT, LEVEL_UP, EVOLUTION,
+               POKEDEX_UPDATE, BATTLE_END)
+
+class BattleEvent(NamedTuple):
+    """
+    An event of a battle.
+
+    Attributes:
+        kind (str): One of EVENT_KINDS.
+        round_number (int): The round the event happened in, 0 before the first round.
+        side (int): The side (1 or 2) of the trainer or Pokemon the event is about, 0
+            for both sides (or a draw).
+        pokemon (str): The name of the Pokemon the event is about, if any.
+        target (str): The name of the other Pokemon involved, if any.
+        value (float): The value of the event:
+            ROUND_START: None
+            ATTACK: the damage dealt to the target
+            DAMAGE: the health of the Pokemon after the damage
+            FAINT: the health of the Pokemon
+            LEVEL_UP: the new level
+            EVOLUTION: None, target is the name before evolving
+            POKEDEX_UPDATE: the new pokedex completion of the side
+            BATTLE_START, BATTLE_END: None, with the winning side in side for BATTLE_END
+    """
+    kind: str
+    round_number: int
+    side: int
+    pokemon: str = None
+    target: str = None
+    value: float = None
+
+class ListSink:
+    """
+    Keeps every event, in order, in events.
+    """
+    def __init__(self) -> None:
+        self.events = []
+
+    def emit(self, event: BattleEvent) -> None:
+        self.events.append(event)
+
+    def of_kind(self, kind: str) -> list:
+        """
+        Returns the events of a kind, in order.
+        """
+        return [event for event in self.events if event.kind == kind]
+
+class CountingSink:
+    """
+    Counts the events of every kind.
+    """
+    def __init__(self) -> None:
+        self.counts = dict.fromkeys(EVENT_KINDS, 0)
+
+    def emit(self, event: BattleEvent) -> None:
+        self.counts[event.kind] += 1
+
+class CallbackSink:
+    """
+    Calls a function with every event, optionally only with events of some kinds.
+    """
+    def __init__(self, callback, kinds=None) -> None:
+        self.callback = callback
+        self.kinds = None if kinds is None else frozenset(kinds)
+
+    def emit(self, event: BattleEvent) -> None:
+        if self.kinds is None or event.kind in self.kinds:
+            self.callback(event)
+
+class LoggingSink:
+    """
+    Logs every event with the logging module, at DEBUG level by default.
+    """
+    def __init__(self, logger: logging.Logger = None, level: int = logging.DEBUG) -> None:
+        self.logger = logging.getLogger("battle") if logger is None else logger
+        self.level = level
+
+    def emit(self, event: BattleEvent) -> None:
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "round %d side %d %s %s %s %s", event.round_number, event.side,
+                            event.kind, event.pokemon, event.target, event.value)
+
+class Tracer:
+    """
+    Forwards every event to any number of sinks.
+    """
+    def __init__(self, *sinks) -> None:
+        self.sinks = list(sinks)
+
+    def add_sink(self, sink) -> None:
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink) -> None:
+        self.sinks.remove(sink)
+
+    def emit(self, event: BattleEvent) -> None:
+        for sink in self.sinks:
+            sink.emit(event)
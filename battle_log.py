@@ -0,0 +1,284 @@
+"""
+This module contains BattleLog, a compact binary record of a battle from which the
+battle can be replayed, to its end or to any round, without any damage calculation.
+
+A log holds the starting state of both teams (as TeamColumns, in the order of their
+team structure), both starting pokedexes, an optional seed (e.g. the seed the battle
+was fought with, see tournament.battle_seed) and, for every round, the team slots of
+the two Pokemon that fought, which of them won and both end-of-round healths (with one
+bit per health remembering whether it was an integer). A replay applies these outcomes
+in turn (see Battle.replay_round), letting the battle mode move the Pokemon in and out
+of the teams as the battle did.
+
+Serialised, a log is a header, the trainers' names, the team columns and the round
+columns, 20 bytes per round; any number of logs can be appended to the same file
+with write and read back one at a time with read_logs.
+"""
+import struct
+import sys
+from array import array
+from typing import NamedTuple
+from battle import Battle
+from battle_mode import BattleMode
+from poke_team import PokeTeam, Trainer
+from pokemon_base import Pokemon
+from round_cache import RoundOutcome, NO_WINNER, FIRST, SECOND
+from team_columns import TeamColumns
+from data_structures.sorted_list_adt import ListItem
+
+class ReplayState(NamedTuple):
+    """
+    The state of a replayed battle: the trainers, with their teams and pokedexes as
+    they were after round_number rounds, and, if the battle was replayed to its end,
+    the winner (None for a draw).
+    """
+    trainer_1: Trainer
+    trainer_2: Trainer
+    round_number: int
+    finished: bool
+    winner: Trainer
+
+class _StopReplay(Exception):
+    """
+    Stops a replay before a round, holding the two Pokemon about to fight it.
+    """
+    def __init__(self, pokemon1: Pokemon, pokemon2: Pokemon) -> None:
+        Exception.__init__(self)
+        self.pokemon1 = pokemon1
+        self.pokemon2 = pokemon2
+
+class _ReplayBattle(Battle):
+    """
+    A battle whose rounds are not fought but replayed from a log.
+    """
+    def __init__(self, trainer_1: Trainer, trainer_2: Trainer, log: 'BattleLog', rounds: int) -> None:
+        Battle.__init__(self, trainer_1, trainer_2, log.battle_mode, log.criterion or "health")
+        self.log = log
+        self.rounds = rounds
+        self.members_1 = list(trainer_1.get_team().members())
+        self.members_2 = list(trainer_2.get_team().members())
+        self.rounds_replayed = 0
+
+    def battle_round(self, pokemon1: Pokemon, pokemon2: Pokemon) -> Pokemon | None:
+        if self.rounds_replayed == self.rounds:
+            raise _StopReplay(pokemon1, pokemon2)
+        k = self.rounds_replayed
+        if k == len(self.log):
+            raise ValueError("The log ends before the battle does.")
+        if self.members_1[self.log.slots_1[k]] is not pokemon1 or self.members_2[self.log.slots_2[k]] is not pokemon2:
+            raise ValueError(f"The log does not match the battle at round {k + 1}.")
+        self.rounds_replayed += 1
+        return self.replay_round(pokemon1, pokemon2, self.log.outcome(k))
+
+class BattleLog:
+    """
+    The log of one battle; see the module.
+    """
+    MAGIC = b'PKBL'
+    VERSION = 1
+    # <magic, version, battle mode, criterion index (NO_CRITERION if none), seed,
+    #  pokedex 1, pokedex 2, number of rounds, length of the names>
+    HEADER = struct.Struct('<4sHBBqQQIH')
+    NO_CRITERION = 255
+    # Every log written by write is preceded by its length
+    LENGTH = struct.Struct('<I')
+
+    def __init__(self, battle_mode: BattleMode, criterion: str, names, teams: TeamColumns,
+                 pokedexes, seed: int = 0) -> None:
+        """
+        Parameters:
+            battle_mode (BattleMode): The mode of the battle.
+            criterion (str): The criterion of an OPTIMISE battle, None otherwise.
+            names: The names of both trainers.
+            teams (TeamColumns): The starting state of both teams, team 0 for trainer 1.
+            pokedexes: The starting pokedexes of both trainers, as BSet bit masks.
+            seed (int): A seed to keep with the log.
+        """
+        self.battle_mode = battle_mode
+        self.criterion = criterion
+        self.names = tuple(names)
+        self.teams = teams
+        self.pokedexes = tuple(pokedexes)
+        self.seed = seed
+        self.slots_1 = array('B')
+        self.slots_2 = array('B')
+        self.winners = array('b')
+        self.health_1 = array('d')
+        self.health_2 = array('d')
+        # Bit 0 (1) set if health_1 is an integer, bit 1 (2) if health_2 is
+        self.int_healths = array('B')
+        # The team slot of every Pokemon of each side, by identity, while recording
+        self._slots = None
+
+    @classmethod
+    def record(cls, battle: Battle, seed: int = 0) -> 'BattleLog':
+        """
+        Starts logging a battle whose teams have been created (see Battle._create_teams)
+        and that has not started yet, and returns the log, which is filled in as the
+        battle is fought.
+        """
+        teams = TeamColumns()
+        slots = []
+        for trainer in (battle.trainer_1, battle.trainer_2):
+            members = list(trainer.get_team().members())
+            for pokemon in members:
+                teams.add_pokemon(pokemon)
+            teams.end_team()
+            slots.append({id(pokemon): slot for slot, pokemon in enumerate(members)})
+        criterion = battle.criterion if battle.battle_mode == BattleMode.OPTIMISE else None
+        log = cls(battle.battle_mode, criterion, (battle.trainer_1.get_name(), battle.trainer_2.get_name()),
+                  teams, (battle.trainer_1.pokedex.elems, battle.trainer_2.pokedex.elems), seed)
+        log._slots = slots
+        battle.recorder = log
+        return log
+
+    def record_round(self, pokemon1: Pokemon, pokemon2: Pokemon, winner: Pokemon) -> None:
+        """
+        Appends the outcome of a round; called by Battle.battle_round.
+
+        Time Complexity: O(1) amortised
+        """
+        self.slots_1.append(self._slots[0][id(pokemon1)])
+        self.slots_2.append(self._slots[1][id(pokemon2)])
+        self.winners.append(FIRST if winner is pokemon1 else SECOND if winner is pokemon2 else NO_WINNER)
+        self.health_1.append(pokemon1.health)
+        self.health_2.append(pokemon2.health)
+        self.int_healths.append(isinstance(pokemon1.health, int) | isinstance(pokemon2.health, int) << 1)
+
+    def outcome(self, k: int) -> RoundOutcome:
+        """
+        Returns the outcome of round k + 1.
+        """
+        health_1 = self.health_1[k]
+        health_2 = self.health_2[k]
+        int_healths = self.int_healths[k]
+        return RoundOutcome(int(health_1) if int_healths & 1 else health_1,
+                            int(health_2) if int_healths & 2 else health_2, self.winners[k])
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rounds logged.
+        """
+        return len(self.winners)
+
+    def replay(self, rounds: int = None) -> ReplayState:
+        """
+        Replays the battle, to its end if rounds is None or after the given number of
+        rounds otherwise, and returns its state.
+
+        Raises:
+            ValueError: If the log does not describe a battle that can be replayed.
+
+        Time Complexity: O(n + r), where n is the number of Pokemon and r the number of
+            rounds replayed
+        """
+        trainers = []
+        for i in range(2):
+            trainer = Trainer(self.names[i])
+            trainer.team = self.teams.to_team(i, self.battle_mode, self.criterion or "health")
+            trainer.set_pokedex(self.pokedexes[i])
+            trainers.append(trainer)
+        trainer_1, trainer_2 = trainers
+        battle = _ReplayBattle(trainer_1, trainer_2, self, rounds)
+        try:
+            winner = battle.commence_battle()
+        except _StopReplay as stop:
+            self._put_back(trainer_1.get_team(), stop.pokemon1)
+            self._put_back(trainer_2.get_team(), stop.pokemon2)
+            return ReplayState(trainer_1, trainer_2, battle.rounds_replayed, False, None)
+        return ReplayState(trainer_1, trainer_2, battle.rounds_replayed, True, winner)
+
+    def _put_back(self, team: PokeTeam, pokemon: Pokemon) -> None:
+        """
+        Puts a Pokemon taken out of a team to fight a round back where it was taken from,
+        at the head of the team structure.
+        """
+        if self.battle_mode == BattleMode.SET:
+            team.team.push(pokemon)
+        elif self.battle_mode == BattleMode.ROTATE:
+            rest = list(team.members())
+            team.team.clear()
+            team.team.append(pokemon)
+            for member in rest:
+                team.team.append(member)
+        else:
+            team.team[0] = ListItem(pokemon, getattr(pokemon, self.criterion))
+            team.team.length += 1
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the log serialised; see the module.
+        """
+        names = b''.join(struct.pack('<H', len(name)) + name for name in
+                         (name.encode('utf-8') for name in self.names))
+        criterion = self.NO_CRITERION if self.criterion is None else PokeTeam.CRITERION_LIST.index(self.criterion)
+        chunks = [self.HEADER.pack(self.MAGIC, self.VERSION, self.battle_mode.value, criterion, self.seed,
+                                   self.pokedexes[0], self.pokedexes[1], len(self), len(names)),
+                  names, self.teams.to_bytes()]
+        for column in (self.slots_1, self.slots_2, self.winners, self.health_1, self.health_2, self.int_healths):
+            if sys.byteorder == 'big' and column.itemsize > 1:
+                column = array(column.typecode, column)
+                column.byteswap()
+            chunks.append(column.tobytes())
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data) -> 'BattleLog':
+        """
+        Reads a log serialised by to_bytes.
+
+        Raises:
+            ValueError: If data is not a log of this version.
+        """
+        if len(data) < cls.HEADER.size:
+            raise ValueError("Not a battle log.")
+        magic, version, battle_mode, criterion, seed, pokedex_1, pokedex_2, rounds, names_length = \
+            cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError("Not a battle log of this version.")
+        offset = cls.HEADER.size
+        names = []
+        for _ in range(2):
+            (length,) = struct.unpack_from('<H', data, offset)
+            names.append(bytes(data[offset + 2:offset + 2 + length]).decode('utf-8'))
+            offset += 2 + length
+        teams, offset = TeamColumns.from_bytes(data, offset)
+        log = cls(BattleMode(battle_mode), None if criterion == cls.NO_CRITERION else PokeTeam.CRITERION_LIST[criterion],
+                  names, teams, (pokedex_1, pokedex_2), seed)
+        if len(data) != offset + 20 * rounds:
+            raise ValueError("Truncated battle log.")
+        for column in ('slots_1', 'slots_2', 'winners', 'health_1', 'health_2', 'int_healths'):
+            values = getattr(log, column)
+            end = offset + rounds * values.itemsize
+            values.frombytes(bytes(data[offset:end]))
+            if sys.byteorder == 'big' and values.itemsize > 1:
+                values.byteswap()
+            offset = end
+        return log
+
+    def write(self, file) -> None:
+        """
+        Appends the log to a binary file, preceded by its length.
+        """
+        data = self.to_bytes()
+        file.write(self.LENGTH.pack(len(data)))
+        file.write(data)
+
+def read_logs(file):
+    """
+    Yields, one at a time, the logs appended to a binary file with BattleLog.write.
+
+    Raises:
+        ValueError: If the file ends in the middle of a log.
+    """
+    while True:
+        prefix = file.read(BattleLog.LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) < BattleLog.LENGTH.size:
+            raise ValueError("Truncated battle log file.")
+        (length,) = BattleLog.LENGTH.unpack(prefix)
+        data = file.read(length)
+        if len(data) < length:
+            raise ValueError("Truncated battle log file.")
+        yield BattleLog.from_bytes(data)
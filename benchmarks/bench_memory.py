@@ -0,0 +1,53 @@
+"""
+Memory benchmark for Pokemon instances.
+
+Compares the slotted Pokemon layout against the previous layout, where every instance
+had a __dict__ holding nine attributes, including its own copy of the evolution line.
+
+Run from the repository root with:
+    python -m benchmarks.bench_memory [count]
+"""
+import sys
+import tracemalloc
+from pokemon import Pikachu
+
+class DictPokemon:
+    """
+    The previous Pokemon layout, kept here only as the baseline of the benchmark.
+    """
+    def __init__(self):
+        self.health = 35
+        self.level = 1
+        self.poketype = Pikachu().poketype
+        self.battle_power = 35
+        self.evolution_line = ["Pikachu", "Raichu"]
+        self.name = "Pikachu"
+        self.experience = 0
+        self.defence = 20
+        self.speed = 90
+
+def measure(factory, count: int) -> int:
+    """
+    Returns the number of bytes allocated to keep count instances created by factory alive.
+    """
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    instances = [factory() for _ in range(count)]
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The list holding the instances is not part of the instances' footprint
+    return end - start - sys.getsizeof(instances)
+
+def report(count: int) -> None:
+    """
+    Prints the memory used per instance by both layouts.
+    """
+    before = measure(DictPokemon, count)
+    after = measure(Pikachu, count)
+    print(f"Pokemon instances: {count}")
+    print(f"before (__dict__ + own evolution list): {before / count:8.1f} bytes/instance")
+    print(f"after  (__slots__ + shared evolution):  {after / count:8.1f} bytes/instance")
+    print(f"saving: {100 * (before - after) / before:.1f}%")
+
+if __name__ == '__main__':
+    report(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
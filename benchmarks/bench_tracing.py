@@ -0,0 +1,113 @@
+"""
+Overhead benchmark for battle event tracing.
+
+Times the same battles fought with a Battle without a tracer, with the battle round as
+it was before tracing was added (the baseline, with no tracing guards at all), and with
+a tracer counting every event. Without a tracer the overhead should be within noise.
+
+Run from the repository root with:
+    python -m benchmarks.bench_tracing [battles]
+"""
+import gc
+import random
+import sys
+import time
+from battle import Battle
+from battle_events import CountingSink
+from battle_mode import BattleMode
+from poke_team import PokeTeam, Trainer
+
+class UntracedBattle(Battle):
+    """
+    The battle round before tracing was added, kept here only as the baseline of the
+    benchmark. The round cache path is left out as the benchmark does not use one.
+    """
+    def battle_round(self, pokemon1, pokemon2):
+        if self.round_cache is None:
+            return self._fight_round(pokemon1, pokemon2)
+        return Battle.battle_round(self, pokemon1, pokemon2)
+
+    def _fight_round(self, pokemon1, pokemon2):
+        p1_multiplier, p2_multiplier = self.get_multipliers()
+
+        if pokemon1.speed > pokemon2.speed:
+            first_attacker, second_attacker = pokemon1, pokemon2
+            first_multiplier, second_multiplier = p1_multiplier, p2_multiplier
+        else:
+            first_attacker, second_attacker = pokemon2, pokemon1
+            first_multiplier, second_multiplier = p2_multiplier, p1_multiplier
+
+        damage = self.calculate_damage(first_attacker, second_attacker, first_multiplier)
+        second_attacker.health -= damage
+        if second_attacker.health <= 0:
+            return self._reward(first_attacker, first_attacker is pokemon1)
+
+        if first_attacker.speed == second_attacker.speed or second_attacker.health > 0:
+            counter_damage = self.calculate_damage(second_attacker, first_attacker, second_multiplier)
+            first_attacker.health -= counter_damage
+            if first_attacker.health <= 0:
+                return self._reward(second_attacker, second_attacker is pokemon1)
+
+        if first_attacker.health > 0 and second_attacker.health > 0:
+            first_attacker.health -= 1
+            second_attacker.health -= 1
+            if first_attacker.health <= 0:
+                return self._reward(second_attacker, second_attacker is pokemon1)
+            elif second_attacker.health <= 0:
+                return self._reward(first_attacker, first_attacker is pokemon1)
+        return None
+
+    def _reward(self, winner, first_side):
+        winner.level_up()
+        (self.trainer_1 if first_side else self.trainer_2).update_pokedex_completion(winner)
+        return winner
+
+def make_battles(battle_class, specs, battle_mode: BattleMode, tracer=None) -> list:
+    """
+    Returns a ready-to-fight battle for every pair of trainer specs.
+    """
+    battles = []
+    for spec_1, spec_2 in specs:
+        battle = battle_class(Trainer.from_spec(spec_1), Trainer.from_spec(spec_2), battle_mode)
+        if tracer is not None:
+            battle.tracer = tracer
+        battle._create_teams()
+        battles.append(battle)
+    return battles
+
+def measure(variants, specs, battle_mode: BattleMode, repeats: int = 21) -> list:
+    """
+    Returns the best time, over repeats runs, to fight every battle with each variant, a
+    (battle class, tracer) pair. The variants take turns so that they share any noise,
+    and the garbage collector is paused while timing.
+    """
+    best = [float('inf')] * len(variants)
+    for _ in range(repeats):
+        for i, (battle_class, tracer) in enumerate(variants):
+            battles = make_battles(battle_class, specs, battle_mode, tracer)
+            gc.disable()
+            start = time.perf_counter()
+            for battle in battles:
+                battle.commence_battle()
+            elapsed = time.perf_counter() - start
+            gc.enable()
+            best[i] = min(best[i], elapsed)
+    return best
+
+def report(count: int) -> None:
+    """
+    Prints the time per battle of each variant, in every battle mode.
+    """
+    rng = random.Random(0)
+    drawer = PokeTeam(rng)
+    specs = [((f"A{i}", drawer.random_spec(), 0), (f"B{i}", drawer.random_spec(), 0)) for i in range(count)]
+    variants = [(UntracedBattle, None), (Battle, None), (Battle, CountingSink())]
+    print(f"Battles: {count}")
+    for battle_mode in BattleMode:
+        baseline, disabled, enabled = measure(variants, specs, battle_mode)
+        print(f"{battle_mode.name:<9} baseline {1e6 * baseline / count:7.2f} us/battle   "
+              f"no tracer {1e6 * disabled / count:7.2f} us/battle ({100 * (disabled - baseline) / baseline:+.1f}%)   "
+              f"counting tracer {1e6 * enabled / count:7.2f} us/battle ({100 * (enabled - baseline) / baseline:+.1f}%)")
+
+if __name__ == '__main__':
+    report(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
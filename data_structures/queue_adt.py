@@ -100,6 +100,38 @@ class CircularQueue(Queue[T]):
         self.rear = 0
 
 
+class ResizableCircularQueue(CircularQueue[T]):
+    """ Circular queue whose array doubles whenever it is full, so it is never full.
+
+    Attributes: as CircularQueue.
+    """
+    def __init__(self, initial_capacity: int = 1) -> None:
+        CircularQueue.__init__(self, initial_capacity)
+
+    def append(self, item: T) -> None:
+        """ Adds an element to the rear of the queue, growing the array if needed.
+        :complexity: O(1) amortised, O(n) when the array grows
+        """
+        if len(self) == len(self.array):
+            self._resize(2 * len(self.array))
+        CircularQueue.append(self, item)
+
+    def is_full(self) -> bool:
+        """ False, as the queue grows when it needs to. """
+        return False
+
+    def _resize(self, capacity: int) -> None:
+        """ Moves the elements, from front to rear, to the start of a new array.
+        :complexity: O(n) for n the number of elements
+        """
+        array = ArrayR(capacity)
+        for i in range(len(self)):
+            array[i] = self.array[(self.front + i) % len(self.array)]
+        self.array = array
+        self.front = 0
+        self.rear = len(self) % capacity
+
+
 class TestQueue(unittest.TestCase):
     """ Tests for the above class."""
     EMPTY = 0
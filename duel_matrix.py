@@ -0,0 +1,257 @@
+"""
+This module contains DuelMatrix, the precomputed outcome of a single battle round
+(Battle.battle_round) between every ordered pair of species, at every evolution stage.
+
+Battle rounds are deterministic, so a duel between two Pokemon in the state a species
+reaches at a given stage can be looked up instead of being fought. A Pokemon at stage s
+is a new Pokemon of its species levelled up s times (i.e. at level s + 1, with every
+stat scaled by each evolution), and both duelling trainers have an empty pokedex.
+
+The matrix is saved as a small header followed by three little-endian columns, each
+indexed by (species_1 * stages + stage_1) * cells + species_2 * stages + stage_2, where
+cells is species * stages and the species are numbered in get_all_pokemon_types order:
+    winner   int8    NO_WINNER, FIRST or SECOND, INVALID if a stage does not exist
+    health_1 float64 the health of the first Pokemon at the end of the round
+    health_2 float64 the health of the second Pokemon at the end of the round
+
+Build (or refresh) the default matrix file from the repository root with:
+    python -m duel_matrix [filename]
+"""
+import os
+import struct
+import sys
+import zlib
+from array import array
+from atomic_file import atomic_write
+from battle import Battle
+from battle_mode import BattleMode
+from poke_team import Trainer
+from pokemon import get_all_pokemon_types
+from pokemon_base import Pokemon, TypeEffectiveness
+from round_cache import RoundOutcome, NO_WINNER, FIRST, SECOND
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, the matrix is made of plain arrays
+    np = None
+
+# Winner code of a duel involving a stage its species does not have
+INVALID = -1
+
+def stage_count(species) -> int:
+    """
+    Returns the number of stages a species goes through, from its own stage to the
+    end of its evolution line, at least 1.
+    """
+    line = species.evolution_line
+    name = species().name
+    return len(line) - line.index(name) if name in line else 1
+
+def pokemon_at_stage(species, stage: int) -> Pokemon:
+    """
+    Returns a new Pokemon of a species levelled up stage times.
+    """
+    pokemon = species()
+    for _ in range(stage):
+        pokemon.level_up()
+    return pokemon
+
+class DuelMatrix:
+    """
+    The outcomes of single duels between every pair of (species, stage).
+    """
+    DEFAULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'duel_matrix.bin')
+    # <magic, format version, number of species, stages per species, fingerprint>
+    MAGIC = b'PKDM'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHHI')
+
+    def __init__(self, species, stages: int, winners: array, health_1: array, health_2: array) -> None:
+        """
+        Parameters:
+            species: The species, in matrix order.
+            stages (int): The number of stages kept for every species.
+            winners, health_1, health_2: The columns of the matrix (see the module).
+        """
+        self.species = list(species)
+        self.stages = stages
+        self.winners = winners
+        self.health_1 = health_1
+        self.health_2 = health_2
+        self.cells = len(self.species) * stages
+        self.species_index = {klass: i for i, klass in enumerate(self.species)}
+
+    @staticmethod
+    def fingerprint(species) -> int:
+        """
+        Returns a CRC-32 of everything a duel depends on: the stats and evolution line of
+        every species, in order, and the type effectiveness table.
+        """
+        TypeEffectiveness._ensure_loaded()
+        checksum = zlib.crc32(array('d', TypeEffectiveness.EFFECT_TABLE.array[:]).tobytes())
+        for klass in species:
+            pokemon = klass()
+            description = (klass.__name__, pokemon.name, pokemon.poketype.name, pokemon.health,
+                           pokemon.battle_power, pokemon.defence, pokemon.speed,
+                           tuple(klass.evolution_line), klass.EVOLUTION_MULTIPLIER)
+            checksum = zlib.crc32(repr(description).encode(), checksum)
+        return checksum
+
+    @classmethod
+    def compute(cls, species=None) -> 'DuelMatrix':
+        """
+        Fights every duel and returns the matrix.
+
+        Parameters:
+            species: The species to include, every species (get_all_pokemon_types) if None.
+
+        Time Complexity: O((n * s)^2), where n is the number of species and s the
+            largest number of stages
+        """
+        if species is None:
+            all_species = get_all_pokemon_types()
+            species = [all_species[i] for i in range(len(all_species))]
+        species = list(species)
+        stages = max((stage_count(klass) for klass in species), default=1)
+        cells = len(species) * stages
+        winners = array('b', bytes(cells * cells))
+        health_1 = array('d', bytes(8 * cells * cells))
+        health_2 = array('d', bytes(8 * cells * cells))
+        # The two trainers are reused, with their pokedex emptied before every duel
+        trainer_1, trainer_2 = Trainer("First"), Trainer("Second")
+        battle = Battle(trainer_1, trainer_2, BattleMode.SET)
+        valid = [stage < stage_count(klass) for klass in species for stage in range(stages)]
+        for first in range(cells):
+            for second in range(cells):
+                index = first * cells + second
+                if not (valid[first] and valid[second]):
+                    winners[index] = INVALID
+                    continue
+                pokemon_1 = pokemon_at_stage(species[first // stages], first % stages)
+                pokemon_2 = pokemon_at_stage(species[second // stages], second % stages)
+                trainer_1.set_pokedex(0)
+                trainer_2.set_pokedex(0)
+                winner = battle.battle_round(pokemon_1, pokemon_2)
+                winners[index] = FIRST if winner is pokemon_1 else SECOND if winner is pokemon_2 else NO_WINNER
+                health_1[index] = pokemon_1.health
+                health_2[index] = pokemon_2.health
+        return cls(species, stages, winners, health_1, health_2)
+
+    def outcome(self, species_1, stage_1: int, species_2, stage_2: int) -> RoundOutcome:
+        """
+        Returns the outcome of the duel between a Pokemon of species_1 at stage_1 and
+        one of species_2 at stage_2, or None if either stage does not exist.
+
+        Raises:
+            KeyError: If either species is not in the matrix.
+
+        Time Complexity: O(1)
+        """
+        if not (0 <= stage_1 < self.stages and 0 <= stage_2 < self.stages):
+            return None
+        index = ((self.species_index[species_1] * self.stages + stage_1) * self.cells
+                 + self.species_index[species_2] * self.stages + stage_2)
+        winner = self.winners[index]
+        if winner == INVALID:
+            return None
+        return RoundOutcome(self.health_1[index], self.health_2[index], winner)
+
+    def lookup(self, pokemon_1: Pokemon, pokemon_2: Pokemon) -> RoundOutcome:
+        """
+        Returns the outcome of the duel between the species and stages of two Pokemon.
+        The outcome is only that of a battle round between these very Pokemon if they are
+        in the state described in the module, e.g. new or regenerated and never hurt.
+
+        Time Complexity: O(1)
+        """
+        return self.outcome(type(pokemon_1), pokemon_1.get_stage(), type(pokemon_2), pokemon_2.get_stage())
+
+    def save(self, filename: str = None) -> None:
+        """
+        Writes the matrix to a file, DEFAULT_FILENAME if None, atomically.
+        """
+        filename = self.DEFAULT_FILENAME if filename is None else filename
+        columns = [self.winners, array('d', self.health_1), array('d', self.health_2)]
+        if sys.byteorder == 'big':
+            for column in columns[1:]:
+                column.byteswap()
+        with atomic_write(filename, 'wb') as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self.species), self.stages,
+                                        self.fingerprint(self.species)))
+            for column in columns:
+                file.write(column.tobytes())
+
+    @classmethod
+    def load(cls, filename: str = None, species=None) -> 'DuelMatrix':
+        """
+        Reads a matrix saved by save, for the given species (every species if None).
+
+        Raises:
+            ValueError: If the file is malformed or was computed for other species, other
+                stats or another type effectiveness table.
+        """
+        if species is None:
+            all_species = get_all_pokemon_types()
+            species = [all_species[i] for i in range(len(all_species))]
+        species = list(species)
+        with open(cls.DEFAULT_FILENAME if filename is None else filename, 'rb') as file:
+            data = file.read()
+        if len(data) < cls.HEADER.size:
+            raise ValueError("Not a duel matrix file.")
+        magic, version, count, stages, fingerprint = cls.HEADER.unpack_from(data)
+        cells = count * stages
+        if magic != cls.MAGIC or version != cls.VERSION or len(data) != cls.HEADER.size + 17 * cells * cells:
+            raise ValueError("Not a duel matrix file.")
+        if count != len(species) or fingerprint != cls.fingerprint(species):
+            raise ValueError("The duel matrix was computed for other species or rules.")
+        offset = cls.HEADER.size
+        winners = array('b', data[offset:offset + cells * cells])
+        offset += cells * cells
+        health_1 = array('d', data[offset:offset + 8 * cells * cells])
+        health_2 = array('d', data[offset + 8 * cells * cells:])
+        if sys.byteorder == 'big':
+            health_1.byteswap()
+            health_2.byteswap()
+        return cls(species, stages, winners, health_1, health_2)
+
+    @classmethod
+    def load_or_compute(cls, filename: str = None) -> 'DuelMatrix':
+        """
+        Returns the matrix of every species from a file, recomputing (and saving) it if
+        the file is missing or stale. Failing to save it is not an error.
+        """
+        try:
+            return cls.load(filename)
+        except (OSError, ValueError):
+            pass
+        matrix = cls.compute()
+        try:
+            matrix.save(filename)
+        except OSError:
+            pass
+        return matrix
+
+    def as_numpy(self) -> dict:
+        """
+        Returns zero-copy NumPy views of the columns, shaped
+        (species, stages, species, stages) and keyed by column name.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("DuelMatrix.as_numpy requires NumPy")
+        shape = (len(self.species), self.stages, len(self.species), self.stages)
+        return {
+            'winner': np.frombuffer(self.winners, dtype=np.int8).reshape(shape),
+            'health_1': np.frombuffer(self.health_1, dtype=np.float64).reshape(shape),
+            'health_2': np.frombuffer(self.health_2, dtype=np.float64).reshape(shape),
+        }
+
+
+if __name__ == '__main__':
+    output = sys.argv[1] if len(sys.argv) > 1 else None
+    matrix = DuelMatrix.compute()
+    matrix.save(output)
+    print(f"{len(matrix.species)} species x {matrix.stages} stages written to "
+          f"{DuelMatrix.DEFAULT_FILENAME if output is None else output}")
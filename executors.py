@@ -0,0 +1,16 @@
+"""
+This module contains helpers shared by the modules that fight battles in a pool of
+worker processes (Tournament, TeamSearch, TeamEvolution, TowerRunner), all of which can
+also do their work in the calling process.
+"""
+
+class NoExecutor:
+    """
+    Stands in for a process pool when the work is done in this process: a context
+    holding None, which callers test to run their tasks with the built-in map.
+    """
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
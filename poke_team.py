@@ -16,9 +16,12 @@ class PokeTeam:
     CRITERION_LIST = ["health", "defence", "battle_power", "speed", "level"]
 
     # Time complexity: O(1), sets up simple attributes and intializes the team structure
-    def __init__(self):
+    def __init__(self, rng=None):
         self.team = ArrayStack(self.TEAM_LIMIT) # change None value if necessary
         self.team_count = 0
+        self.criterion = self.CRITERION_LIST[0]
+        # Random source of choose_randomly: a random.Random, or the global random module by default
+        self.rng = random if rng is None else rng
 
     # Time complexity: O(1), adds a pokemon to the team structure use a single operations; constant time for stacks and queues
     def add_pokemon(self, pokemon):
@@ -88,30 +91,25 @@ class PokeTeam:
         all_pokemon = get_all_pokemon_types()
         self.team_count = 0
         for _ in range(self.TEAM_LIMIT):
-            rand_int = random.randint(0, len(all_pokemon)-1)
+            rand_int = self.rng.randint(0, len(all_pokemon)-1)
             pokemon = all_pokemon[rand_int]()
             print(f"Selected Pokemon: {pokemon}")  
             if pokemon is not None:
                 self.team.push(pokemon)  
                 self.team_count += 1
 
+    # Time complexity: O(n), where n is TEAM_LIMIT
+    def random_spec(self) -> tuple:
+        # Draws a team like choose_randomly does (the same draws from self.rng), silently, and returns its spec
+        all_pokemon = get_all_pokemon_types()
+        return tuple(all_pokemon[self.rng.randint(0, len(all_pokemon)-1)].SPECIES_ID for _ in range(self.TEAM_LIMIT))
+
     # Time complexity: O(n), iterating over all Pokemon to reset their health
     def regenerate_team(self, battle_mode: BattleMode, criterion: str = None):
-        # Use a temporary ArrayStack for regeneration regardless of the current battle mode
-        temp_stack = ArrayStack(self.TEAM_LIMIT)
-        
-        # Move Pokémon to the temp_stack and reset their health
-        while not self.is_empty():
-            pokemon = self.remove_pokemon()  
-            pokemon.health = type(pokemon)().health  
-            temp_stack.push(pokemon)
-        
-        self.clear_team()
-        
-        # Move Pokémon back from temp_stack to the team
-        while not temp_stack.is_empty():
-            self.add_pokemon(temp_stack.pop())
-        self.assemble_team(battle_mode)
+        # Reset every Pokémon's health from its species' base stats, keeping the team order
+        for pokemon in self.members():
+            pokemon.reset_health()
+        self.assemble_team(battle_mode, criterion)
 
     # Time complexity: O(n log n), sorting the team based on the criterion
     def assign_team(self, criterion: str = None) -> None:
@@ -133,45 +131,33 @@ class PokeTeam:
             self.add_pokemon(new_team[i])
 
 
-    def assemble_team(self, battle_mode: BattleMode) -> None:
-        # Time complexity: O(n), transfering all Pokemon to a temp structure and back
+    def assemble_team(self, battle_mode: BattleMode, criterion: str = None) -> None:
+        # Rebuild the team in the structure of the battle mode, from whichever structure it is in now
+        if criterion is not None:
+            self.criterion = criterion
+        # Time complexity: O(n), transfering all Pokemon to the new structure
         if battle_mode == BattleMode.SET:
             temp_stack = ArrayStack(self.TEAM_LIMIT)
-            while not self.team.is_empty():  # If self.team is ArrayStack, it should have is_empty method
-                pokemon = self.team.pop()  # This should be valid since self.team should be ArrayStack
+            for pokemon in self.members():
                 if pokemon is not None:
                     temp_stack.push(pokemon)
-            self.team = ArrayStack(self.TEAM_LIMIT)
-            while not temp_stack.is_empty():
-                self.team.push(temp_stack.pop())
-        # Time complexity: O(n), transfering all Pokemon to a temp structure and back
+            self.team = temp_stack
+        # Time complexity: O(n), transfering all Pokemon to the new structure
         elif battle_mode == BattleMode.ROTATE:
             temp_queue = CircularQueue(self.TEAM_LIMIT)
-            # Pop all Pokemon into a temporary queue
-            while not self.team.is_empty():
-                pokemon = self.team.serve()
+            for pokemon in self.members():
                 if pokemon is not None:
                     temp_queue.append(pokemon)
-            # Now queue back into self.team as a CircularQueue
-            self.team = CircularQueue(self.TEAM_LIMIT)
-            while not temp_queue.is_empty():
-                self.team.append(temp_queue.serve())
+            self.team = temp_queue
         # Time complexity O(n log n)
         # Worst time complexity: O(n^2) 
         elif battle_mode == BattleMode.OPTIMISE:
-            # You'll need to pop all elements from the stack to sort them
-            # The ArraySortedList is expected to have a method to insert items in a sorted way
+            # The sorted list holds ListItems keyed by the criterion
             temp_list = ArraySortedList(self.TEAM_LIMIT)
-            while not self.team.is_empty():
-                pokemon = self.team.pop()
+            for pokemon in self.members():
                 if pokemon is not None:
-                    # The ListItem constructor may require the item and a key for sorting
                     temp_list.add(ListItem(pokemon, getattr(pokemon, self.criterion)))
-
-            # Now move the sorted Pokemon back into self.team
-            self.team = ArraySortedList(self.TEAM_LIMIT)
-            for i in range(temp_list.length):
-                self.team.add(temp_list[i])
+            self.team = temp_list
 
         else:
             raise ValueError("Invalid battle mode.")
@@ -214,6 +200,34 @@ class PokeTeam:
         
         self.assemble_team(battle_mode)
 
+    # Time complexity: O(n), visiting every Pokemon once
+    def members(self):
+        # Yield the Pokémon in the order of the team structure: stack bottom to top,
+        # queue front to rear, sorted list in key order
+        if isinstance(self.team, CircularQueue):
+            for i in range(len(self.team)):
+                yield self.team.array[(self.team.front + i) % len(self.team.array)]
+        else:
+            for i in range(len(self.team)):
+                item = self.team.array[i]
+                yield item.value if isinstance(item, ListItem) else item
+
+    # Time complexity: O(n), one species ID per Pokemon
+    def to_spec(self) -> tuple:
+        # A compact, picklable description of the team: the species IDs of its Pokémon, in team order
+        return tuple(pokemon.SPECIES_ID for pokemon in self.members())
+
+    # Time complexity: O(n), creating one Pokemon per species ID
+    @classmethod
+    def from_spec(cls, spec, rng=None) -> 'PokeTeam':
+        # Build a team of new Pokémon from a spec made by to_spec, stacked like choose_randomly does
+        team = cls(rng)
+        team.team = ArrayStack(max(cls.TEAM_LIMIT, len(spec)))
+        for species_id in spec:
+            team.team.push(SpeciesRegistry.get_by_id(species_id)())
+        team.team_count = len(spec)
+        return team
+
     # Time complexity: O(1), simple operations
     def __getitem__(self, index: int):
         return self.team.array[index]
@@ -245,10 +259,16 @@ class PokeTeam:
 class Trainer:
 
     # Time complexity: O(1), sets up attributes and inializes data structures
-    def __init__(self, name) -> None:
+    def __init__(self, name, rng=None) -> None:
         self.name = name
-        self.team = PokeTeam()
+        self.rng = random if rng is None else rng
+        self.team = PokeTeam(self.rng)
         self.pokedex = BSet()
+        # Kept up to date by register_pokemon, so the completion is never recounted from the BSet
+        self.pokedex_count = 0
+        self.pokedex_completion = 0.0
+        # Incremented whenever the pokedex changes, so callers can tell when to recompute
+        self.pokedex_version = 0
 
     # Time complexity: O(n), directly calls "PokeTeam" which have O(n) time complexity
     def pick_team(self, method: str) -> None:
@@ -262,7 +282,7 @@ class Trainer:
     # Time complexity: O(1), direct access or simple calculations
     def get_team(self) -> PokeTeam:
         if self.team is None:
-            self.team = PokeTeam()
+            self.team = PokeTeam(self.rng)
         return self.team
 
     # Time complexity: O(1), direct access or simple calculations
@@ -271,22 +291,53 @@ class Trainer:
 
     # Time complexity: O(1), direct access or simple calculations
     def register_pokemon(self, pokemon: Pokemon) -> None:
-        self.pokedex.add(pokemon.get_poketype().value)
+        # BSet only holds positive integers, so type values are shifted by one
+        item = pokemon.get_poketype().value + 1
+        if item not in self.pokedex:
+            self.pokedex.add(item)
+            self.pokedex_count += 1
+            self._update_completion()
 
     # Time complexity: O(1), direct access or simple calculations
-    def get_pokedex_completion(self) -> float:
+    def set_pokedex(self, elems: int) -> None:
+        # Replaces the whole pokedex with the given BSet bits
+        self.pokedex.elems = elems
+        self.pokedex_count = bin(elems).count('1')
+        self._update_completion()
+
+    # Time complexity: O(1), direct access or simple calculations
+    def _update_completion(self) -> None:
         total_types = len(PokeType)
-        seen_types = len(self.pokedex)
-        if total_types > 0: 
-            completion = seen_types / total_types
-        else: 
+        if total_types > 0:
+            completion = self.pokedex_count / total_types
+        else:
             completion = 0
-        return round(completion, 2)
+        self.pokedex_completion = round(completion, 2)
+        self.pokedex_version += 1
+
+    # Time complexity: O(1), direct access or simple calculations
+    def get_pokedex_completion(self) -> float:
+        return self.pokedex_completion
 
     # Time complexity: O(1), direct access or simple calculations
     def update_pokedex_completion(self, new_pokemon: Pokemon) -> None:
         self.register_pokemon(new_pokemon)
 
+    # Time complexity: O(n), where n is the size of the team
+    def to_spec(self) -> tuple:
+        # A compact, picklable description of the trainer: name, team spec and pokedex bits
+        return self.name, self.team.to_spec(), self.pokedex.elems
+
+    # Time complexity: O(n), where n is the size of the team
+    @classmethod
+    def from_spec(cls, spec, rng=None) -> 'Trainer':
+        # Build a trainer with a team of new Pokémon from a spec made by to_spec
+        name, team_spec, pokedex = spec
+        trainer = cls(name, rng)
+        trainer.team = PokeTeam.from_spec(team_spec, trainer.rng)
+        trainer.set_pokedex(pokedex)
+        return trainer
+
     # Time complexity: O(1), direct access or simple calculations
     def __str__(self) -> str:
         return f"Trainer {self.name} Pokedex Completion: {int(self.get_pokedex_completion() * 100)}%"
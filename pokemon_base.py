@@ -1,10 +1,23 @@
 """
-This module contains PokeType, TypeEffectiveness and an abstract version of the Pokemon Class
+This module contains PokeType, TypeEffectiveness, SpeciesRegistry and an abstract version of the Pokemon Class
 """
+import os
+import struct
+import sys
+import threading
+import zlib
 from abc import ABC
+from array import array
+from atomic_file import atomic_write
 from enum import Enum
+from typing import NamedTuple
 from data_structures.referential_array import ArrayR
 
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, the pure-Python table is always available
+    np = None
+
 class PokeType(Enum):
     """
     This class contains all the different types that a Pokemon could belong to
@@ -28,19 +41,145 @@ class PokeType(Enum):
 class TypeEffectiveness:
     """
     Represents the type effectiveness of one Pokemon type against another.
+
+    The table is loaded lazily from DEFAULT_FILENAME on the first lookup, unless
+    another rule set has been installed beforehand with load.
     """
+    DEFAULT_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'type_effectiveness.csv')
+    _LOAD_LOCK = threading.Lock()
     EFFECT_TABLE = None
+    EFFECT_MATRIX = None
+    NUM_TYPES = len(PokeType)
+
+    # Binary sidecar cache: <magic, format version, number of types, CRC-32 of the CSV>
+    # followed by the n*n little-endian doubles of the flat table.
+    CACHE_SUFFIX = '.bin'
+    CACHE_MAGIC = b'PKTE'
+    CACHE_VERSION = 1
+    CACHE_HEADER = struct.Struct('<4sHHI')
+
+    @classmethod
+    def populate_effectiveness(cls, filename, use_cache: bool = True):
+        """
+        Reads the effectiveness table from a CSV file whose header row names the
+        types and whose i-th data row holds the multipliers of the i-th type when
+        attacking every type in the header.
+
+        The table is stored flat and indexed directly by PokeType.value, i.e. the
+        multiplier of attack_type against defend_type lives at position
+        attack_type.value * NUM_TYPES + defend_type.value, so that lookups need
+        neither an allocation nor a search. When NumPy is installed the same
+        values are also kept as an n x n matrix for get_effectiveness_batch.
+
+        Parsing is skipped whenever the binary cache next to the CSV (filename
+        + CACHE_SUFFIX) was compiled from the same CSV contents; otherwise the
+        CSV is parsed and the cache is (re)written.
+
+        Parameters:
+            filename (str): The path of the CSV file to read.
+            use_cache (bool): Whether to read and write the binary cache.
+
+        Time Complexity: O(n^2), where n is the number of types
+        """
+        with open(filename, 'rb') as file:
+            raw = file.read()
+        checksum = zlib.crc32(raw)
+        cache_name = filename + cls.CACHE_SUFFIX
+        loaded = cls._read_cache(cache_name, checksum) if use_cache else None
+        if loaded is None:
+            n, values = cls._parse_effectiveness(raw.decode())
+            if use_cache:
+                cls._write_cache(cache_name, checksum, n, values)
+        else:
+            n, values = loaded
+        table = ArrayR(n*n)
+        table.array[:] = values.tolist()
+        cls.NUM_TYPES = n
+        if np is not None:
+            cls.EFFECT_MATRIX = np.frombuffer(values, dtype=np.float64).reshape(n, n)
+        # Published last, as a non-None EFFECT_TABLE marks the table as loaded
+        cls.EFFECT_TABLE = table
+
+    @classmethod
+    def load(cls, filename: str = None) -> None:
+        """
+        Explicitly (re)loads the effectiveness table, e.g. to swap in an alternative
+        rule set. Safe to call from several threads.
+
+        Parameters:
+            filename (str): The path of the CSV file to read, DEFAULT_FILENAME if None.
+        """
+        with cls._LOAD_LOCK:
+            cls.populate_effectiveness(cls.DEFAULT_FILENAME if filename is None else filename)
+
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        """
+        Loads the default table unless a table is already loaded. Only the first
+        caller does any I/O, concurrent callers wait for it to finish.
+        """
+        with cls._LOAD_LOCK:
+            if cls.EFFECT_TABLE is None:
+                cls.populate_effectiveness(cls.DEFAULT_FILENAME)
+
+    @staticmethod
+    def _parse_effectiveness(text: str):
+        """
+        Parses the CSV text of an effectiveness table into a flat array of doubles
+        in PokeType.value order. Returns the number of types and the array.
+        """
+        lines = text.splitlines()
+        types = lines[0].strip().split(',')
+        n = len(types)
+        # Map each CSV column to the value of the PokeType it represents
+        type_values = ArrayR(n)
+        for i, type_name in enumerate(types):
+            type_values[i] = PokeType[type_name.strip().upper()].value
+        values = array('d', bytes(8*n*n))
+        for i, line in enumerate(lines[1:n+1]):
+            row = type_values[i]*n
+            for j, value in enumerate(line.strip().split(',')):
+                values[row + type_values[j]] = float(value)
+        return n, values
 
     @classmethod
-    def populate_effectiveness(cls, filename):
-        with open(filename, 'r') as file:
-            lines = file.readlines()
-            types = lines[0].strip().split(',')
-            cls.EFFECT_TABLE = ArrayR(len(types)*len(types))
-            for i, line in enumerate(lines[1:]):
-                values = line.strip().split(',')
-                for j, value in enumerate(values):
-                    cls.EFFECT_TABLE[i*len(types)+j] = float(value)
+    def _read_cache(cls, cache_name: str, checksum: int):
+        """
+        Bulk-reads a binary cache file. Returns the number of types and the flat
+        array of doubles, or None if the file is missing, malformed or stale.
+        """
+        try:
+            with open(cache_name, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        if len(data) < cls.CACHE_HEADER.size:
+            return None
+        magic, version, n, cached_checksum = cls.CACHE_HEADER.unpack_from(data)
+        if magic != cls.CACHE_MAGIC or version != cls.CACHE_VERSION or cached_checksum != checksum \
+                or len(data) != cls.CACHE_HEADER.size + 8*n*n:
+            return None
+        values = array('d')
+        values.frombytes(data[cls.CACHE_HEADER.size:])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return n, values
+
+    @classmethod
+    def _write_cache(cls, cache_name: str, checksum: int, n: int, values) -> None:
+        """
+        Writes a binary cache file atomically. Failing to write the cache (e.g. on
+        a read-only checkout) is not an error, the CSV is simply parsed next time.
+        """
+        body = array('d', values)
+        if sys.byteorder == 'big':
+            body.byteswap()
+        try:
+            with atomic_write(cache_name, 'wb') as file:
+                file.write(cls.CACHE_HEADER.pack(cls.CACHE_MAGIC, cls.CACHE_VERSION, n, checksum))
+                file.write(body.tobytes())
+        except OSError:
+            pass
 
     @classmethod
     def get_effectiveness(cls, attack_type: PokeType, defend_type: PokeType) -> float:
@@ -53,41 +192,190 @@ class TypeEffectiveness:
 
         Returns:
             float: The effectiveness of the attack, as a float value between 0 and 4.
+
+        Time Complexity: O(1)
         """
-        types = ArrayR(len(PokeType))
-        for i, poke_type in enumerate(PokeType):
-            types[i] = poke_type
+        if cls.EFFECT_TABLE is None:
+            cls._ensure_loaded()
+        return cls.EFFECT_TABLE[attack_type.value*cls.NUM_TYPES + defend_type.value]
 
-        n = len(types)
-        i = types.index(attack_type)
-        j = types.index(defend_type)
-        return cls.EFFECT_TABLE[i*n + j]
+    @classmethod
+    def get_effectiveness_batch(cls, attack_types, defend_types):
+        """
+        Returns the effectiveness of many attacker/defender type pairs at once.
+
+        Parameters:
+            attack_types: A sequence (or NumPy array) of attacking type codes, i.e. PokeType values.
+            defend_types: A sequence (or NumPy array) of defending type codes, of the same length.
+
+        Returns:
+            A NumPy float array of multipliers when NumPy is installed (following NumPy
+            broadcasting rules), otherwise a list of floats.
+
+        Raises:
+            ValueError: If NumPy is not installed and the sequences differ in length.
+
+        Time Complexity: O(k), where k is the number of pairs
+        """
+        if cls.EFFECT_TABLE is None:
+            cls._ensure_loaded()
+        if np is not None and cls.EFFECT_MATRIX is not None:
+            return cls.EFFECT_MATRIX[np.asarray(attack_types, dtype=np.intp),
+                                     np.asarray(defend_types, dtype=np.intp)]
+        if len(attack_types) != len(defend_types):
+            raise ValueError("attack_types and defend_types must have the same length.")
+        table = cls.EFFECT_TABLE
+        n = cls.NUM_TYPES
+        return [table[a*n + d] for a, d in zip(attack_types, defend_types)]
 
     def __len__(self) -> int:
         """
         Returns the number of types of Pokemon
         """
         return len(PokeType)
-    
-TypeEffectiveness.populate_effectiveness('type_effectiveness.csv')
+
+class BaseStats(NamedTuple):
+    """
+    The immutable stats every Pokemon of a species starts with, shared by the species.
+    """
+    name: str
+    poketype: PokeType
+    health: float
+    battle_power: float
+    defence: float
+    speed: float
+
+    def health_at(self, stage: int, multiplier: float = 1.5) -> float:
+        """
+        Returns the full health of the species after evolving stage times, scaling
+        it exactly as Pokemon._evolve does.
+
+        Time Complexity: O(stage)
+        """
+        health = self.health
+        for _ in range(stage):
+            health *= multiplier
+        return health
+
+class SpeciesRegistry:
+    """
+    Records every concrete Pokemon species (i.e. every subclass of Pokemon) once, at
+    class creation time, under a stable integer ID given in order of definition.
+    """
+    _by_id = []
+    _by_name = {}
+    _sorted = None
+
+    @classmethod
+    def register(cls, species) -> None:
+        """
+        Registers a species class and sets its SPECIES_ID. A species redefined under
+        an existing name (e.g. when its module is reloaded) keeps its previous ID.
+
+        Time Complexity: O(1)
+        """
+        previous = cls._by_name.get(species.__name__)
+        if previous is None:
+            species.SPECIES_ID = len(cls._by_id)
+            cls._by_id.append(species)
+        else:
+            species.SPECIES_ID = previous.SPECIES_ID
+            cls._by_id[species.SPECIES_ID] = species
+        cls._by_name[species.__name__] = species
+        cls._sorted = None
+
+    @classmethod
+    def get_by_id(cls, species_id: int):
+        """
+        Returns the species class registered under the given ID.
+
+        Raises:
+            IndexError: If no species has that ID.
+
+        Time Complexity: O(1)
+        """
+        if species_id < 0:
+            raise IndexError(f"No species with ID {species_id}")
+        return cls._by_id[species_id]
+
+    @classmethod
+    def get_by_name(cls, name: str):
+        """
+        Returns the species class with the given (class) name.
+
+        Raises:
+            KeyError: If no species has that name.
+
+        Time Complexity: O(1)
+        """
+        return cls._by_name[name]
+
+    @classmethod
+    def all_species(cls) -> ArrayR:
+        """
+        Returns all registered species sorted by name. The array is built once and
+        shared until a new species is registered, so it must not be modified.
+
+        Time Complexity: O(1), O(n log n) on the first call after a registration
+        """
+        if cls._sorted is None:
+            species = sorted(cls._by_id, key=lambda klass: klass.__name__)
+            cls._sorted = ArrayR(max(len(species), 1))
+            cls._sorted.array[:len(species)] = species
+        return cls._sorted
+
+    @classmethod
+    def count(cls) -> int:
+        """
+        Returns the number of registered species.
+        """
+        return len(cls._by_id)
 
 class Pokemon(ABC): # pylint: disable=too-few-public-methods, too-many-instance-attributes
     """
     Represents a base Pokemon class with properties and methods common to all Pokemon.
+
+    Every subclass is a species and registers itself with SpeciesRegistry.
+
+    Instances are slotted (no per-instance __dict__) and the evolution line is a
+    tuple shared by all the Pokemon of a species, so a species subclass should
+    declare __slots__ = () and set evolution_line as a class attribute. A species
+    that sets BASE_STATS has its Pokemon initialised from that template.
     """
+    __slots__ = ('health', 'level', 'poketype', 'battle_power', 'name', 'experience', 'defence', 'speed')
+    SPECIES_ID = None
+    BASE_STATS = None
+    EVOLUTION_MULTIPLIER = 1.5
+    evolution_line = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        SpeciesRegistry.register(cls)
+
     def __init__(self):
         """
-        Initializes a new instance of the Pokemon class.
-        """
-        self.health = None 
-        self.level = None
-        self.poketype = None
-        self.battle_power = None
-        self.evolution_line = None
-        self.name = None
-        self.experience = None
-        self.defence = None
-        self.speed = None
+        Initializes a new instance of the Pokemon class, from the species' BASE_STATS
+        if it has any.
+        """
+        base = self.BASE_STATS
+        if base is None:
+            self.health = None
+            self.level = None
+            self.poketype = None
+            self.battle_power = None
+            self.name = None
+            self.experience = None
+            self.defence = None
+            self.speed = None
+        else:
+            self.health = base.health
+            self.level = 1
+            self.poketype = base.poketype
+            self.battle_power = base.battle_power
+            self.name = base.name
+            self.experience = 0
+            self.defence = base.defence
+            self.speed = base.speed
 
     def get_name(self) -> str:
         """
@@ -159,7 +447,7 @@ class Pokemon(ABC): # pylint: disable=too-few-public-methods, too-many-instance-
         Returns the evolution line of the Pokemon.
 
         Returns:
-            list: The evolution of the Pokemon.
+            tuple: The evolution of the Pokemon, shared by every Pokemon of its species.
         """
         return self.evolution_line
 
@@ -172,6 +460,33 @@ class Pokemon(ABC): # pylint: disable=too-few-public-methods, too-many-instance-
         """
         return self.battle_power
 
+    def get_stage(self) -> int:
+        """
+        Returns how many times the Pokemon has evolved since it was created.
+
+        Returns:
+            int: The number of evolutions, 0 for a Pokemon that has not evolved.
+        """
+        line = self.evolution_line
+        if self.BASE_STATS is None or self.name not in line or self.BASE_STATS.name not in line:
+            return 0
+        return line.index(self.name) - line.index(self.BASE_STATS.name)
+
+    def reset_health(self) -> None:
+        """
+        Restores the Pokemon to full health for its current evolution stage, i.e. its
+        species' base health scaled once by EVOLUTION_MULTIPLIER per evolution.
+
+        Time Complexity: O(1), as evolution lines have at most three stages
+        """
+        if self.BASE_STATS is None:
+            # A hand-written species without a template: fall back to a fresh instance
+            self.health = type(self)().health
+            for _ in range(self.get_stage()):
+                self.health *= self.EVOLUTION_MULTIPLIER
+        else:
+            self.health = self.BASE_STATS.health_at(self.get_stage(), self.EVOLUTION_MULTIPLIER)
+
     def attack(self, other_pokemon) -> float:
         """
         Calculates and returns the damage that this Pokemon inflicts on the
@@ -223,10 +538,10 @@ class Pokemon(ABC): # pylint: disable=too-few-public-methods, too-many-instance-
                 # Change the name of the Pokemon
                 self.name = next_name
                 # Increase attributes by 1.5 times
-                self.battle_power *= 1.5
-                self.health *= 1.5
-                self.speed *= 1.5
-                self.defence *= 1.5
+                self.battle_power *= self.EVOLUTION_MULTIPLIER
+                self.health *= self.EVOLUTION_MULTIPLIER
+                self.speed *= self.EVOLUTION_MULTIPLIER
+                self.defence *= self.EVOLUTION_MULTIPLIER
 
 
     def is_alive(self) -> bool:
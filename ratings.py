@@ -0,0 +1,363 @@
+"""
+This module contains rating services that keep Elo (EloRatings) or Glicko-2
+(Glicko2Ratings) ratings of trainers up to date from a stream of battle results.
+
+Every result updates the ratings of its two trainers incrementally, so a service only
+keeps one PlayerRating per trainer, however many results it has consumed. A leaderboard
+index, sorted by rating, is kept up to date with every result, and the whole state can
+be snapshotted to a JSON file (periodically, while consuming a stream) and restored
+from it, so that a stream can be resumed where the snapshot was taken.
+"""
+import json
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from math import exp, log, pi, sqrt
+from atomic_file import atomic_write
+from tower import BattleResult
+from tournament import DRAW, FIRST
+
+# The score of the first trainer of a record, by result
+SCORES = {BattleResult.WIN: 1.0, BattleResult.DRAW: 0.5, BattleResult.LOSS: 0.0}
+
+class PlayerRating:
+    """
+    The rating of one trainer and its record.
+    """
+    __slots__ = ('name', 'rating', 'deviation', 'volatility', 'games', 'wins', 'draws', 'losses')
+
+    def __init__(self, name: str, rating: float, deviation: float = 0.0, volatility: float = 0.0) -> None:
+        self.name = name
+        self.rating = rating
+        self.deviation = deviation
+        self.volatility = volatility
+        self.games = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def to_list(self) -> list:
+        """
+        Returns the attributes of the rating, in __slots__ order.
+        """
+        return [getattr(self, attribute) for attribute in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: list) -> 'PlayerRating':
+        """
+        Returns the rating whose attributes were listed by to_list.
+        """
+        player = cls.__new__(cls)
+        for attribute, value in zip(cls.__slots__, values):
+            setattr(player, attribute, value)
+        return player
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.rating:.1f} ({self.wins}W {self.draws}D {self.losses}L)"
+
+class Ratings(ABC):
+    """
+    The base of the rating services: players, leaderboard, stream consumption and
+    snapshots. Subclasses implement the rating update.
+    """
+    SYSTEM = None
+    SNAPSHOT_VERSION = 1
+    _systems = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Only a subclass naming its own system is registered, so one inheriting a
+        # name does not replace the class snapshots of that system are loaded as
+        if cls.__dict__.get('SYSTEM') is not None:
+            Ratings._systems[cls.SYSTEM] = cls
+
+    def __init__(self, initial_rating: float = 1500.0) -> None:
+        self.initial_rating = initial_rating
+        self.players = {}
+        # (-rating, name) of every player, sorted: best first
+        self.leaderboard_index = []
+        # The number of records consumed, i.e. where to resume a stream from a snapshot
+        self.records = 0
+
+    def parameters(self) -> dict:
+        """
+        Returns the parameters of the service, as given to its constructor.
+        """
+        return {'initial_rating': self.initial_rating}
+
+    def get_player(self, name: str) -> PlayerRating:
+        """
+        Returns the rating of a trainer, making it a new player if needed.
+
+        Time Complexity: O(1), O(n) for a new player, where n is the number of players
+        """
+        player = self.players.get(name)
+        if player is None:
+            player = self._new_player(name)
+            self.players[name] = player
+            insort(self.leaderboard_index, (-player.rating, name))
+        return player
+
+    def record(self, trainer_1, trainer_2, result: BattleResult) -> None:
+        """
+        Updates the ratings with the result of a battle, from the point of view of
+        trainer_1. The trainers are Trainers or trainer names.
+
+        Time Complexity: O(log n) comparisons, O(n) moves in the leaderboard index in the
+            worst case, where n is the number of players
+
+        Raises:
+            ValueError: If both trainers have the same name.
+        """
+        name_1, name_2 = _name(trainer_1), _name(trainer_2)
+        if name_1 == name_2:
+            raise ValueError("A trainer cannot be rated against itself.")
+        player_1 = self.get_player(name_1)
+        player_2 = self.get_player(name_2)
+        score = SCORES[result]
+        keys = ((-player_1.rating, player_1.name), (-player_2.rating, player_2.name))
+        self._update(player_1, player_2, score)
+        for player, key, player_score in ((player_1, keys[0], score), (player_2, keys[1], 1.0 - score)):
+            del self.leaderboard_index[bisect_left(self.leaderboard_index, key)]
+            insort(self.leaderboard_index, (-player.rating, player.name))
+            player.games += 1
+            if player_score == 1.0:
+                player.wins += 1
+            elif player_score == 0.0:
+                player.losses += 1
+            else:
+                player.draws += 1
+        self.records += 1
+
+    def consume(self, records, snapshot_file: str = None, snapshot_every: int = 0) -> int:
+        """
+        Updates the ratings with a stream of (trainer_1, trainer_2, BattleResult) records,
+        e.g. tower_records or tournament_records, and returns the number consumed.
+
+        Parameters:
+            records: The records, consumed one at a time.
+            snapshot_file (str): The file to snapshot the ratings to, none if None.
+            snapshot_every (int): The number of records between snapshots; with a
+                snapshot file, a last snapshot is taken at the end of the stream.
+        """
+        consumed = 0
+        for trainer_1, trainer_2, result in records:
+            self.record(trainer_1, trainer_2, result)
+            consumed += 1
+            if snapshot_file is not None and snapshot_every and self.records % snapshot_every == 0:
+                self.snapshot(snapshot_file)
+        if snapshot_file is not None:
+            self.snapshot(snapshot_file)
+        return consumed
+
+    def top(self, count: int = 10) -> list:
+        """
+        Returns the ratings of the count best players, best first.
+
+        Time Complexity: O(count)
+        """
+        return [self.players[name] for _, name in self.leaderboard_index[:count]]
+
+    def rank(self, name: str) -> int:
+        """
+        Returns the rank of a player on the leaderboard, 1 for the best.
+
+        Raises:
+            KeyError: If the player has no rating.
+
+        Time Complexity: O(log n), where n is the number of players
+        """
+        player = self.players[name]
+        return bisect_left(self.leaderboard_index, (-player.rating, name)) + 1
+
+    def format_leaderboard(self, count: int = 10) -> str:
+        """
+        Returns the count best players as a text table.
+        """
+        lines = [f"{'#':>4} {'Trainer':<20} {'Rating':>8} {'W':>5} {'D':>5} {'L':>5}"]
+        for rank, player in enumerate(self.top(count), start=1):
+            lines.append(f"{rank:>4} {player.name:<20} {player.rating:>8.1f} {player.wins:>5} "
+                         f"{player.draws:>5} {player.losses:>5}")
+        return '\n'.join(lines)
+
+    def snapshot(self, filename: str) -> None:
+        """
+        Saves the ratings to a JSON file, atomically.
+        """
+        state = {
+            'version': self.SNAPSHOT_VERSION,
+            'system': self.SYSTEM,
+            'parameters': self.parameters(),
+            'records': self.records,
+            'players': [player.to_list() for player in self.players.values()],
+        }
+        with atomic_write(filename) as file:
+            json.dump(state, file)
+
+    @classmethod
+    def load_snapshot(cls, filename: str) -> 'Ratings':
+        """
+        Restores ratings saved by snapshot, as a service of the rating system they were
+        saved from.
+
+        Raises:
+            ValueError: If the file is not a snapshot of this version.
+        """
+        with open(filename, 'r') as file:
+            state = json.load(file)
+        if state.get('version') != cls.SNAPSHOT_VERSION or state.get('system') not in cls._systems:
+            raise ValueError("Not a ratings snapshot of this version.")
+        ratings = cls._systems[state['system']](**state['parameters'])
+        ratings.records = state['records']
+        for values in state['players']:
+            player = PlayerRating.from_list(values)
+            ratings.players[player.name] = player
+        ratings.leaderboard_index = sorted((-player.rating, player.name) for player in ratings.players.values())
+        return ratings
+
+    def _new_player(self, name: str) -> PlayerRating:
+        return PlayerRating(name, self.initial_rating)
+
+    @abstractmethod
+    def _update(self, player_1: PlayerRating, player_2: PlayerRating, score: float) -> None:
+        """
+        Updates the ratings of both players after a result, score being that of player_1.
+        """
+
+class EloRatings(Ratings):
+    """
+    Elo ratings: after every battle each rating moves by k_factor times the difference
+    between the actual and the expected score.
+    """
+    SYSTEM = "elo"
+
+    def __init__(self, initial_rating: float = 1500.0, k_factor: float = 32.0) -> None:
+        Ratings.__init__(self, initial_rating)
+        self.k_factor = k_factor
+
+    def parameters(self) -> dict:
+        return {'initial_rating': self.initial_rating, 'k_factor': self.k_factor}
+
+    def expected_score(self, rating: float, other_rating: float) -> float:
+        """
+        Returns the expected score of a player against another.
+        """
+        return 1.0 / (1.0 + 10.0 ** ((other_rating - rating) / 400.0))
+
+    def _update(self, player_1: PlayerRating, player_2: PlayerRating, score: float) -> None:
+        change = self.k_factor * (score - self.expected_score(player_1.rating, player_2.rating))
+        player_1.rating += change
+        player_2.rating -= change
+
+class Glicko2Ratings(Ratings):
+    """
+    Glicko-2 ratings (Glickman, 2012). Every battle is treated as a rating period of its
+    own, so the ratings can be updated one result at a time.
+    """
+    SYSTEM = "glicko2"
+    # Converts between the Glicko and the Glicko-2 scales
+    SCALE = 173.7178
+    EPSILON = 0.000001
+
+    def __init__(self, initial_rating: float = 1500.0, initial_deviation: float = 350.0,
+                 initial_volatility: float = 0.06, tau: float = 0.5) -> None:
+        """
+        Parameters:
+            initial_rating (float): The rating of a new player.
+            initial_deviation (float): The rating deviation of a new player.
+            initial_volatility (float): The volatility of a new player.
+            tau (float): How much the volatility can change, typically 0.3 to 1.2.
+        """
+        Ratings.__init__(self, initial_rating)
+        self.initial_deviation = initial_deviation
+        self.initial_volatility = initial_volatility
+        self.tau = tau
+
+    def parameters(self) -> dict:
+        return {'initial_rating': self.initial_rating, 'initial_deviation': self.initial_deviation,
+                'initial_volatility': self.initial_volatility, 'tau': self.tau}
+
+    def _new_player(self, name: str) -> PlayerRating:
+        return PlayerRating(name, self.initial_rating, self.initial_deviation, self.initial_volatility)
+
+    def _update(self, player_1: PlayerRating, player_2: PlayerRating, score: float) -> None:
+        state_1 = (player_1.rating, player_1.deviation, player_1.volatility)
+        state_2 = (player_2.rating, player_2.deviation, player_2.volatility)
+        self._update_player(player_1, state_2, score)
+        self._update_player(player_2, state_1, 1.0 - score)
+
+    def _update_player(self, player: PlayerRating, opponent: tuple, score: float) -> None:
+        """
+        Updates the rating of a player after a game against an opponent, given as its
+        (rating, deviation, volatility) before the game.
+        """
+        mu = (player.rating - 1500.0) / self.SCALE
+        phi = player.deviation / self.SCALE
+        sigma = player.volatility
+        opponent_mu = (opponent[0] - 1500.0) / self.SCALE
+        opponent_phi = opponent[1] / self.SCALE
+        g = 1.0 / sqrt(1.0 + 3.0 * opponent_phi * opponent_phi / (pi * pi))
+        expected = 1.0 / (1.0 + exp(-g * (mu - opponent_mu)))
+        variance = 1.0 / (g * g * expected * (1.0 - expected))
+        delta = variance * g * (score - expected)
+        sigma = self._new_volatility(phi, sigma, variance, delta)
+        phi_star = sqrt(phi * phi + sigma * sigma)
+        phi = 1.0 / sqrt(1.0 / (phi_star * phi_star) + 1.0 / variance)
+        mu += phi * phi * g * (score - expected)
+        player.rating = self.SCALE * mu + 1500.0
+        player.deviation = self.SCALE * phi
+        player.volatility = sigma
+
+    def _new_volatility(self, phi: float, sigma: float, variance: float, delta: float) -> float:
+        """
+        Returns the new volatility, found with the Illinois algorithm (step 5 of Glicko-2).
+        """
+        a = log(sigma * sigma)
+        tau = self.tau
+
+        def f(x):
+            ex = exp(x)
+            numerator = ex * (delta * delta - phi * phi - variance - ex)
+            denominator = 2.0 * (phi * phi + variance + ex) ** 2
+            return numerator / denominator - (x - a) / (tau * tau)
+
+        x_a = a
+        if delta * delta > phi * phi + variance:
+            x_b = log(delta * delta - phi * phi - variance)
+        else:
+            k = 1
+            while f(a - k * tau) < 0:
+                k += 1
+            x_b = a - k * tau
+        f_a, f_b = f(x_a), f(x_b)
+        while abs(x_b - x_a) > self.EPSILON:
+            x_c = x_a + (x_a - x_b) * f_a / (f_b - f_a)
+            f_c = f(x_c)
+            if f_c * f_b <= 0:
+                x_a, f_a = x_b, f_b
+            else:
+                f_a /= 2.0
+            x_b, f_b = x_c, f_c
+        return exp(x_a / 2.0)
+
+def _name(trainer) -> str:
+    """
+    Returns the name of a Trainer, or the name itself.
+    """
+    return trainer if isinstance(trainer, str) else trainer.get_name()
+
+def tower_records(tower):
+    """
+    Fights the remaining battles of a BattleTower and yields a (player, enemy name,
+    result) record for each one.
+    """
+    for record in tower.run():
+        yield tower.my_trainer, record.enemy, record.result
+
+def tournament_records(tournament, start: int = 0):
+    """
+    Yields a (trainer name, trainer name, result) record for every match of a Tournament
+    played so far, from the match at index start. The tournament must keep its matches.
+    """
+    for _, first, second, _, winner in tournament.matches[start:]:
+        result = BattleResult.DRAW if winner == DRAW else BattleResult.WIN if winner == FIRST else BattleResult.LOSS
+        yield tournament.specs[first][0], tournament.specs[second][0], result
@@ -0,0 +1,22 @@
+"""
+This module contains helpers to give every unit of a simulation (a battle, a tower, a
+shard of work...) its own random number generator. The generator of a unit depends
+only on the base seed and the unit's keys, not on what other units drew, so a sharded
+run gives bit-identical results to a serial one.
+"""
+import random
+
+def derive_seed(seed: int, *keys) -> int:
+    """
+    Returns a 63-bit seed derived from a base seed and any number of keys, such as a
+    round number or the indices of a pairing.
+
+    Time Complexity: O(k), where k is the number of keys
+    """
+    return random.Random(":".join(str(part) for part in (seed,) + keys)).getrandbits(63)
+
+def spawn_rng(seed: int, *keys) -> random.Random:
+    """
+    Returns a new random.Random seeded with derive_seed(seed, *keys).
+    """
+    return random.Random(derive_seed(seed, *keys))
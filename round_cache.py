@@ -0,0 +1,108 @@
+"""
+This module contains RoundCache, a bounded least-recently-used cache of battle round
+outcomes. A battle round is deterministic: its outcome only depends on the two Pokemon
+and on both trainers' pokedex completion, so a round fought again from the same state
+can be replayed from the cache instead of being fought.
+"""
+from collections import OrderedDict
+from typing import NamedTuple
+from pokemon_base import Pokemon
+
+# Which Pokemon of a round won it
+NO_WINNER = 0
+FIRST = 1
+SECOND = 2
+
+class RoundOutcome(NamedTuple):
+    """
+    The outcome of a battle round: both Pokemon's health at the end of the round, after
+    the winner levelled up (and possibly evolved), and which of them won. The healths are stored as they are rather than
+    as deltas, so that replaying a round gives exactly the same (float) health.
+    """
+    health_1: float
+    health_2: float
+    winner: int
+
+class RoundCache:
+    """
+    A bounded LRU cache of battle round outcomes, which can be shared by any number of
+    battles (see Battle).
+    """
+    DEFAULT_MAXSIZE = 4096
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE) -> None:
+        """
+        Parameters:
+            maxsize (int): The number of outcomes kept; the least recently used one is
+                evicted beyond that.
+
+        Raises:
+            ValueError: If maxsize is not positive.
+        """
+        if maxsize <= 0:
+            raise ValueError("The size of a round cache must be positive.")
+        self.maxsize = maxsize
+        self.outcomes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(pokemon_1: Pokemon, pokemon_2: Pokemon, completion_1: float,
+                 completion_2: float) -> tuple:
+        """
+        Returns the key of a round: the state of both Pokemon and both completions.
+
+        Time Complexity: O(1)
+        """
+        return (type(pokemon_1), pokemon_1.name, pokemon_1.level, pokemon_1.health,
+                pokemon_1.battle_power, pokemon_1.defence, pokemon_1.speed,
+                type(pokemon_2), pokemon_2.name, pokemon_2.level, pokemon_2.health,
+                pokemon_2.battle_power, pokemon_2.defence, pokemon_2.speed,
+                completion_1, completion_2)
+
+    def get(self, key: tuple):
+        """
+        Returns the outcome stored for a key, or None, and counts the hit or miss.
+
+        Time Complexity: O(1)
+        """
+        outcome = self.outcomes.get(key)
+        if outcome is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.outcomes.move_to_end(key)
+        return outcome
+
+    def put(self, key: tuple, outcome: RoundOutcome) -> None:
+        """
+        Stores the outcome of a round, evicting the least recently used one if full.
+
+        Time Complexity: O(1)
+        """
+        self.outcomes[key] = outcome
+        self.outcomes.move_to_end(key)
+        if len(self.outcomes) > self.maxsize:
+            self.outcomes.popitem(last=False)
+
+    def hit_rate(self) -> float:
+        """
+        Returns the fraction of lookups that were hits, 0 before any lookup.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """
+        Removes every outcome and resets the counters.
+        """
+        self.outcomes.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.outcomes)
+
+    def __str__(self) -> str:
+        return (f"RoundCache: {len(self)}/{self.maxsize} outcomes, {self.hits} hits, "
+                f"{self.misses} misses ({self.hit_rate():.1%})")
@@ -0,0 +1,264 @@
+"""
+This module contains TeamColumns, a columnar (struct-of-arrays) representation of Pokemon
+teams for bulk simulation: every attribute of every Pokemon is kept in one contiguous
+array, instead of in one object per Pokemon.
+"""
+import struct
+import sys
+from array import array
+from battle_mode import BattleMode
+from poke_team import PokeTeam
+from pokemon_base import Pokemon, PokeType, SpeciesRegistry
+from data_structures.stack_adt import ArrayStack
+from data_structures.queue_adt import CircularQueue
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.sorted_list_adt import ListItem
+
+try:
+    import numpy as np
+except ImportError: # NumPy is optional, the columns are plain arrays
+    np = None
+
+class TeamColumns:
+    """
+    A roster of Pokemon stored column by column, grouped into teams.
+
+    Row r of every column describes one Pokemon. Team t owns the rows
+    team_starts[t] to team_starts[t+1] - 1, in the order of its team structure (see
+    PokeTeam.members). The stat columns are doubles; int_stats remembers, one bit per
+    stat, which stats were integers so that Pokemon come back exactly as they went in.
+    """
+    STAT_COLUMNS = ('health', 'battle_power', 'defence', 'speed')
+    # Serialised form: <number of rows, number of teams>, then every column and team_starts
+    SIZE_HEADER = struct.Struct('<II')
+    # Type codes of every column, as used by array and by NumPy
+    COLUMN_TYPES = {
+        'species': ('i', 'int32'),
+        'stage': ('b', 'int8'),
+        'poketype': ('b', 'int8'),
+        'level': ('i', 'int32'),
+        'experience': ('i', 'int32'),
+        'health': ('d', 'float64'),
+        'battle_power': ('d', 'float64'),
+        'defence': ('d', 'float64'),
+        'speed': ('d', 'float64'),
+        'int_stats': ('B', 'uint8'),
+    }
+
+    def __init__(self) -> None:
+        """
+        Creates an empty roster.
+        """
+        for column, (typecode, _) in self.COLUMN_TYPES.items():
+            setattr(self, column, array(typecode))
+        self.team_starts = array('i', [0])
+
+    @classmethod
+    def from_teams(cls, teams) -> 'TeamColumns':
+        """
+        Builds a roster holding the given PokeTeams, in order.
+
+        Time Complexity: O(n), where n is the total number of Pokemon
+        """
+        columns = cls()
+        for team in teams:
+            columns.add_team(team)
+        return columns
+
+    @classmethod
+    def from_pokemon(cls, pokemon) -> 'TeamColumns':
+        """
+        Builds a roster holding a single team made of the given Pokemon, in order.
+
+        Time Complexity: O(n), where n is the number of Pokemon
+        """
+        columns = cls()
+        for member in pokemon:
+            columns.add_pokemon(member)
+        columns.end_team()
+        return columns
+
+    def __len__(self) -> int:
+        """
+        Returns the number of Pokemon (rows) in the roster.
+        """
+        return len(self.species)
+
+    def team_count(self) -> int:
+        """
+        Returns the number of complete teams in the roster.
+        """
+        return len(self.team_starts) - 1
+
+    def team_rows(self, team_index: int) -> range:
+        """
+        Returns the rows of a team, in the order of its team structure.
+        """
+        return range(self.team_starts[team_index], self.team_starts[team_index + 1])
+
+    def add_pokemon(self, pokemon: Pokemon) -> int:
+        """
+        Appends a Pokemon to the team being built and returns its row.
+
+        Time Complexity: O(1) amortised
+        """
+        self.species.append(pokemon.SPECIES_ID)
+        self.stage.append(pokemon.get_stage())
+        self.poketype.append(pokemon.get_poketype().value)
+        self.level.append(pokemon.get_level())
+        self.experience.append(pokemon.get_experience())
+        int_stats = 0
+        for bit, column in enumerate(self.STAT_COLUMNS):
+            value = getattr(pokemon, column)
+            getattr(self, column).append(value)
+            if isinstance(value, int):
+                int_stats |= 1 << bit
+        self.int_stats.append(int_stats)
+        return len(self.species) - 1
+
+    def end_team(self) -> int:
+        """
+        Closes the team being built, i.e. the Pokemon added since the last team, and
+        returns its index.
+        """
+        self.team_starts.append(len(self.species))
+        return len(self.team_starts) - 2
+
+    def add_team(self, team: PokeTeam) -> int:
+        """
+        Appends every Pokemon of a PokeTeam as a new team and returns its index.
+
+        Time Complexity: O(n), where n is the size of the team
+        """
+        for pokemon in team.members():
+            self.add_pokemon(pokemon)
+        return self.end_team()
+
+    def store_pokemon(self, row: int, pokemon: Pokemon) -> None:
+        """
+        Overwrites the changing state (stats, level, stage) of a row with that of a Pokemon.
+
+        Time Complexity: O(1)
+        """
+        self.stage[row] = pokemon.get_stage()
+        self.level[row] = pokemon.get_level()
+        self.experience[row] = pokemon.get_experience()
+        int_stats = 0
+        for bit, column in enumerate(self.STAT_COLUMNS):
+            value = getattr(pokemon, column)
+            getattr(self, column)[row] = value
+            if isinstance(value, int):
+                int_stats |= 1 << bit
+        self.int_stats[row] = int_stats
+
+    def to_pokemon(self, row: int) -> Pokemon:
+        """
+        Creates the Pokemon object described by a row.
+
+        Time Complexity: O(1)
+        """
+        pokemon = SpeciesRegistry.get_by_id(self.species[row])()
+        stage = self.stage[row]
+        if stage:
+            line = pokemon.evolution_line
+            pokemon.name = line[line.index(pokemon.name) + stage]
+        pokemon.poketype = PokeType(self.poketype[row])
+        pokemon.level = self.level[row]
+        pokemon.experience = self.experience[row]
+        int_stats = self.int_stats[row]
+        for bit, column in enumerate(self.STAT_COLUMNS):
+            value = getattr(self, column)[row]
+            setattr(pokemon, column, int(value) if int_stats >> bit & 1 else value)
+        return pokemon
+
+    def to_team(self, team_index: int, battle_mode: BattleMode = BattleMode.SET,
+                criterion: str = "health") -> PokeTeam:
+        """
+        Creates a PokeTeam with the Pokemon of a team, in the team structure used by the
+        battle mode: a stack for SET, a queue for ROTATE and a list sorted by the
+        criterion for OPTIMISE. The rows are assumed to be in that structure's order.
+
+        Time Complexity: O(n), where n is the size of the team
+        """
+        rows = self.team_rows(team_index)
+        team = PokeTeam()
+        team.team_count = len(rows)
+        if battle_mode == BattleMode.SET:
+            team.team = ArrayStack(max(team.TEAM_LIMIT, len(rows)))
+            for row in rows:
+                team.team.push(self.to_pokemon(row))
+        elif battle_mode == BattleMode.ROTATE:
+            team.team = CircularQueue(max(team.TEAM_LIMIT, len(rows)))
+            for row in rows:
+                team.team.append(self.to_pokemon(row))
+        elif battle_mode == BattleMode.OPTIMISE:
+            # The rows are already sorted, place them as they are to keep ties in order
+            team.team = ArraySortedList(max(team.TEAM_LIMIT, len(rows)))
+            for i, row in enumerate(rows):
+                pokemon = self.to_pokemon(row)
+                team.team.array[i] = ListItem(pokemon, getattr(pokemon, criterion))
+            team.team.length = len(rows)
+        else:
+            raise ValueError("Invalid battle mode.")
+        return team
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns the roster as bytes: a size header followed by the raw little-endian
+        contents of every column, in COLUMN_TYPES order, and of team_starts.
+
+        Time Complexity: O(n), where n is the number of Pokemon
+        """
+        chunks = [self.SIZE_HEADER.pack(len(self), self.team_count())]
+        for column in list(self.COLUMN_TYPES) + ['team_starts']:
+            values = getattr(self, column)
+            if sys.byteorder == 'big':
+                values = array(values.typecode, values)
+                values.byteswap()
+            chunks.append(values.tobytes())
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data, offset: int = 0):
+        """
+        Reads a roster written by to_bytes from data, starting at offset. Returns the
+        roster and the offset just past it.
+
+        Raises:
+            ValueError: If data is too short.
+
+        Time Complexity: O(n), where n is the number of Pokemon
+        """
+        if len(data) < offset + cls.SIZE_HEADER.size:
+            raise ValueError("Truncated team columns.")
+        rows, teams = cls.SIZE_HEADER.unpack_from(data, offset)
+        offset += cls.SIZE_HEADER.size
+        columns = cls()
+        for column in list(cls.COLUMN_TYPES) + ['team_starts']:
+            values = getattr(columns, column)
+            count = teams + 1 if column == 'team_starts' else rows
+            end = offset + count * values.itemsize
+            if len(data) < end:
+                raise ValueError("Truncated team columns.")
+            values = array(values.typecode, bytes(data[offset:end]))
+            if sys.byteorder == 'big':
+                values.byteswap()
+            setattr(columns, column, values)
+            offset = end
+        return columns, offset
+
+    def as_numpy(self) -> dict:
+        """
+        Returns zero-copy NumPy views of every column (and of team_starts), keyed by
+        column name. The views are invalidated by adding Pokemon or teams.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError("TeamColumns.as_numpy requires NumPy")
+        views = {}
+        for column, (_, dtype) in self.COLUMN_TYPES.items():
+            views[column] = np.frombuffer(getattr(self, column), dtype=dtype)
+        views['team_starts'] = np.frombuffer(self.team_starts, dtype='int32')
+        return views
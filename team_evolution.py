@@ -0,0 +1,252 @@
+"""
+This module contains TeamEvolution, a genetic algorithm evolving a population of teams
+that do well against a sample of opponents, e.g. to generate strong enemy rosters for
+BattleTower.
+
+Every generation the population is scored against the opponents (see
+team_search.score_team) in a pool of worker processes, and the next generation is
+made of the best teams (the elite) and of children bred by tournament selection,
+one-point crossover and mutation. Battles between new Pokemon are deterministic, so
+every team is only ever scored once: scores are cached by canonical team.
+
+The state of an evolution (settings, opponents, population, scores, generation and
+random state) can be saved to a JSON checkpoint and resumed from it.
+"""
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from atomic_file import atomic_write
+from battle_mode import BattleMode
+from executors import NoExecutor
+from poke_team import PokeTeam, Trainer
+from pokemon import get_all_pokemon_types
+from round_cache import RoundCache
+from team_search import Score, battle_order, score_team, _init_worker
+
+class TeamEvolution:
+    """
+    A genetic algorithm over teams, i.e. over team specs (see PokeTeam.to_spec).
+    """
+    CHECKPOINT_VERSION = 2
+
+    def __init__(self, battle_mode: BattleMode, population_size: int = 50, opponents=None,
+                 opponent_count: int = 16, criterion: str = "health", elite: int = 2,
+                 tournament_size: int = 3, crossover_rate: float = 0.9, mutation_rate: float = 0.1,
+                 team_size: int = PokeTeam.TEAM_LIMIT, seed: int = 0, max_workers: int = None) -> None:
+        """
+        Parameters:
+            battle_mode (BattleMode): The mode of every battle.
+            population_size (int): The number of teams in every generation.
+            opponents: The trainers the teams are scored against; opponent_count random
+                teams if None.
+            opponent_count (int): The number of random opponents drawn if opponents is None.
+            criterion (str): The criterion of OPTIMISE battles.
+            elite (int): The number of best teams carried over to the next generation.
+            tournament_size (int): The number of teams competing to be chosen as a parent.
+            crossover_rate (float): The probability that a child mixes two parents.
+            mutation_rate (float): The probability that each Pokemon of a child is replaced
+                by a random species.
+            team_size (int): The size of the teams.
+            seed (int): The seed of the random generator of the evolution.
+            max_workers (int): The number of worker processes, as many as CPUs if None.
+                With 0 the teams are scored in this process.
+
+        Raises:
+            ValueError: If the sizes are inconsistent.
+        """
+        if population_size <= 0 or team_size <= 0 or not 0 <= elite <= population_size \
+                or tournament_size <= 0:
+            raise ValueError("Invalid population, team, elite or tournament size.")
+        all_species = get_all_pokemon_types()
+        self.species_ids = [all_species[i].SPECIES_ID for i in range(len(all_species))]
+        self.battle_mode = battle_mode
+        self.population_size = population_size
+        self.criterion = criterion
+        self.elite = elite
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.team_size = team_size
+        self.max_workers = max_workers
+        self.rng = random.Random(seed)
+        if opponents is None:
+            self.opponents = [(f"Opponent_{i + 1}", self._random_team(), 0) for i in range(opponent_count)]
+        else:
+            self.opponents = [opponent.to_spec() for opponent in opponents]
+        self.population = [self._random_team() for _ in range(population_size)]
+        self.generation = 0
+        # Scores by canonical team, and the best score and mean points of every generation
+        self.scores = {}
+        self.history = []
+
+    def evolve(self, generations: int, checkpoint: str = None, checkpoint_every: int = 1) -> Score:
+        """
+        Evolves the population for the given number of generations and returns the best
+        score of the last one.
+
+        Parameters:
+            generations (int): The number of generations to breed.
+            checkpoint (str): The file to save checkpoints to, none are saved if None.
+            checkpoint_every (int): The number of generations between checkpoints.
+        """
+        with self._executor() as executor:
+            for _ in range(generations):
+                self._score_population(executor)
+                ranked = self._ranked()
+                best = self.scores[self._canonical(ranked[0])]
+                points = [self.scores[self._canonical(team)].points for team in self.population]
+                self.history.append((best, sum(points) / len(points)))
+                self.population = ranked[:self.elite] + [self._breed(ranked)
+                                                         for _ in range(self.population_size - self.elite)]
+                self.generation += 1
+                if checkpoint is not None and self.generation % checkpoint_every == 0:
+                    self.save_checkpoint(checkpoint)
+            self._score_population(executor)
+        return self.best()[1]
+
+    def best(self, count: int = 1):
+        """
+        Returns the best team (spec) of the current population and its score, or a list
+        of the count best ones if count is not 1. Teams not scored yet are ignored.
+        """
+        scored = [team for team in self._ranked() if self._canonical(team) in self.scores]
+        ranked = [(team, self.scores[self._canonical(team)]) for team in scored]
+        return ranked[0] if count == 1 else ranked[:count]
+
+    def to_trainers(self, count: int, prefix: str = "Enemy", rng=None) -> list:
+        """
+        Returns new trainers with the count best distinct teams of the population, e.g. as
+        the enemies of a BattleTower.
+        """
+        teams = []
+        for team, _ in self.best(len(self.population)):
+            if team not in teams:
+                teams.append(team)
+        return [Trainer.from_spec((f"{prefix}_{i + 1}", team, 0), rng) for i, team in enumerate(teams[:count])]
+
+    def save_checkpoint(self, filename: str) -> None:
+        """
+        Saves the state of the evolution to a JSON file, atomically.
+        """
+        state = {
+            'version': self.CHECKPOINT_VERSION,
+            'settings': {
+                'battle_mode': self.battle_mode.value, 'population_size': self.population_size,
+                'criterion': self.criterion, 'elite': self.elite, 'tournament_size': self.tournament_size,
+                'crossover_rate': self.crossover_rate, 'mutation_rate': self.mutation_rate,
+                'team_size': self.team_size,
+            },
+            'species_ids': self.species_ids,
+            'opponents': self.opponents,
+            'population': self.population,
+            'generation': self.generation,
+            'scores': [[list(team), list(score)] for team, score in self.scores.items()],
+            'history': [[list(best), mean] for best, mean in self.history],
+            'rng': self.rng.getstate(),
+        }
+        with atomic_write(filename) as file:
+            json.dump(state, file)
+
+    @classmethod
+    def load_checkpoint(cls, filename: str, max_workers: int = None) -> 'TeamEvolution':
+        """
+        Resumes an evolution from a checkpoint saved by save_checkpoint.
+
+        Raises:
+            ValueError: If the file is not a checkpoint of this version.
+        """
+        with open(filename, 'r') as file:
+            state = json.load(file)
+        if state.get('version') != cls.CHECKPOINT_VERSION:
+            raise ValueError("Not a team evolution checkpoint of this version.")
+        settings = state['settings']
+        settings['battle_mode'] = BattleMode(settings['battle_mode'])
+        evolution = cls(population_size=1, opponents=[], elite=0, max_workers=max_workers,
+                        battle_mode=settings['battle_mode'])
+        for name, value in settings.items():
+            setattr(evolution, name, value)
+        evolution.species_ids = state['species_ids']
+        evolution.opponents = [(name, tuple(team), pokedex) for name, team, pokedex in state['opponents']]
+        evolution.population = [tuple(team) for team in state['population']]
+        evolution.generation = state['generation']
+        evolution.scores = {tuple(team): Score(*score) for team, score in state['scores']}
+        evolution.history = [(Score(*best), mean) for best, mean in state['history']]
+        version, internal, gauss = state['rng']
+        evolution.rng.setstate((version, tuple(internal), gauss))
+        return evolution
+
+    def _random_team(self) -> tuple:
+        """
+        Returns a team of random species.
+        """
+        return tuple(self.rng.choice(self.species_ids) for _ in range(self.team_size))
+
+    def _canonical(self, team: tuple) -> tuple:
+        """
+        Returns the key a team is cached under, its battle order (see battle_order).
+        """
+        return battle_order(team, self.battle_mode, self.criterion)
+
+    def _ranked(self) -> list:
+        """
+        Returns the population sorted from best to worst, unscored teams last.
+        """
+        def key(team):
+            score = self.scores.get(self._canonical(team))
+            return (0,) if score is None else (1,) + score.rank_key()
+        return sorted(self.population, key=key, reverse=True)
+
+    def _breed(self, ranked: list) -> tuple:
+        """
+        Returns a child of two parents chosen by tournament selection.
+        """
+        child = list(self._select(ranked))
+        if self.rng.random() < self.crossover_rate:
+            other = self._select(ranked)
+            point = self.rng.randint(1, self.team_size - 1) if self.team_size > 1 else 0
+            child[point:] = other[point:]
+        for i in range(self.team_size):
+            if self.rng.random() < self.mutation_rate:
+                child[i] = self.rng.choice(self.species_ids)
+        return tuple(child)
+
+    def _select(self, ranked: list) -> tuple:
+        """
+        Returns the best of tournament_size random teams; ranked is the population from
+        best to worst, so the best team is the one with the smallest index.
+        """
+        return ranked[min(self.rng.randrange(len(ranked)) for _ in range(self.tournament_size))]
+
+    def _score_population(self, executor) -> None:
+        """
+        Scores, in parallel, the teams of the population that have not been scored yet.
+        """
+        keys = []
+        tasks = []
+        queued = set()
+        for team in self.population:
+            key = self._canonical(team)
+            if key not in self.scores and key not in queued:
+                queued.add(key)
+                keys.append(key)
+                tasks.append((team, self.criterion))
+        if executor is None:
+            scores = map(score_team, tasks)
+        else:
+            workers = self.max_workers or os.cpu_count() or 1
+            scores = executor.map(score_team, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+        for key, score in zip(keys, scores):
+            self.scores[key] = score
+
+    def _executor(self):
+        """
+        Returns the process pool to score the teams in, or a context holding None to
+        score them in this process.
+        """
+        arguments = (self.opponents, self.battle_mode.value, RoundCache.DEFAULT_MAXSIZE)
+        if self.max_workers == 0:
+            _init_worker(*arguments)
+            return NoExecutor()
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                   initargs=arguments)
@@ -0,0 +1,208 @@
+"""
+This module contains TeamSearch, a beam search for the team (species, order and, in
+OPTIMISE battles, sorting criterion) that does best against a pool of opponents.
+
+Teams are built one Pokemon at a time. At every step each team of the beam is extended
+with every species, the extensions are scored by battling every opponent, and the best
+beam_width of them are kept. Battles between new Pokemon are deterministic, so the
+score of every team is memoized, and every worker process keeps a RoundCache so that
+the rounds the candidate teams have in common are only fought once. The candidates of
+a step are scored in parallel in a pool of worker processes.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+from battle import Battle
+from battle_mode import BattleMode
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.sorted_list_adt import ListItem
+from executors import NoExecutor
+from poke_team import PokeTeam, Trainer
+from pokemon import get_all_pokemon_types
+from pokemon_base import SpeciesRegistry
+from round_cache import RoundCache
+
+class Score(NamedTuple):
+    """
+    The record of a team against the opponent pool. A win is worth 1 point and a draw
+    0.5; opponents_left, the number of opponent Pokemon left standing over all battles,
+    breaks ties.
+    """
+    points: float
+    wins: int
+    draws: int
+    losses: int
+    opponents_left: int
+
+    def rank_key(self) -> tuple:
+        """
+        Returns the key ordering scores from worst to best.
+        """
+        return self.points, -self.opponents_left
+
+class SearchResult(NamedTuple):
+    """
+    The best team found: its spec (species IDs in team order, see PokeTeam.to_spec),
+    the criterion to use in OPTIMISE battles (None in other modes) and its score,
+    along with the number of teams scored and the time the search took.
+    """
+    spec: tuple
+    criterion: str
+    score: Score
+    evaluations: int
+    seconds: float
+
+    def to_trainer(self, name: str, rng=None) -> Trainer:
+        """
+        Returns a new trainer with the team found.
+        """
+        return Trainer.from_spec((name, self.spec, 0), rng)
+
+def battle_order(spec: tuple, battle_mode: BattleMode, criterion: str) -> tuple:
+    """
+    Returns the species IDs of a team in the order it fights in, the key its score is
+    memoized under: teams with the same battle order fight the same battles. In
+    OPTIMISE battles the team is sorted by the criterion exactly as
+    PokeTeam.assemble_team does, so ties on the criterion keep the order the sorted
+    list puts them in and teams differing only in how they order ties stay apart.
+
+    Time Complexity: O(n log n), O(n^2) in the worst case, where n is the team size
+    """
+    if battle_mode != BattleMode.OPTIMISE:
+        return tuple(spec)
+    ordered = ArraySortedList(len(spec))
+    for species_id in spec:
+        pokemon = SpeciesRegistry.get_by_id(species_id)()
+        ordered.add(ListItem(species_id, getattr(pokemon, criterion or "health")))
+    return tuple(ordered[i].value for i in range(len(ordered)))
+
+# State of a worker process, set by _init_worker
+_worker_opponents = None
+_worker_battle_mode = None
+_worker_round_cache = None
+
+def _init_worker(opponents, battle_mode: int, round_cache_size: int) -> None:
+    """
+    Stores the opponent pool and the battle mode in a worker process.
+    """
+    global _worker_opponents, _worker_battle_mode, _worker_round_cache
+    _worker_opponents = opponents
+    _worker_battle_mode = BattleMode(battle_mode)
+    _worker_round_cache = RoundCache(round_cache_size)
+
+def score_team(task) -> Score:
+    """
+    Scores a team against the opponent pool of the worker. The task is a tuple
+    (team spec, criterion).
+    """
+    spec, criterion = task
+    wins = draws = opponents_left = 0
+    for opponent in _worker_opponents:
+        trainer = Trainer.from_spec(("Candidate", spec, 0))
+        enemy = Trainer.from_spec(opponent)
+        battle = Battle(trainer, enemy, _worker_battle_mode, criterion or "health",
+                        round_cache=_worker_round_cache)
+        battle._create_teams()
+        winner = battle.commence_battle()
+        if winner is trainer:
+            wins += 1
+        elif winner is None:
+            draws += 1
+        opponents_left += len(enemy.get_team().team)
+    return Score(wins + 0.5 * draws, wins, draws, len(_worker_opponents) - wins - draws, opponents_left)
+
+class TeamSearch:
+    """
+    A beam search for the best team against a pool of opponents.
+    """
+    def __init__(self, opponents, battle_mode: BattleMode, beam_width: int = 8,
+                 team_size: int = PokeTeam.TEAM_LIMIT, species=None, criteria=None,
+                 max_workers: int = None, round_cache_size: int = RoundCache.DEFAULT_MAXSIZE) -> None:
+        """
+        Parameters:
+            opponents: The opponent trainers, with their teams picked.
+            battle_mode (BattleMode): The mode of every battle.
+            beam_width (int): The number of teams kept at every step.
+            team_size (int): The size of the team searched for.
+            species: The species to build teams from, every species if None.
+            criteria: The criteria tried in OPTIMISE battles, PokeTeam.CRITERION_LIST if None.
+            max_workers (int): The number of worker processes, as many as CPUs if None.
+                With 0 the teams are scored in this process.
+            round_cache_size (int): The size of the round cache of every worker.
+
+        Raises:
+            ValueError: If beam_width or team_size is not positive.
+        """
+        if beam_width <= 0 or team_size <= 0:
+            raise ValueError("The beam width and the team size must be positive.")
+        if species is None:
+            all_species = get_all_pokemon_types()
+            species = [all_species[i] for i in range(len(all_species))]
+        self.opponents = [opponent.to_spec() for opponent in opponents]
+        self.battle_mode = battle_mode
+        self.beam_width = beam_width
+        self.team_size = team_size
+        self.species_ids = [klass.SPECIES_ID for klass in species]
+        if battle_mode == BattleMode.OPTIMISE:
+            self.criteria = list(PokeTeam.CRITERION_LIST if criteria is None else criteria)
+        else:
+            self.criteria = [None]
+        self.max_workers = max_workers
+        self.round_cache_size = round_cache_size
+        # Memoized scores, by battle order and criterion (see _canonical)
+        self.scores = {}
+
+    def search(self) -> SearchResult:
+        """
+        Runs the search and returns the best team found.
+        """
+        start = time.perf_counter()
+        with self._executor() as executor:
+            beam = [((), criterion) for criterion in self.criteria]
+            for _ in range(self.team_size):
+                # The first team found with each key stands for all the teams sharing it
+                candidates = {}
+                for spec, criterion in beam:
+                    for species_id in self.species_ids:
+                        candidate = (spec + (species_id,), criterion)
+                        candidates.setdefault(self._canonical(*candidate), candidate)
+                self._score_all(executor, candidates)
+                beam = sorted(candidates.values(), reverse=True,
+                              key=lambda candidate: self.scores[self._canonical(*candidate)].rank_key())
+                beam = beam[:self.beam_width]
+        spec, criterion = beam[0]
+        return SearchResult(spec, criterion, self.scores[self._canonical(spec, criterion)],
+                            len(self.scores), time.perf_counter() - start)
+
+    def _canonical(self, spec: tuple, criterion: str) -> tuple:
+        """
+        Returns the key of a team: its battle order (see battle_order) and criterion.
+        """
+        return battle_order(spec, self.battle_mode, criterion), criterion
+
+    def _score_all(self, executor, candidates: dict) -> None:
+        """
+        Scores, in parallel, the candidates (teams by key) that have not been scored yet.
+        """
+        keys = [key for key in candidates if key not in self.scores]
+        tasks = [candidates[key] for key in keys]
+        if executor is None:
+            scores = map(score_team, tasks)
+        else:
+            workers = self.max_workers or os.cpu_count() or 1
+            scores = executor.map(score_team, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+        for key, score in zip(keys, scores):
+            self.scores[key] = score
+
+    def _executor(self):
+        """
+        Returns the process pool to score the teams in, or a context holding None to
+        score them in this process.
+        """
+        arguments = (self.opponents, self.battle_mode.value, self.round_cache_size)
+        if self.max_workers == 0:
+            _init_worker(*arguments)
+            return NoExecutor()
+        return ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                   initargs=arguments)
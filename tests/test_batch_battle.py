@@ -0,0 +1,111 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from unittest.mock import patch
+from io import StringIO
+import random
+from poke_team import Trainer, PokeTeam
+from battle import Battle
+from battle_mode import BattleMode
+from batch_battle import BatchBattle, DRAW, np
+from pokemon import Pikachu, Snorlax
+
+class TestBatchBattle(unittest.TestCase):
+    DEFAULT_SEED = 20
+    BATTLES = 40
+
+    def __create_pairs(self):
+        random.seed(TestBatchBattle.DEFAULT_SEED)
+        pairs = []
+        with patch('sys.stdout', new=StringIO()):
+            for i in range(TestBatchBattle.BATTLES):
+                trainer1 = Trainer(f'Gary_{i}')
+                trainer2 = Trainer(f'Ash_{i}')
+                trainer1.pick_team("Random")
+                trainer2.pick_team("Random")
+                pairs.append((trainer1, trainer2))
+        return pairs
+
+    def __expected(self, battle_mode: BattleMode, criterion: str):
+        winners = []
+        completions = []
+        for trainer1, trainer2 in self.__create_pairs():
+            battle = Battle(trainer1, trainer2, battle_mode, criterion)
+            battle._create_teams()
+            winner = battle.commence_battle()
+            winners.append(DRAW if winner is None else 1 if winner is trainer1 else 2)
+            completions.append(trainer1.pokedex.elems)
+        return winners, completions
+
+    def __check(self, battle_mode: BattleMode, criterion: str = "health"):
+        winners, completions = self.__expected(battle_mode, criterion)
+        batch = BatchBattle.from_trainers(self.__create_pairs(), battle_mode, criterion)
+        self.assertEqual(list(batch.run()), winners, f"{battle_mode} batch winners differ from Battle")
+        self.assertEqual(batch.pokedex_1, completions, f"{battle_mode} batch pokedexes differ from Battle")
+
+    @number("6.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_set_batch(self):
+        self.__check(BattleMode.SET)
+
+    @number("6.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_rotate_batch(self):
+        self.__check(BattleMode.ROTATE)
+
+    @number("6.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_optimise_batch(self):
+        for criterion in PokeTeam.CRITERION_LIST:
+            self.__check(BattleMode.OPTIMISE, criterion)
+
+    @number("6.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_without_numpy(self):
+        with patch('batch_battle.np', None):
+            for battle_mode in BattleMode:
+                self.__check(battle_mode)
+
+    @number("6.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_winners(self):
+        pairs = self.__create_pairs()
+        batch = BatchBattle.from_trainers(pairs, BattleMode.ROTATE)
+        for (trainer1, trainer2), winner in zip(pairs, batch.winners()):
+            self.assertIn(winner, (trainer1, trainer2))
+
+    @number("6.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_set_double_faint(self):
+        # The top Snorlax wins its round by fatigue but faints too, so it is not pushed back
+        def make_pair():
+            pikachu = Pikachu()
+            pikachu.health, pikachu.speed = 1, 50
+            bottom, top = Snorlax(), Snorlax()
+            bottom.health, bottom.defence, bottom.speed = 1, 0, 1
+            top.health, top.battle_power, top.defence, top.speed = 1, 0, 1000, 100
+            trainer1 = Trainer('Gary')
+            trainer2 = Trainer('Ash')
+            trainer1.team = PokeTeam()
+            trainer1.team.push(pikachu)
+            trainer2.team = PokeTeam()
+            trainer2.team.push(bottom)
+            trainer2.team.push(top)
+            return trainer1, trainer2
+
+        trainer1, trainer2 = make_pair()
+        winner = Battle(trainer1, trainer2, BattleMode.SET).commence_battle()
+        self.assertIs(winner, trainer2)
+        expected = (2, trainer2.pokedex.elems)
+        numpy_modes = [np] if np is not None else []
+        for module in numpy_modes + [None]:
+            with patch('batch_battle.np', module):
+                trainer1, trainer2 = make_pair()
+                batch = BatchBattle.from_trainers([(trainer1, trainer2)], BattleMode.SET)
+                self.assertEqual((batch.run()[0], batch.pokedex_2[0]), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import random
+from poke_team import Trainer
+from pokemon import *
+from battle import Battle
+from battle_mode import BattleMode
+from battle_events import *
+from round_cache import RoundCache
+
+class TestBattleEvents(unittest.TestCase):
+    DEFAULT_SEED = 20
+
+    def setUp(self) -> None:
+        rng = random.Random(TestBattleEvents.DEFAULT_SEED)
+        self.specs = []
+        for i in range(2):
+            trainer = Trainer(f'Trainer_{i}', rng)
+            trainer.pick_team("Random")
+            self.specs.append(trainer.to_spec())
+
+    def __battle(self, battle_mode: BattleMode, tracer=None, round_cache=None):
+        trainer_1 = Trainer.from_spec(self.specs[0])
+        trainer_2 = Trainer.from_spec(self.specs[1])
+        battle = Battle(trainer_1, trainer_2, battle_mode, round_cache=round_cache, tracer=tracer)
+        battle._create_teams()
+        winner = battle.commence_battle()
+        return (None if winner is None else winner.get_name(),
+                [str(p) for p in trainer_1.get_team().members()],
+                [str(p) for p in trainer_2.get_team().members()],
+                trainer_1.pokedex.elems, trainer_2.pokedex.elems)
+
+    @number("14.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_round_events(self):
+        sink = ListSink()
+        battle = Battle(Trainer('Ash'), Trainer('Gary'), BattleMode.SET, tracer=sink)
+        charmander, bulbasaur = Charmander(), Bulbasaur()
+        bulbasaur.health = 10
+        battle.battle_round(charmander, bulbasaur)
+        self.assertEqual(sink.events, [
+            BattleEvent(ROUND_START, 1, 0, "Charmander", "Bulbasaur"),
+            BattleEvent(ATTACK, 1, 1, "Charmander", "Bulbasaur", 24),
+            BattleEvent(DAMAGE, 1, 2, "Bulbasaur", None, -14),
+            BattleEvent(FAINT, 1, 2, "Bulbasaur", "Charmander", -14),
+            BattleEvent(LEVEL_UP, 1, 1, "Charmeleon", None, 2),
+            BattleEvent(EVOLUTION, 1, 1, "Charmeleon", "Charmander"),
+            BattleEvent(POKEDEX_UPDATE, 1, 1, "Charmeleon", None, 0.07),
+        ])
+
+    @number("14.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_tracing_does_not_change_battles(self):
+        one_sided = [('Strong', (Aerodactyl.SPECIES_ID,) * 6, 0), ('Weak', (Magikarp.SPECIES_ID,) * 6, 0)]
+        for self.specs in (self.specs, one_sided):
+            for battle_mode in BattleMode:
+                counter = CountingSink()
+                sink = ListSink()
+                traced = self.__battle(battle_mode, Tracer(counter, sink))
+                self.assertEqual(traced, self.__battle(battle_mode))
+                self.assertEqual(counter.counts[BATTLE_START], 1)
+                self.assertEqual(counter.counts[BATTLE_END], 1)
+                self.assertEqual(counter.counts[ROUND_START], sink.events[-1].round_number)
+                self.assertEqual(counter.counts[FAINT], counter.counts[LEVEL_UP])
+                # With a round cache, replayed rounds are traced too
+                round_cache = RoundCache()
+                self.__battle(battle_mode, None, round_cache)
+                replay = CountingSink()
+                self.assertEqual(self.__battle(battle_mode, replay, round_cache), traced)
+                self.assertEqual(replay.counts[LEVEL_UP], counter.counts[LEVEL_UP])
+        self.assertGreater(counter.counts[LEVEL_UP], 0)
+
+    @number("14.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_callback_sink(self):
+        levels = []
+        self.specs = [('Strong', (Aerodactyl.SPECIES_ID,) * 6, 0), ('Weak', (Magikarp.SPECIES_ID,) * 6, 0)]
+        self.__battle(BattleMode.SET, CallbackSink(levels.append, kinds=[LEVEL_UP, EVOLUTION]))
+        self.assertTrue(levels)
+        self.assertTrue(all(event.kind in (LEVEL_UP, EVOLUTION) for event in levels))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import io
+import random
+from poke_team import PokeTeam, Trainer
+from battle import Battle
+from battle_mode import BattleMode
+from battle_log import BattleLog, read_logs
+
+def team_state(team, battle_mode: BattleMode, in_play=None) -> list:
+    # The Pokemon of a team in team order, with a Pokemon taken out to fight put back at the head
+    members = [str(pokemon) for pokemon in team.members()]
+    if in_play is not None:
+        if battle_mode == BattleMode.SET:
+            members.append(str(in_play))
+        else:
+            members.insert(0, str(in_play))
+    return members
+
+class SnapshotBattle(Battle):
+    # Keeps the state of both teams before every round
+    def battle_round(self, pokemon1, pokemon2):
+        self.snapshots.append((team_state(self.trainer_1.get_team(), self.battle_mode, pokemon1),
+                               team_state(self.trainer_2.get_team(), self.battle_mode, pokemon2),
+                               self.trainer_1.pokedex.elems, self.trainer_2.pokedex.elems))
+        return Battle.battle_round(self, pokemon1, pokemon2)
+
+class TestBattleLog(unittest.TestCase):
+    DEFAULT_SEED = 20
+
+    def setUp(self) -> None:
+        rng = random.Random(TestBattleLog.DEFAULT_SEED)
+        drawer = PokeTeam(rng)
+        self.specs = [((f"Ash_{i}", drawer.random_spec(), 0), (f"Gary_{i}", drawer.random_spec(), 0)) for i in range(20)]
+
+    def __fight(self, spec_1, spec_2, battle_mode: BattleMode):
+        battle = SnapshotBattle(Trainer.from_spec(spec_1), Trainer.from_spec(spec_2), battle_mode, "speed")
+        battle.snapshots = []
+        battle._create_teams()
+        log = BattleLog.record(battle, seed=7)
+        winner = battle.commence_battle()
+        return battle, log, winner
+
+    @number("15.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_replay(self):
+        for battle_mode in BattleMode:
+            for spec_1, spec_2 in self.specs:
+                battle, log, winner = self.__fight(spec_1, spec_2, battle_mode)
+                self.assertEqual(len(log), len(battle.snapshots))
+                state = log.replay()
+                self.assertTrue(state.finished)
+                self.assertEqual(None if state.winner is None else state.winner.get_name(),
+                                 None if winner is None else winner.get_name())
+                for replayed, trainer in ((state.trainer_1, battle.trainer_1), (state.trainer_2, battle.trainer_2)):
+                    self.assertEqual(team_state(replayed.get_team(), battle_mode), team_state(trainer.get_team(), battle_mode))
+                    self.assertEqual(replayed.pokedex.elems, trainer.pokedex.elems)
+                # Every intermediate state
+                for k, snapshot in enumerate(battle.snapshots):
+                    state = log.replay(k)
+                    self.assertFalse(state.finished)
+                    self.assertEqual(state.round_number, k)
+                    self.assertEqual((team_state(state.trainer_1.get_team(), battle_mode),
+                                      team_state(state.trainer_2.get_team(), battle_mode),
+                                      state.trainer_1.pokedex.elems, state.trainer_2.pokedex.elems), snapshot)
+
+    @number("15.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_serialisation(self):
+        file = io.BytesIO()
+        logs = []
+        for battle_mode in BattleMode:
+            for spec_1, spec_2 in self.specs[:5]:
+                _, log, _ = self.__fight(spec_1, spec_2, battle_mode)
+                log.write(file)
+                logs.append(log)
+        file.seek(0)
+        for log, read in zip(logs, read_logs(file)):
+            self.assertEqual(read.to_bytes(), log.to_bytes())
+            self.assertEqual((read.battle_mode, read.criterion, read.names, read.seed),
+                             (log.battle_mode, log.criterion, log.names, log.seed))
+            self.assertEqual(read.health_1, log.health_1)
+            self.assertEqual(team_state(read.replay().trainer_1.get_team(), read.battle_mode),
+                             team_state(log.replay().trainer_1.get_team(), log.battle_mode))
+        with self.assertRaises(ValueError):
+            BattleLog.from_bytes(logs[0].to_bytes()[:-1])
+        with self.assertRaises(ValueError):
+            BattleLog.from_bytes(b'XXXX' + logs[0].to_bytes()[4:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import os
+import tempfile
+from unittest.mock import patch
+from poke_team import Trainer
+from pokemon import *
+from battle import Battle
+from battle_mode import BattleMode
+from duel_matrix import DuelMatrix, INVALID, pokemon_at_stage, stage_count
+from round_cache import FIRST, SECOND, NO_WINNER
+
+class TestDuelMatrix(unittest.TestCase):
+    SPECIES = [Bulbasaur, Charmander, Squirtle, Pikachu, Snorlax, Aerodactyl, Abra]
+
+    def setUp(self) -> None:
+        self.matrix = DuelMatrix.compute(self.SPECIES)
+
+    @number("9.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_matches_battle_round(self):
+        self.assertEqual(self.matrix.stages, 3)
+        for species_1 in self.SPECIES:
+            for species_2 in self.SPECIES:
+                for stage_1 in range(stage_count(species_1)):
+                    for stage_2 in range(stage_count(species_2)):
+                        pokemon_1 = pokemon_at_stage(species_1, stage_1)
+                        pokemon_2 = pokemon_at_stage(species_2, stage_2)
+                        outcome = self.matrix.lookup(pokemon_1, pokemon_2)
+                        winner = Battle(Trainer('Ash'), Trainer('Gary'), BattleMode.SET).battle_round(pokemon_1, pokemon_2)
+                        expected = FIRST if winner is pokemon_1 else SECOND if winner is pokemon_2 else NO_WINNER
+                        self.assertEqual(tuple(outcome), (pokemon_1.health, pokemon_2.health, expected))
+
+    @number("9.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_invalid_stages(self):
+        # Snorlax is the last stage of its line and Aerodactyl does not evolve
+        self.assertIsNone(self.matrix.outcome(Snorlax, 1, Bulbasaur, 0))
+        self.assertIsNone(self.matrix.outcome(Bulbasaur, 0, Aerodactyl, 2))
+        self.assertIsNone(self.matrix.outcome(Bulbasaur, 3, Bulbasaur, 0))
+        self.assertIsNotNone(self.matrix.outcome(Bulbasaur, 2, Abra, 2))
+        self.assertIn(INVALID, self.matrix.winners)
+
+    @number("9.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'duels.bin')
+            self.matrix.save(filename)
+            loaded = DuelMatrix.load(filename, self.SPECIES)
+            self.assertEqual(loaded.stages, self.matrix.stages)
+            self.assertEqual(loaded.winners, self.matrix.winners)
+            self.assertEqual(loaded.health_1, self.matrix.health_1)
+            self.assertEqual(loaded.health_2, self.matrix.health_2)
+            # A matrix computed for other species is rejected
+            with self.assertRaises(ValueError):
+                DuelMatrix.load(filename, list(reversed(self.SPECIES)))
+            # A failed save leaves the previous file as it was and no temporary file
+            with patch('atomic_file.os.replace', side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    self.matrix.save(filename)
+            self.assertEqual(os.listdir(directory), ['duels.bin'])
+
+
+if __name__ == '__main__':
+    unittest.main()
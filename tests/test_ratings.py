@@ -0,0 +1,129 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from unittest.mock import patch
+from io import StringIO
+import os
+import random
+import tempfile
+from poke_team import Trainer
+from battle_mode import BattleMode
+from tower import BattleTower, BattleResult
+from tournament import Tournament
+from ratings import EloRatings, Glicko2Ratings, Ratings, tower_records, tournament_records
+
+class TestRatings(unittest.TestCase):
+
+    def __records(self, count: int, seed: int = 1) -> list:
+        rng = random.Random(seed)
+        names = [f"Trainer_{i}" for i in range(8)]
+        records = []
+        for _ in range(count):
+            first, second = rng.sample(names, 2)
+            records.append((first, second, rng.choice(list(BattleResult))))
+        return records
+
+    @number("13.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_elo(self):
+        ratings = EloRatings()
+        ratings.record("Ash", "Gary", BattleResult.WIN)
+        self.assertEqual(ratings.players["Ash"].rating, 1516.0)
+        self.assertEqual(ratings.players["Gary"].rating, 1484.0)
+        ratings.consume(self.__records(200))
+        # Elo only moves points between players
+        self.assertAlmostEqual(sum(player.rating for player in ratings.players.values()), 1500.0 * 10)
+        self.assertEqual(ratings.records, 201)
+        with self.assertRaises(ValueError):
+            ratings.record("Ash", "Ash", BattleResult.WIN)
+
+    @number("13.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_glicko2(self):
+        ratings = Glicko2Ratings()
+        ratings.record("Ash", "Gary", BattleResult.WIN)
+        ash, gary = ratings.players["Ash"], ratings.players["Gary"]
+        self.assertGreater(ash.rating, 1500.0)
+        self.assertAlmostEqual(ash.rating + gary.rating, 3000.0)
+        self.assertLess(ash.deviation, 350.0)
+        # The volatility step of Glickman's worked example
+        self.assertAlmostEqual(ratings._new_volatility(200 / 173.7178, 0.06, 1.7785, -0.4834), 0.06, places=4)
+
+    @number("13.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_leaderboard(self):
+        for ratings in (EloRatings(), Glicko2Ratings()):
+            ratings.consume(self.__records(300))
+            players = sorted(ratings.players.values(), key=lambda player: (-player.rating, player.name))
+            self.assertEqual([player.name for player in ratings.top(len(players))], [player.name for player in players])
+            for rank, player in enumerate(players, start=1):
+                self.assertEqual(ratings.rank(player.name), rank)
+                self.assertEqual(player.wins + player.draws + player.losses, player.games)
+            self.assertEqual(len(ratings.format_leaderboard(3).splitlines()), 4)
+
+    @number("13.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_snapshot_resume(self):
+        records = self.__records(250)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'ratings.json')
+            for system in (EloRatings, Glicko2Ratings):
+                whole = system()
+                whole.consume(records)
+                partial = system()
+                partial.consume(records[:100], snapshot_file=filename, snapshot_every=40)
+                resumed = Ratings.load_snapshot(filename)
+                self.assertIsInstance(resumed, system)
+                resumed.consume(records[resumed.records:])
+                self.assertEqual([player.to_list() for player in resumed.top(10)],
+                                 [player.to_list() for player in whole.top(10)])
+            # A failed save keeps the previous snapshot and leaves no temporary file
+            with patch('atomic_file.os.replace', side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    whole.snapshot(filename)
+            self.assertEqual(os.listdir(directory), ['ratings.json'])
+
+    @number("13.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_streams(self):
+        rng = random.Random(4)
+        with patch('sys.stdout', new=StringIO()):
+            trainers = []
+            for i in range(4):
+                trainer = Trainer(f"Trainer_{i}", rng)
+                trainer.pick_team("Random")
+                trainers.append(trainer)
+            tournament = Tournament(trainers, BattleMode.SET, max_workers=0)
+            tournament.round_robin()
+            ratings = EloRatings()
+            self.assertEqual(ratings.consume(tournament_records(tournament)), 6)
+            for standing in tournament.standings():
+                player = ratings.players[standing.name]
+                self.assertEqual((player.wins, player.draws, player.losses),
+                                 (standing.wins, standing.draws, standing.losses))
+            tower = BattleTower(rng)
+            me = Trainer("Me", rng)
+            me.pick_team("Random")
+            tower.set_my_trainer(me)
+            tower.generate_enemy_trainers(3)
+            ratings.consume(tower_records(tower))
+        self.assertGreater(ratings.players["Me"].games, 0)
+
+    @number("13.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_abstract_update(self):
+        systems = dict(Ratings._systems)
+        class Incomplete(Ratings):
+            pass
+        with self.assertRaises(TypeError):
+            Ratings()
+        with self.assertRaises(TypeError):
+            Incomplete()
+        # Subclasses without a system name of their own are not registered
+        class TunedElo(EloRatings):
+            pass
+        self.assertEqual(Ratings._systems, systems)
+        self.assertIs(Ratings._systems["elo"], EloRatings)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import random
+from poke_team import Trainer
+from pokemon import *
+from battle import Battle
+from battle_mode import BattleMode
+from round_cache import RoundCache, RoundOutcome, FIRST
+
+class TestRoundCache(unittest.TestCase):
+    DEFAULT_SEED = 20
+
+    def setUp(self) -> None:
+        rng = random.Random(TestRoundCache.DEFAULT_SEED)
+        self.specs = []
+        for i in range(6):
+            trainer = Trainer(f'Trainer_{i}', rng)
+            trainer.pick_team("Random")
+            self.specs.append(trainer.to_spec())
+
+    def __play(self, battle_mode: BattleMode, round_cache: RoundCache) -> list:
+        # Plays every pair of trainers twice and returns the final state of every battle
+        states = []
+        for _ in range(2):
+            for first in range(len(self.specs)):
+                for second in range(first + 1, len(self.specs)):
+                    trainer_1 = Trainer.from_spec(self.specs[first])
+                    trainer_2 = Trainer.from_spec(self.specs[second])
+                    battle = Battle(trainer_1, trainer_2, battle_mode, "defence", round_cache=round_cache)
+                    battle._create_teams()
+                    winner = battle.commence_battle()
+                    states.append((None if winner is None else winner.get_name(),
+                                   [str(p) for p in trainer_1.get_team().members()],
+                                   [str(p) for p in trainer_2.get_team().members()],
+                                   trainer_1.pokedex.elems, trainer_2.pokedex.elems))
+        return states
+
+    @number("8.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_replay_matches_battle(self):
+        for battle_mode in BattleMode:
+            round_cache = RoundCache()
+            self.assertEqual(self.__play(battle_mode, round_cache), self.__play(battle_mode, None))
+            # Every battle was fought twice, the second time entirely from the cache
+            self.assertGreater(round_cache.hits, 0)
+            self.assertGreaterEqual(round_cache.hits, round_cache.misses)
+
+    @number("8.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_evolution_replay(self):
+        round_cache = RoundCache()
+        results = []
+        for _ in range(2):
+            trainer_1, trainer_2 = Trainer('Ash'), Trainer('Gary')
+            charmander, bulbasaur = Charmander(), Bulbasaur()
+            bulbasaur.health = 1
+            winner = Battle(trainer_1, trainer_2, BattleMode.SET, round_cache=round_cache).battle_round(charmander, bulbasaur)
+            self.assertIs(winner, charmander)
+            results.append((str(charmander), charmander.battle_power, charmander.speed, str(bulbasaur),
+                            trainer_1.get_pokedex_completion()))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(charmander.get_name(), "Charmeleon")
+        self.assertEqual((round_cache.hits, round_cache.misses), (1, 1))
+
+    @number("8.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_eviction(self):
+        round_cache = RoundCache(maxsize=2)
+        for key in ('a', 'b', 'c'):
+            round_cache.put(key, RoundOutcome(1, 0, FIRST))
+            if key == 'b':
+                round_cache.get('a')
+        self.assertEqual(len(round_cache), 2)
+        self.assertIsNone(round_cache.get('b'))
+        self.assertIsNotNone(round_cache.get('a'))
+        self.assertEqual((round_cache.hits, round_cache.misses), (2, 1))
+        round_cache.clear()
+        self.assertEqual((len(round_cache), round_cache.hits, round_cache.misses), (0, 0, 0))
+        with self.assertRaises(ValueError):
+            RoundCache(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
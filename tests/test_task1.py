@@ -3,6 +3,9 @@ from ed_utils.decorators import number, visibility
 from unittest.mock import patch
 from pokemon_base import TypeEffectiveness, PokeType
 import io
+import os
+import shutil
+import tempfile
 
 class TestTypeEffectiveness(unittest.TestCase):
     @number("1.1")
@@ -18,5 +21,75 @@ class TestTypeEffectiveness(unittest.TestCase):
     def test_len(self):
         self.assertEqual(len(TypeEffectiveness()), 15)
 
+    @number("1.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_get_effectiveness_all_types(self):
+        with open('type_effectiveness.csv') as file:
+            lines = file.read().splitlines()
+        types = [PokeType[name.upper()] for name in lines[0].split(',')]
+        for attack_type, line in zip(types, lines[1:]):
+            for defend_type, value in zip(types, line.split(',')):
+                self.assertEqual(TypeEffectiveness.get_effectiveness(attack_type, defend_type), float(value))
+
+    @number("1.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_get_effectiveness_batch(self):
+        attack_types = [a.value for a in PokeType for _ in PokeType]
+        defend_types = [d.value for _ in PokeType for d in PokeType]
+        expected = [TypeEffectiveness.get_effectiveness(a, d) for a in PokeType for d in PokeType]
+        self.assertEqual(list(TypeEffectiveness.get_effectiveness_batch(attack_types, defend_types)), expected)
+        # The pure-Python fallback must agree with the NumPy path
+        with patch('pokemon_base.np', None):
+            self.assertEqual(TypeEffectiveness.get_effectiveness_batch(attack_types, defend_types), expected)
+
+    @number("1.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_effectiveness_cache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, 'type_effectiveness.csv')
+            shutil.copy('type_effectiveness.csv', filename)
+            TypeEffectiveness.populate_effectiveness(filename)
+            self.assertTrue(os.path.exists(filename + TypeEffectiveness.CACHE_SUFFIX))
+            # A second load is served from the cache without parsing the CSV
+            with patch.object(TypeEffectiveness, '_parse_effectiveness') as parse:
+                TypeEffectiveness.populate_effectiveness(filename)
+                parse.assert_not_called()
+            self.assertEqual(TypeEffectiveness.get_effectiveness(PokeType.WATER, PokeType.GRASS), 0.5)
+            # Editing the CSV invalidates the cache
+            with open(filename) as file:
+                lines = file.read().splitlines()
+            lines[2] = '1.0' + lines[2][3:]
+            with open(filename, 'w') as file:
+                file.write('\n'.join(lines))
+            TypeEffectiveness.populate_effectiveness(filename)
+            self.assertEqual(TypeEffectiveness.get_effectiveness(PokeType.WATER, PokeType.FIRE), 1.0)
+            # A failed write leaves no temporary file: OS errors are ignored, others raised
+            cache_name = os.path.join(directory, 'failed.cache')
+            with patch('atomic_file.os.replace', side_effect=OSError("read-only")):
+                TypeEffectiveness._write_cache(cache_name, 0, 1, [1.0])
+            with patch('atomic_file.os.replace', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    TypeEffectiveness._write_cache(cache_name, 0, 1, [1.0])
+            self.assertEqual([name for name in os.listdir(directory) if name.startswith('failed')], [])
+        finally:
+            TypeEffectiveness.load()
+            shutil.rmtree(directory)
+
+    @number("1.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_lazy_loading(self):
+        directory = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            # The table is found relative to the module, not the working directory
+            os.chdir(directory)
+            TypeEffectiveness.EFFECT_TABLE = None
+            self.assertEqual(TypeEffectiveness.get_effectiveness(PokeType.GRASS, PokeType.WATER), 2.0)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+            TypeEffectiveness.load()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
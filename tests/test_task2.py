@@ -3,6 +3,9 @@ from ed_utils.decorators import number, visibility
 from unittest.mock import patch
 from io import StringIO
 import random
+import os
+import tempfile
+import pokemon
 from poke_team import *
 from pokemon import *
 
@@ -26,6 +29,21 @@ class TestPokeTeam(unittest.TestCase):
         poketeam.regenerate_team(battle_mode=BattleMode.SET)
         self.assertGreater(poketeam.team.array[0].get_health(), 0, "Regenerate team not configured properly")
 
+    @number("2.10")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_reset_health(self):
+        bulbasaur = pokemon.Bulbasaur()
+        bulbasaur.level_up()
+        bulbasaur.level_up()
+        self.assertEqual((bulbasaur.get_name(), bulbasaur.get_stage()), ("Venusaur", 2))
+        bulbasaur.defend(500)
+        bulbasaur.reset_health()
+        self.assertEqual(bulbasaur.get_health(), 45 * 1.5 * 1.5, "Health should be restored for the evolved stage")
+        snorlax = pokemon.Snorlax()
+        snorlax.defend(500)
+        snorlax.reset_health()
+        self.assertEqual((snorlax.get_stage(), snorlax.get_health()), (0, 85))
+
     @number("2.3")
     @visibility(visibility.VISIBILITY_SHOW)
     def test_internals(self):
@@ -33,6 +51,39 @@ class TestPokeTeam(unittest.TestCase):
         poketeam.choose_randomly()
         self.assertIsNotNone(poketeam[0], " Poketeam's __getitem__ not working correctly")
 
+    @number("2.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_species_registry(self):
+        all_pokemon = get_all_pokemon_types()
+        self.assertEqual(len(all_pokemon), 77)
+        names = [species.__name__ for species in all_pokemon]
+        self.assertEqual(names, sorted(names), "Species should be sorted by name")
+        self.assertIs(SpeciesRegistry.get_by_name("Pikachu"), pokemon.Pikachu)
+        self.assertIs(SpeciesRegistry.get_by_id(pokemon.Pikachu.SPECIES_ID), pokemon.Pikachu)
+        self.assertEqual(Bulbasaur.SPECIES_ID, 0)
+
+    @number("2.9")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_load_species(self):
+        file, filename = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(file, 'w') as roster:
+            roster.write("species,name,type,health,battle_power,defence,speed,evolution_line\n")
+            roster.write("Pichu,Pichu,ELECTRIC,1000,35,20,90.5,Pichu|Pikachu\n")
+            roster.write("Pikachu,Pikachu,ELECTRIC,1000,35,20,90.5,Pikachu|Raichu\n")
+        try:
+            # Redefining a species is rejected, and nothing of the table is loaded
+            with self.assertRaises(ValueError):
+                load_species(filename)
+        finally:
+            os.remove(filename)
+        self.assertFalse(hasattr(pokemon, "Pichu"))
+        self.assertIs(pokemon.Pikachu, Pikachu)
+        self.assertIs(SpeciesRegistry.get_by_name("Pikachu"), Pikachu)
+        self.assertEqual(len(get_all_pokemon_types()), 77)
+        self.assertEqual((Pikachu().health, Pikachu().speed), (35, 90))
+        self.assertEqual((pokemon._parse_stat("1000"), pokemon._parse_stat("90.5")), (1000, 90.5))
+        self.assertIsInstance(pokemon._parse_stat("1000"), int)
+
 class TestTrainer(unittest.TestCase):
     @number("2.4")
     @visibility(visibility.VISIBILITY_SHOW)
@@ -75,6 +126,22 @@ class TestTrainer(unittest.TestCase):
 
         self.assertEqual(str(trainer), expected_str, "Trainer Str method is not set up correctly")
 
+    @number("2.11")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_pokedex_version(self):
+        trainer = Trainer('Ash')
+        self.assertEqual(trainer.pokedex_version, 0)
+        trainer.register_pokemon(Pikachu())
+        self.assertEqual(trainer.pokedex_version, 1)
+        # A type already in the pokedex changes nothing
+        trainer.register_pokemon(Voltorb())
+        self.assertEqual(trainer.pokedex_version, 1)
+        self.assertEqual(trainer.get_pokedex_completion(), 0.07)
+        trainer.set_pokedex(0b111)
+        self.assertEqual(trainer.pokedex_version, 2)
+        self.assertEqual(trainer.get_pokedex_completion(), 0.2)
+        self.assertEqual(trainer.get_pokedex_completion(), round(len(trainer.pokedex) / len(PokeType), 2))
+
 
 if __name__ == '__main__':
     unittest.main()
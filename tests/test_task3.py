@@ -135,6 +135,30 @@ class TestBattle(unittest.TestCase):
         # Check loser (Ash's team) - We got Ash!
         self.assertEqual(len(self.trainer2.get_team()), 0, f"{self.trainer2.get_name()} should have no Pokemon left in their team")
 
+    @number("3.11")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_calculate_damage(self):
+        battle = Battle(self.trainer1, self.trainer2, BattleMode.SET)
+        # 22 battle power, doubled by Fire against Grass, less 20 defence
+        self.assertEqual(battle.calculate_damage(Charmander(), Bulbasaur(), 1.0), 24)
+        self.assertEqual(battle.calculate_damage(Charmander(), Bulbasaur(), 0.5), 12)
+        self.assertEqual(battle.calculate_damage(Bulbasaur(), Charmander(), 1.0), 0)
+
+    @number("3.12")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_multipliers_follow_pokedex(self):
+        battle = Battle(self.trainer1, self.trainer2, BattleMode.SET)
+        self.assertEqual(battle.get_multipliers(), (1.0, 1.0))
+        self.trainer1.register_pokemon(Pikachu())
+        self.trainer1.register_pokemon(Pidgey())
+        self.trainer2.register_pokemon(Squirtle())
+        self.assertEqual(battle.get_multipliers(), (0.13 / 0.07, 0.07 / 0.13))
+        # Registering a type already seen keeps the cached multipliers
+        key = battle._multiplier_key
+        self.trainer2.register_pokemon(Psyduck())
+        battle.get_multipliers()
+        self.assertIs(battle._multiplier_key, key)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,15 @@
 import unittest
 from ed_utils.decorators import number, visibility
 from unittest.mock import patch
+from io import StringIO
 import random
+import os
+import tempfile
+from itertools import islice
 from poke_team import *
 from pokemon import *
 from tower import *
+from team_columns import TeamColumns
 
 
 class TestTower(unittest.TestCase):
@@ -38,7 +43,7 @@ class TestTower(unittest.TestCase):
         while self.bt.battles_remaining():
             self.bt.next_battle()
         self.player_trainer.get_team().regenerate_team(BattleMode.SET)
-        self.assertEqual(str(self.player_trainer.get_team()[0]), "Graveler (Level 2) with 40 health and 0 experience")
+        self.assertEqual(str(self.player_trainer.get_team()[0]), "Graveler (Level 2) with 60.0 health and 0 experience")
 
     @number("4.3")
     @visibility(visibility.VISIBILITY_SHOW)
@@ -54,7 +59,209 @@ class TestTower(unittest.TestCase):
         while self.bt.battles_remaining():
             self.bt.next_battle()
         self.player_trainer.get_team().regenerate_team(BattleMode.OPTIMISE, criterion="defence")
-        self.assertEqual(str(self.player_trainer.get_team()[0]), "Kingler (Level 21) with 30 health and 0 experience")
+        self.assertEqual(str(self.player_trainer.get_team()[0]), "Kingler (Level 21) with 45.0 health and 0 experience")
+
+    @number("4.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_injected_rng(self):
+        snapshots = []
+        state = random.getstate()
+        try:
+            for extra_draw in (False, True):
+                # Both runs start from the same global state, and only the second one
+                # draws from it: the tower must not notice
+                random.seed(11)
+                tower = BattleTower(random.Random(7))
+                with patch('sys.stdout', new=StringIO()):
+                    trainer = Trainer('Red', tower.rng)
+                    trainer.pick_team("Random")
+                    tower.set_my_trainer(trainer)
+                    if extra_draw:
+                        random.random()
+                    tower.generate_enemy_trainers(3)
+                    enemies = [enemy.get_trainer(tower.rng).get_team().to_spec() for enemy in tower.enemy_trainers]
+                    results = [record.result for record in tower.run()]
+                snapshots.append((trainer.get_team().to_spec(), tower.my_lives, enemies, results))
+        finally:
+            random.setstate(state)
+        self.assertEqual(snapshots[0], snapshots[1])
+
+    @number("4.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_run(self):
+        def make_tower():
+            tower = BattleTower(random.Random(3))
+            trainer = Trainer('Red', tower.rng)
+            with patch('sys.stdout', new=StringIO()):
+                trainer.pick_team("Random")
+                tower.set_my_trainer(trainer)
+                tower.generate_enemy_trainers(4)
+            return tower
+
+        tower = make_tower()
+        expected = []
+        with patch('sys.stdout', new=StringIO()):
+            while tower.battles_remaining():
+                result, _, enemy, player_lives, enemy_lives = tower.next_battle()
+                expected.append((len(expected) + 1, result, enemy.get_name(), player_lives, enemy_lives))
+
+        tower = make_tower()
+        with patch('sys.stdout', new=StringIO()) as output:
+            records = list(tower.run())
+            self.assertEqual(output.getvalue(), "")
+        self.assertEqual([tuple(record) for record in records], expected)
+        self.assertEqual(tower.battles_fought, len(expected))
+
+        batches = list(make_tower().run(batch_size=2))
+        self.assertTrue(all(1 <= len(batch) <= 2 for batch in batches))
+        self.assertEqual([record for batch in batches for record in batch], records)
+
+        # Battles are only fought when their records are asked for
+        tower = make_tower()
+        stream = tower.run()
+        self.assertEqual(tower.battles_fought, 0)
+        next(stream)
+        self.assertEqual(tower.battles_fought, 1)
+        with self.assertRaises(ValueError):
+            next(tower.run(batch_size=0))
+
+    @number("4.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_enemy_roster(self):
+        tower = BattleTower(random.Random(5))
+        tower.generate_enemy_trainers(1000)
+        self.assertEqual(len(tower.enemy_trainers), 1000)
+        enemies = list(tower.enemy_trainers)
+        self.assertEqual([enemy.name for enemy in enemies[:2]], ["Enemy_1", "Enemy_2"])
+        self.assertTrue(all(BattleTower.MIN_LIVES <= enemy.lives <= BattleTower.MAX_LIVES for enemy in enemies))
+        # Enemies are only built when they first fight
+        self.assertTrue(all(enemy.trainer is None for enemy in enemies))
+
+        # An enemy that survives a battle keeps its lives and is re-queued behind the others
+        tower.set_my_trainer(Trainer.from_spec(('Champion', (Aerodactyl.SPECIES_ID,) * 6, 0)))
+        tower.add_enemy_trainer(Trainer.from_spec(('Weak', (Magikarp.SPECIES_ID,) * 6, 0)), lives=2)
+        for _ in range(1000):
+            tower.enemy_trainers.append(tower.enemy_trainers.serve())
+        weak = list(tower.enemy_trainers)[0]
+        self.assertEqual((weak.name, weak.lives), ('Weak', 2))
+        record = next(tower.run())
+        self.assertEqual((record.result, record.enemy, record.enemy_lives), (BattleResult.WIN, 'Weak', 1))
+        self.assertIs(list(tower.enemy_trainers)[-1], weak)
+        self.assertEqual(len(tower.enemy_trainers), 1001)
+
+    @number("4.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_checkpoint(self):
+        def make_tower():
+            tower = BattleTower(random.Random(11))
+            player = Trainer('Red', tower.rng)
+            player.team = PokeTeam.from_spec(PokeTeam(tower.rng).random_spec(), tower.rng)
+            player.get_team().assemble_team(BattleMode.ROTATE)
+            tower.set_my_trainer(player)
+            tower.my_lives = 40
+            tower.generate_enemy_trainers(12)
+            return tower
+
+        def state(tower):
+            return (tower.my_lives, tower.enemies_defeated(), tower.battles_fought,
+                    TeamColumns.from_teams([tower.my_trainer.get_team()]).to_bytes(),
+                    tower.my_trainer.pokedex.elems, [(enemy.name, enemy.lives) for enemy in tower.enemy_trainers])
+
+        tower = make_tower()
+        expected = list(tower.run())
+        self.assertGreater(len(expected), 8)
+        final = state(tower)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "tower.bin")
+            tower = make_tower()
+            self.assertEqual(list(islice(tower.run(checkpoint=filename, checkpoint_every=5), 7)), expected[:7])
+            resumed = BattleTower.load_checkpoint(filename)
+            self.assertEqual(resumed.battles_fought, 5)
+            self.assertEqual(list(resumed.run(checkpoint=filename, checkpoint_every=5)), expected[5:])
+            self.assertEqual(state(resumed), final)
+            # The last checkpoint is taken at the end of the run
+            self.assertEqual(state(BattleTower.load_checkpoint(filename)), final)
+            self.assertEqual(os.listdir(directory), ["tower.bin"])
+            # A failed save keeps the previous checkpoint and leaves no temporary file
+            with patch('atomic_file.os.replace', side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    resumed.save_checkpoint(filename)
+            self.assertEqual(os.listdir(directory), ["tower.bin"])
+            self.assertEqual(state(BattleTower.load_checkpoint(filename)), final)
+
+        # Enemies that have fought keep their Pokemon, the others their team spec
+        tower = make_tower()
+        list(islice(tower.run(), 3))
+        data = tower.to_bytes()
+        copy = BattleTower.from_bytes(data)
+        self.assertEqual(copy.to_bytes(), data)
+        self.assertEqual([enemy.trainer is None for enemy in copy.enemy_trainers],
+                         [enemy.trainer is None for enemy in tower.enemy_trainers])
+        self.assertEqual(copy.rng.random(), tower.rng.random())
+        with self.assertRaises(ValueError):
+            BattleTower.from_bytes(data[:-1])
+        with self.assertRaises(ValueError):
+            BattleTower.from_bytes(b'PKXX' + data[4:])
+
+    @number("4.9")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_checkpoint_crash(self):
+        def make_tower():
+            tower = BattleTower(random.Random(11))
+            tower.set_my_trainer(Trainer.from_spec(('Red', PokeTeam(tower.rng).random_spec(), 0), tower.rng))
+            tower.my_lives = 40
+            tower.generate_enemy_trainers(12)
+            return tower
+
+        expected = list(make_tower().run())
+        self.assertGreater(len(expected), 12)
+        for crash_at in (6, 10, 13):
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "tower.bin")
+                tower = make_tower()
+                fight_next = tower._fight_next
+
+                def crashing_fight_next():
+                    if tower.battles_fought + 1 == crash_at:
+                        raise RuntimeError("crash")
+                    return fight_next()
+
+                tower._fight_next = crashing_fight_next
+                delivered = []
+                with self.assertRaises(RuntimeError):
+                    for batch in tower.run(batch_size=4, checkpoint=filename, checkpoint_every=5):
+                        delivered.extend(batch)
+                resumed = BattleTower.load_checkpoint(filename) if os.path.exists(filename) else make_tower()
+                # The resumed tower starts at or before the first record not received
+                self.assertLessEqual(resumed.battles_fought, len(delivered))
+                for batch in resumed.run(batch_size=4, checkpoint=filename, checkpoint_every=5):
+                    delivered.extend(batch)
+                by_number = {record.battle_number: record for record in delivered}
+                self.assertEqual([by_number[number] for number in sorted(by_number)], expected)
+
+    @number("4.10")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_regenerate_evolved(self):
+        # The player's Machop team beats one enemy and evolves; regenerating restores the evolved health
+        tower = BattleTower(random.Random(1))
+        tower.set_my_trainer(Trainer.from_spec(('Red', (Machop.SPECIES_ID,) * 3, 0)))
+        tower.my_lives = 3
+        tower.add_enemy_trainer(Trainer.from_spec(('Weak', (Magikarp.SPECIES_ID,) * 3, 0)), lives=1)
+        self.assertEqual([record.result for record in tower.run()], [BattleResult.WIN])
+        team = tower.my_trainer.get_team()
+        evolved_health = Machop.BASE_STATS.health_at(1)
+        self.assertNotEqual(evolved_health, Machop().health)
+        for battle_mode in BattleMode:
+            for pokemon in team.members():
+                pokemon.health = 1
+            team.regenerate_team(battle_mode, criterion="defence")
+            self.assertEqual(len(team), 3)
+            self.assertTrue(all(pokemon.get_stage() == 1 and pokemon.health == evolved_health
+                                for pokemon in team.members()))
+        team.regenerate_team(BattleMode.ROTATE)
+        self.assertEqual(str(team[0]), f"Machoke (Level {team[0].level}) with {evolved_health} health and 0 experience")
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import random
+import pokemon
+from battle_mode import BattleMode
+from poke_team import PokeTeam
+from team_columns import TeamColumns, np
+
+class TestTeamColumns(unittest.TestCase):
+    def setUp(self) -> None:
+        random.seed(20)
+        self.teams = []
+        for _ in range(3):
+            team = PokeTeam()
+            team.choose_randomly()
+            self.teams.append(team)
+        # Change some state so that more than the starting stats is exercised
+        evolved = self.teams[0][0]
+        evolved.level_up()
+        evolved.defend(3)
+
+    @number("5.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_round_trip(self):
+        columns = TeamColumns.from_teams(self.teams)
+        self.assertEqual(columns.team_count(), 3)
+        self.assertEqual(len(columns), sum(len(team) for team in self.teams))
+        for index, team in enumerate(self.teams):
+            rebuilt = columns.to_team(index, BattleMode.SET)
+            self.assertEqual([str(p) for p in rebuilt.members()], [str(p) for p in team.members()])
+            for original, copy in zip(team.members(), rebuilt.members()):
+                self.assertIs(type(copy), type(original))
+                for attribute in ('battle_power', 'defence', 'speed', 'poketype'):
+                    self.assertEqual(getattr(copy, attribute), getattr(original, attribute))
+
+    @number("5.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_store_pokemon(self):
+        columns = TeamColumns.from_pokemon([pokemon.Charmander()])
+        charmander = columns.to_pokemon(0)
+        charmander.level_up()
+        columns.store_pokemon(0, charmander)
+        self.assertEqual(str(columns.to_pokemon(0)), "Charmeleon (Level 2) with 58.5 health and 0 experience")
+
+    @number("5.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_as_numpy(self):
+        columns = TeamColumns.from_teams(self.teams)
+        views = columns.as_numpy()
+        self.assertEqual(list(views['health']), list(columns.health))
+        self.assertEqual(list(views['team_starts']), [0, 6, 12, 18])
+
+    @number("5.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_bytes(self):
+        columns = TeamColumns.from_teams(self.teams)
+        data = b'prefix' + columns.to_bytes()
+        copy, offset = TeamColumns.from_bytes(data, 6)
+        self.assertEqual(offset, len(data))
+        for column in list(TeamColumns.COLUMN_TYPES) + ['team_starts']:
+            self.assertEqual(getattr(copy, column), getattr(columns, column))
+        with self.assertRaises(ValueError):
+            TeamColumns.from_bytes(data[:-1], 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import os
+import tempfile
+from unittest.mock import patch
+from battle_mode import BattleMode
+from team_evolution import TeamEvolution
+from team_search import score_team, _init_worker
+
+class TestTeamEvolution(unittest.TestCase):
+
+    def __evolution(self, battle_mode: BattleMode = BattleMode.ROTATE, max_workers: int = 0) -> TeamEvolution:
+        return TeamEvolution(battle_mode, population_size=12, opponent_count=6, seed=3,
+                             max_workers=max_workers)
+
+    @number("12.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_evolve(self):
+        for battle_mode in BattleMode:
+            evolution = self.__evolution(battle_mode)
+            best = evolution.evolve(4)
+            self.assertEqual(evolution.generation, 4)
+            self.assertEqual(len(evolution.population), 12)
+            self.assertTrue(all(len(team) == 6 for team in evolution.population))
+            # The elite is carried over, so the best score never gets worse
+            bests = [score.rank_key() for score, _ in evolution.history] + [best.rank_key()]
+            self.assertEqual(bests, sorted(bests))
+            # The cached score is the score of the team
+            team, score = evolution.best()
+            _init_worker(evolution.opponents, battle_mode.value, 100)
+            self.assertEqual(score_team((team, evolution.criterion)), score)
+            trainers = evolution.to_trainers(3)
+            self.assertEqual(trainers[0].get_team().to_spec(), team)
+
+    @number("12.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_checkpoint_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'evolution.json')
+            evolution = self.__evolution(BattleMode.OPTIMISE)
+            evolution.evolve(3, checkpoint=filename, checkpoint_every=3)
+            resumed = TeamEvolution.load_checkpoint(filename, max_workers=0)
+            self.assertEqual(resumed.generation, 3)
+            self.assertEqual(resumed.evolve(2), evolution.evolve(2))
+            self.assertEqual(resumed.population, evolution.population)
+            self.assertEqual(resumed.history, evolution.history)
+            # A failed save keeps the previous checkpoint and leaves no temporary file
+            with patch('atomic_file.os.replace', side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    resumed.save_checkpoint(filename)
+            self.assertEqual(os.listdir(directory), ['evolution.json'])
+
+    @number("12.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_parallel_matches_serial(self):
+        serial = self.__evolution()
+        parallel = self.__evolution(max_workers=2)
+        self.assertEqual(parallel.evolve(2), serial.evolve(2))
+        self.assertEqual(parallel.population, serial.population)
+
+
+if __name__ == '__main__':
+    unittest.main()
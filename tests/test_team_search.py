@@ -0,0 +1,101 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from unittest.mock import patch
+from io import StringIO
+import itertools
+import random
+from poke_team import Trainer, PokeTeam
+from pokemon import *
+from battle_mode import BattleMode
+from team_search import TeamSearch, battle_order, score_team, _init_worker
+
+class TestTeamSearch(unittest.TestCase):
+    DEFAULT_SEED = 20
+    SPECIES = [Bulbasaur, Charmander, Squirtle, Pikachu, Geodude, Abra]
+
+    def setUp(self) -> None:
+        rng = random.Random(TestTeamSearch.DEFAULT_SEED)
+        self.opponents = []
+        with patch('sys.stdout', new=StringIO()):
+            for i in range(4):
+                trainer = Trainer(f'Enemy_{i}', rng)
+                trainer.pick_team("Random")
+                self.opponents.append(trainer)
+
+    def __search(self, battle_mode: BattleMode, max_workers: int = 0, beam_width: int = 3):
+        return TeamSearch(self.opponents, battle_mode, beam_width=beam_width, team_size=3,
+                          species=self.SPECIES, max_workers=max_workers).search()
+
+    @number("11.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_search(self):
+        # A beam keeping every partial team (and criterion) is an exhaustive search
+        exhaustive = len(self.SPECIES) ** 3 * 5
+        for battle_mode in BattleMode:
+            result = self.__search(battle_mode)
+            self.assertEqual(len(result.spec), 3)
+            self.assertTrue(all(species_id in [species.SPECIES_ID for species in self.SPECIES]
+                                for species_id in result.spec))
+            self.assertEqual(result.criterion is None, battle_mode != BattleMode.OPTIMISE)
+            # The score found is the one of the team, and the search is deterministic
+            _init_worker([opponent.to_spec() for opponent in self.opponents], battle_mode.value, 100)
+            self.assertEqual(score_team((result.spec, result.criterion)), result.score)
+            self.assertEqual(self.__search(battle_mode)[:3], result[:3])
+            trainer = result.to_trainer('Coach')
+            self.assertEqual(trainer.get_team().to_spec(), result.spec)
+
+            # The exhaustive beam is optimal, so no narrower beam or fixed team beats it
+            best = self.__search(battle_mode, beam_width=exhaustive)
+            self.assertEqual(self.__search(battle_mode, beam_width=exhaustive)[:3], best[:3])
+            self.assertLessEqual(self.__search(battle_mode, beam_width=1).score.rank_key(), best.score.rank_key())
+            self.assertLessEqual(result.score.rank_key(), best.score.rank_key())
+            for team in itertools.islice(itertools.combinations(self.SPECIES, 3), 5):
+                spec = tuple(species.SPECIES_ID for species in team)
+                for criterion in ([None] if battle_mode != BattleMode.OPTIMISE else PokeTeam.CRITERION_LIST):
+                    score = score_team((spec, criterion))
+                    self.assertLessEqual(score.rank_key(), best.score.rank_key())
+
+    @number("11.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_parallel_matches_serial(self):
+        serial = self.__search(BattleMode.ROTATE)
+        parallel = self.__search(BattleMode.ROTATE, max_workers=2)
+        self.assertEqual(parallel[:4], serial[:4])
+
+    @number("11.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TeamSearch(self.opponents, BattleMode.SET, beam_width=0)
+
+    @number("11.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_battle_order(self):
+        first, second, third = Pikachu.SPECIES_ID, Bulbasaur.SPECIES_ID, Squirtle.SPECIES_ID
+        # Teams sorted into the same order share their key, in OPTIMISE battles only
+        self.assertEqual(battle_order((first, second), BattleMode.OPTIMISE, "health"),
+                         battle_order((second, first), BattleMode.OPTIMISE, "health"))
+        self.assertNotEqual(battle_order((first, second), BattleMode.SET, None),
+                            battle_order((second, first), BattleMode.SET, None))
+        # Every Pokemon starts at level 1, so the order of the ties decides the battle order
+        _init_worker([opponent.to_spec() for opponent in self.opponents], BattleMode.OPTIMISE.value, 100)
+        for team in itertools.permutations((first, second, third)):
+            order = battle_order(team, BattleMode.OPTIMISE, "level")
+            trainer = Trainer.from_spec(("Coach", team, 0))
+            trainer.get_team().assemble_team(BattleMode.OPTIMISE, "level")
+            self.assertEqual(trainer.get_team().to_spec(), order)
+        self.assertEqual(len({battle_order(team, BattleMode.OPTIMISE, "level")
+                              for team in itertools.permutations((first, second, third))}), 6)
+        search = TeamSearch(self.opponents, BattleMode.OPTIMISE, team_size=3, criteria=["level"],
+                            species=[Pikachu, Bulbasaur, Squirtle], beam_width=27, max_workers=0)
+        search.search()
+        scores = set()
+        for team in itertools.permutations((first, second, third)):
+            score = score_team((team, "level"))
+            self.assertEqual(search.scores[search._canonical(team, "level")], score)
+            scores.add(score)
+        self.assertGreater(len(scores), 1, "Orders of tied teams should fight differently")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from unittest.mock import patch
+from io import StringIO
+import random
+from poke_team import Trainer
+from battle_mode import BattleMode
+from tournament import Tournament, battle_seed, _pair_unmet
+
+class TestTournament(unittest.TestCase):
+    DEFAULT_SEED = 20
+
+    def setUp(self) -> None:
+        random.seed(TestTournament.DEFAULT_SEED)
+        self.trainers = []
+        with patch('sys.stdout', new=StringIO()):
+            for i in range(7):
+                trainer = Trainer(f'Trainer_{i}')
+                trainer.pick_team("Random")
+                self.trainers.append(trainer)
+
+    @number("7.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_round_robin(self):
+        tournament = Tournament(self.trainers, BattleMode.ROTATE, max_workers=0)
+        standings = tournament.round_robin()
+        self.assertEqual(len(tournament.matches), 21)
+        self.assertTrue(all(standing.played == 6 for standing in standings))
+        self.assertEqual(sum(standing.get_points() for standing in standings), 21)
+        points = [standing.get_points() for standing in standings]
+        self.assertEqual(points, sorted(points, reverse=True))
+
+    @number("7.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_swiss(self):
+        tournament = Tournament(self.trainers, BattleMode.SET, max_workers=0)
+        standings = tournament.swiss(3)
+        self.assertEqual(len(tournament.matches), 9)
+        self.assertTrue(all(standing.played == 3 for standing in standings))
+        self.assertEqual(sum(standing.byes for standing in standings), 3)
+        pairs = [frozenset((first, second)) for _, first, second, _, _ in tournament.matches]
+        self.assertEqual(len(set(pairs)), len(pairs), "Swiss rounds should avoid rematches")
+
+    @number("7.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_parallel_matches_serial(self):
+        serial = Tournament(self.trainers, BattleMode.OPTIMISE, seed=5, max_workers=0)
+        serial.round_robin()
+        parallel = Tournament(self.trainers, BattleMode.OPTIMISE, seed=5, max_workers=2)
+        parallel.round_robin()
+        self.assertEqual(parallel.matches, serial.matches)
+        self.assertEqual(parallel.format_standings(), serial.format_standings())
+        self.assertEqual(serial.matches[0][3], battle_seed(5, 0, 0, 1))
+
+    @number("7.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_swiss_byes_run_out(self):
+        # Once every trainer has had a bye, byes keep going to those with the fewest
+        tournament = Tournament(self.trainers[:3], BattleMode.SET, max_workers=0)
+        standings = tournament.swiss(7)
+        byes = [standing.byes for standing in standings]
+        self.assertEqual(sum(byes), 7)
+        self.assertLessEqual(max(byes) - min(byes), 1)
+
+    @number("7.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_pairing_search_limit(self):
+        # Two odd groups of 11 which have met every trainer of the other group: there is
+        # no pairing without a rematch, and proving it takes exponential time
+        ranked = list(range(22))
+        met = {(first, second) for first in ranked for second in ranked if (first - second) % 2}
+        self.assertIsNone(_pair_unmet(ranked, met, 10000))
+        # Pairings without rematches are still found when they exist
+        pairs = _pair_unmet(list(range(100)), met, 10000)
+        self.assertEqual(len(pairs), 50)
+        self.assertFalse(any(pair in met for pair in pairs))
+
+    @number("7.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_round_robin_chunks(self):
+        whole = Tournament(self.trainers, BattleMode.SET, seed=3, max_workers=0)
+        whole.round_robin(legs=2)
+        with patch.object(Tournament, 'CHUNK_SIZE', 4):
+            chunked = Tournament(self.trainers, BattleMode.SET, seed=3, max_workers=0)
+            chunked.round_robin(legs=2)
+            lean = Tournament(self.trainers, BattleMode.SET, seed=3, max_workers=0, keep_matches=False)
+            lean.round_robin(legs=2)
+        self.assertEqual(len(whole.matches), 42)
+        self.assertEqual(chunked.matches, whole.matches)
+        self.assertEqual(chunked.format_standings(), whole.format_standings())
+        # Without its matches a tournament still keeps the standings
+        self.assertEqual(lean.matches, [])
+        self.assertEqual(lean.format_standings(), whole.format_standings())
+        with self.assertRaises(ValueError):
+            lean.swiss(1)
+
+if __name__ == '__main__':
+    unittest.main()
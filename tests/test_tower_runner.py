@@ -0,0 +1,65 @@
+import unittest
+from ed_utils.decorators import number, visibility
+from pokemon import Aerodactyl
+from tower import BattleTower
+from tower_runner import TowerRunner, TowerStats, run_shard
+
+class TestTowerRunner(unittest.TestCase):
+
+    def setUp(self) -> None:
+        BattleTower.MIN_LIVES = 1
+        BattleTower.MAX_LIVES = 3
+
+    @number("16.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_shard_invariance(self):
+        serial = TowerRunner(12, 5, seed=4, shards=1, max_workers=0).run()
+        sharded = TowerRunner(12, 5, seed=4, shards=5, max_workers=0).run()
+        self.assertEqual(serial, sharded)
+        self.assertEqual(serial.towers, 12)
+        self.assertEqual(serial.wins + serial.draws + serial.losses, serial.battles)
+        for counts in (serial.defeated_counts, serial.starting_lives, serial.lives_left):
+            self.assertEqual(sum(counts.values()), 12)
+        self.assertEqual(sum(count * towers for count, towers in serial.defeated_counts.items()),
+                         serial.enemies_defeated)
+        self.assertTrue(all(1 <= lives <= 3 for lives in serial.starting_lives))
+        self.assertTrue(all(0 <= rate <= 1 for rate in serial.species_win_rates().values()))
+        self.assertNotEqual(serial, TowerRunner(12, 5, seed=5, max_workers=0).run())
+
+    @number("16.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_parallel(self):
+        runner = TowerRunner(8, 4, seed=1, max_workers=2)
+        self.assertEqual(runner.run(), TowerRunner(8, 4, seed=1, max_workers=0).run())
+        cached = TowerRunner(8, 4, seed=1, max_workers=0, round_cache_size=256).run()
+        self.assertEqual(cached, runner.run())
+
+    @number("16.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_shards_and_merge(self):
+        runner = TowerRunner(10, 3, seed=2, shards=4)
+        tasks = runner.shard_tasks()
+        self.assertEqual([task[1:3] for task in tasks], [(0, 3), (3, 3), (6, 2), (8, 2)])
+        merged = TowerStats()
+        for task in tasks:
+            merged.merge(run_shard(task))
+        self.assertEqual(merged, TowerRunner(10, 3, seed=2, max_workers=0).run())
+        self.assertEqual(len(TowerRunner(2, 3, shards=8).shard_tasks()), 2)
+        self.assertEqual(TowerRunner(0, 3, max_workers=0).run().towers, 0)
+        with self.assertRaises(ValueError):
+            TowerRunner(-1, 3)
+        with self.assertRaises(ValueError):
+            TowerRunner(3, 3, shards=0)
+
+    @number("16.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_player_spec(self):
+        spec = (Aerodactyl.SPECIES_ID,) * 6
+        stats = TowerRunner(4, 3, player_spec=spec, max_workers=0).run()
+        self.assertEqual(list(stats.species_win_rates()), ["Aerodactyl"])
+        self.assertEqual(stats.species_battles[Aerodactyl.SPECIES_ID], stats.battles)
+        self.assertAlmostEqual(stats.species_win_rates()["Aerodactyl"], stats.win_rate())
+
+
+if __name__ == '__main__':
+    unittest.main()
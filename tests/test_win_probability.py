@@ -0,0 +1,55 @@
+import unittest
+from ed_utils.decorators import number, visibility
+import random
+from poke_team import Trainer
+from pokemon import *
+from battle_mode import BattleMode
+from win_probability import estimate_win_probability, wilson_interval, TEAMS
+
+class TestWinProbability(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.strong = Trainer.from_spec(('Strong', (Aerodactyl.SPECIES_ID,) * 6, 0))
+        self.weak = Trainer.from_spec(('Weak', (Magikarp.SPECIES_ID,) * 6, 0))
+        self.mixed = Trainer.from_spec(('Mixed', tuple(species.SPECIES_ID for species in
+                                        (Pikachu, Bulbasaur, Squirtle, Charmander, Geodude, Abra)), 0))
+
+    @number("10.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_wilson_interval(self):
+        self.assertEqual(wilson_interval(0, 0, 1.96), (0.0, 1.0))
+        lower, upper = wilson_interval(50, 100, 1.96)
+        self.assertAlmostEqual(lower, 0.4038, places=4)
+        self.assertAlmostEqual(upper, 0.5962, places=4)
+        self.assertAlmostEqual(wilson_interval(100, 100, 1.96)[1], 1.0)
+
+    @number("10.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_early_stopping(self):
+        # A one-sided matchup is settled by the first batch
+        estimate = estimate_win_probability(self.strong, self.weak, BattleMode.SET, batch_size=200,
+                                            rng=random.Random(1))
+        self.assertEqual((estimate.probability, estimate.samples, estimate.wins), (1.0, 200, 200))
+        self.assertLessEqual(estimate.upper - estimate.lower, 0.04)
+        self.assertGreater(estimate.samples_per_second, 0)
+        # The trainers are left untouched
+        self.assertEqual(self.strong.to_spec(), ('Strong', (Aerodactyl.SPECIES_ID,) * 6, 0))
+
+    @number("10.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_sampling(self):
+        for battle_mode in BattleMode:
+            first = estimate_win_probability(self.mixed, self.strong, battle_mode, sampling=TEAMS,
+                                             max_samples=300, batch_size=100, rng=random.Random(5))
+            second = estimate_win_probability(self.mixed, self.strong, battle_mode, sampling=TEAMS,
+                                              max_samples=300, batch_size=100, rng=random.Random(5))
+            self.assertEqual(first[:7], second[:7])
+            self.assertEqual(first.wins + first.draws + first.losses, first.samples)
+            self.assertLessEqual(first.samples, 300)
+            self.assertTrue(first.lower <= first.probability <= first.upper)
+        with self.assertRaises(ValueError):
+            estimate_win_probability(self.mixed, self.strong, BattleMode.SET, sampling="species")
+
+
+if __name__ == '__main__':
+    unittest.main()
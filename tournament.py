@@ -0,0 +1,261 @@
+"""
+This module contains Tournament, which plays round-robin or Swiss tournaments between
+trainers, fighting the battles in parallel in a pool of worker processes.
+
+Workers receive compact trainer specs (see Trainer.to_spec), never Trainer objects, and
+every battle is played with its own seed, derived from the tournament seed, so that the
+results do not depend on how the battles are spread over the workers.
+"""
+import os
+import random
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from rng import derive_seed
+from executors import NoExecutor
+from battle import Battle
+from battle_mode import BattleMode
+from poke_team import Trainer
+
+# Winner codes of a match
+DRAW = 0
+FIRST = 1
+SECOND = 2
+
+def battle_seed(seed: int, round_number: int, first: int, second: int) -> int:
+    """
+    Returns the seed of the battle between the trainers at indices first and second in
+    the given round of a tournament with the given seed.
+    """
+    return derive_seed(seed, round_number, first, second)
+
+def play_match(task) -> int:
+    """
+    Plays one battle in a worker. The task is a tuple (seed, spec_1, spec_2, battle mode
+    value, criterion) and the result the winner code: FIRST, SECOND or DRAW.
+    """
+    seed, spec_1, spec_2, battle_mode, criterion = task
+    rng = random.Random(seed)
+    trainer_1 = Trainer.from_spec(spec_1, rng)
+    trainer_2 = Trainer.from_spec(spec_2, rng)
+    battle = Battle(trainer_1, trainer_2, BattleMode(battle_mode), criterion)
+    battle._create_teams()
+    winner = battle.commence_battle()
+    if winner is None:
+        return DRAW
+    return FIRST if winner is trainer_1 else SECOND
+
+class Standing:
+    """
+    The record of one trainer in a tournament. A win is worth 1 point and a draw 0.5.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.played = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.byes = 0
+
+    def get_points(self) -> float:
+        return self.wins + 0.5 * self.draws
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.get_points()} points ({self.wins}W {self.draws}D {self.losses}L)"
+
+class Tournament:
+    """
+    A tournament between a pool of trainers. The trainers' teams are captured as specs
+    when the tournament is created, and every battle is fought between new Pokemon of
+    those species, i.e. at full health.
+    """
+    # The steps the search for a Swiss round without rematches may take (see _pair_unmet)
+    PAIRING_SEARCH_STEPS = 10000
+    # The number of battles of a round handed to the workers at a time
+    CHUNK_SIZE = 10000
+
+    def __init__(self, trainers, battle_mode: BattleMode, criterion: str = "health",
+                 seed: int = 0, max_workers: int = None, keep_matches: bool = True) -> None:
+        """
+        Parameters:
+            trainers: The trainers taking part, with their teams picked.
+            battle_mode (BattleMode): The mode of every battle.
+            criterion (str): The criterion of OPTIMISE battles.
+            seed (int): The seed every battle seed is derived from.
+            max_workers (int): The number of worker processes, as many as CPUs if None.
+                With 0 the battles are played in this process.
+            keep_matches (bool): Whether to keep every match played in matches. Without
+                them only the standings are kept, and Swiss rounds cannot be paired.
+        """
+        self.specs = [trainer.to_spec() for trainer in trainers]
+        self.battle_mode = battle_mode
+        self.criterion = criterion
+        self.seed = seed
+        self.max_workers = max_workers
+        self.keep_matches = keep_matches
+        self.table = [Standing(spec[0]) for spec in self.specs]
+        # (round, first index, second index, battle seed, winner code) of every match played,
+        # if keep_matches
+        self.matches = []
+        self.rounds_played = 0
+
+    def round_robin(self, legs: int = 1) -> list:
+        """
+        Plays every trainer against every other one, legs times, swapping sides on every
+        other leg, and returns the standings. The pairings are generated, and the battles
+        played, CHUNK_SIZE at a time.
+        """
+        with self._executor() as executor:
+            self._play_round(executor, self._round_robin_pairings(legs))
+        return self.standings()
+
+    def swiss(self, rounds: int) -> list:
+        """
+        Plays the given number of Swiss rounds and returns the standings. Every round pairs
+        trainers with equal (or the closest) scores who have not met yet; with an odd
+        number of trainers the lowest ranked trainer with the fewest byes gets one, worth
+        a win.
+
+        Raises:
+            ValueError: If the tournament does not keep its matches.
+        """
+        if not self.keep_matches:
+            raise ValueError("Swiss rounds need the matches played, see keep_matches.")
+        with self._executor() as executor:
+            for _ in range(rounds):
+                self._play_round(executor, self._swiss_pairings())
+        return self.standings()
+
+    def standings(self) -> list:
+        """
+        Returns the Standing of every trainer, best first: by points, then wins, then
+        the order the trainers were given in.
+        """
+        return [self.table[index] for index in self._ranking()]
+
+    def format_standings(self) -> str:
+        """
+        Returns the standings as a text table.
+        """
+        lines = [f"{'#':>4} {'Trainer':<20} {'P':>4} {'W':>4} {'D':>4} {'L':>4} {'Pts':>6}"]
+        for rank, standing in enumerate(self.standings(), start=1):
+            lines.append(f"{rank:>4} {standing.name:<20} {standing.played:>4} {standing.wins:>4} "
+                         f"{standing.draws:>4} {standing.losses:>4} {standing.get_points():>6}")
+        return '\n'.join(lines)
+
+    def _ranking(self) -> list:
+        """
+        Returns the indices of the trainers in the order of the standings.
+        """
+        return sorted(range(len(self.table)),
+                      key=lambda index: (-self.table[index].get_points(), -self.table[index].wins, index))
+
+    def _round_robin_pairings(self, legs: int):
+        """
+        Yields the pairings of a round robin, see round_robin.
+        """
+        for leg in range(legs):
+            for first in range(len(self.specs)):
+                for second in range(first + 1, len(self.specs)):
+                    yield (second, first) if leg % 2 else (first, second)
+
+    def _swiss_pairings(self) -> list:
+        """
+        Pairs the trainers for the next Swiss round, awarding a bye if needed.
+        """
+        ranked = self._ranking()
+        if len(ranked) % 2:
+            # The lowest ranked trainer among those with the fewest byes
+            index = min(reversed(ranked), key=lambda index: self.table[index].byes)
+            ranked.remove(index)
+            self.table[index].byes += 1
+            self.table[index].wins += 1
+            self.table[index].played += 1
+        met = set()
+        for _, first, second, _, _ in self.matches:
+            met.add((first, second))
+            met.add((second, first))
+        pairings = _pair_unmet(ranked, met, self.PAIRING_SEARCH_STEPS)
+        if pairings is None:
+            # Everyone cannot avoid a rematch (or the search gave up): pair by rank,
+            # avoiding rematches where possible
+            pairings = []
+            while ranked:
+                first = ranked.pop(0)
+                opponent = next((index for index in ranked if (first, index) not in met), ranked[0])
+                ranked.remove(opponent)
+                pairings.append((first, opponent))
+        return pairings
+
+    def _play_round(self, executor, pairings) -> None:
+        """
+        Plays the battles of one round (an iterable of pairings), in parallel, CHUNK_SIZE
+        at a time, and records their results as they arrive.
+        """
+        round_number = self.rounds_played
+        pairings = iter(pairings)
+        workers = self.max_workers or os.cpu_count() or 1
+        while True:
+            chunk = list(islice(pairings, self.CHUNK_SIZE))
+            if not chunk:
+                break
+            seeds = [battle_seed(self.seed, round_number, first, second) for first, second in chunk]
+            tasks = [(seed, self.specs[first], self.specs[second], self.battle_mode.value, self.criterion)
+                     for seed, (first, second) in zip(seeds, chunk)]
+            if executor is None:
+                results = map(play_match, tasks)
+            else:
+                results = executor.map(play_match, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+            for (first, second), seed, result in zip(chunk, seeds, results):
+                if self.keep_matches:
+                    self.matches.append((round_number, first, second, seed, result))
+                self._record(first, second, result)
+        self.rounds_played += 1
+
+    def _record(self, first: int, second: int, result: int) -> None:
+        """
+        Updates the standings of both trainers of a match.
+        """
+        for index in (first, second):
+            self.table[index].played += 1
+        if result == DRAW:
+            self.table[first].draws += 1
+            self.table[second].draws += 1
+        else:
+            winner, loser = (first, second) if result == FIRST else (second, first)
+            self.table[winner].wins += 1
+            self.table[loser].losses += 1
+
+    def _executor(self):
+        """
+        Returns the process pool to play the battles in, or a context holding None to
+        play them in this process.
+        """
+        if self.max_workers == 0:
+            return NoExecutor()
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+def _pair_unmet(ranked: list, met: set, max_steps: int = 10000):
+    """
+    Pairs the trainers in ranked (best first) so that no pair has met yet, matching every
+    trainer with the best ranked opponent that still lets the others be paired. Returns
+    None if there is no such pairing, or if none is found within max_steps steps of the
+    search: proving there is none can take exponential time (e.g. in late Swiss rounds).
+    """
+    # Depth-first search; each entry is the trainers left to pair, the pairs so far and
+    # the position of the next opponent to try for the first trainer left
+    stack = [(ranked, [], 1)]
+    steps = 0
+    while stack and steps < max_steps:
+        steps += 1
+        remaining, pairs, position = stack.pop()
+        if not remaining:
+            return pairs
+        first = remaining[0]
+        while position < len(remaining) and (first, remaining[position]) in met:
+            position += 1
+        if position == len(remaining):
+            continue
+        stack.append((remaining, pairs, position + 1))
+        rest = remaining[1:position] + remaining[position + 1:]
+        stack.append((rest, pairs + [(first, remaining[position])], 1))
+    return None
@@ -1,52 +1,147 @@
 from poke_team import Trainer, PokeTeam
 from enum import Enum
 from data_structures.stack_adt import ArrayStack
-from data_structures.queue_adt import CircularQueue
+from data_structures.queue_adt import ResizableCircularQueue
 from data_structures.array_sorted_list import ArraySortedList
 from data_structures.sorted_list_adt import ListItem
-from typing import Tuple, List
+from typing import Tuple, List, NamedTuple
 from battle_mode import BattleMode
 from battle import Battle
+from round_cache import RoundCache
+from team_columns import TeamColumns
+from array import array
+from atomic_file import atomic_write
 import random
+import struct
+import sys
 
 class BattleResult(Enum):
     WIN = 1
     LOSS = 2
     DRAW = 3
 
+class TowerRecord(NamedTuple):
+    """
+    The compact record of a tower battle yielded by BattleTower.run: the number of the
+    battle in the tower (from 1), its result for the player, the name of the enemy and
+    the lives both trainers have left after it.
+    """
+    battle_number: int
+    result: BattleResult
+    enemy: str
+    player_lives: int
+    enemy_lives: int
+
+class Enemy:
+    """
+    An enemy of the tower together with the lives it has left. Until it first fights,
+    an enemy is only kept as its name and team spec (see PokeTeam.to_spec), and its
+    Trainer is created from them by get_trainer.
+    """
+    __slots__ = ('name', 'lives', 'spec', 'trainer')
+
+    # Time complexity: O(1), sets up attributes
+    def __init__(self, name: str, lives: int, spec: tuple = None, trainer: Trainer = None) -> None:
+        self.name = name
+        self.lives = lives
+        self.spec = spec
+        self.trainer = trainer
+
+    # Time complexity: O(1), or O(n) the first time, where n is the size of the team
+    def get_trainer(self, rng=None) -> Trainer:
+        if self.trainer is None:
+            self.trainer = Trainer.from_spec((self.name, self.spec, 0), rng)
+            self.spec = None
+        return self.trainer
+
+class EnemyRoster:
+    """
+    The enemies of a tower, in the order they fight, in a queue that grows as enemies
+    are added so the roster has no size limit.
+    """
+    # Time complexity: O(1), initializes the queue
+    def __init__(self) -> None:
+        self.queue = ResizableCircularQueue()
+
+    # Time complexity: O(1) amortised, the queue doubles when full
+    def append(self, enemy: Enemy) -> None:
+        self.queue.append(enemy)
+
+    # Time complexity: O(1), serves the front of the queue
+    def serve(self) -> Enemy:
+        return self.queue.serve()
+
+    # Time complexity: O(1), the length is stored by the queue
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    # Time complexity: O(1), the length is stored by the queue
+    def is_empty(self) -> bool:
+        return self.queue.is_empty()
+
+    # Time complexity: O(n), visiting every enemy once
+    def __iter__(self):
+        # Yield the enemies in the order they will fight
+        array = self.queue.array
+        for i in range(len(self.queue)):
+            yield array[(self.queue.front + i) % len(array)]
+
 class BattleTower:
     MIN_LIVES = 1
     MAX_LIVES = 3
 
+    CHECKPOINT_MAGIC = b'PKTW'
+    CHECKPOINT_VERSION = 1
+    # <magic, version, player lives, enemies defeated, battles fought, number of enemies,
+    #  number of built trainers, player set, gauss_next set, gauss_next>
+    CHECKPOINT_HEADER = struct.Struct('<4sHiIQIIBBd')
+    # <pokedex, team structure (the BattleMode using it), criterion index, team count>
+    TRAINER_ROW = struct.Struct('<QBBH')
+    # Number of words in the state of random.Random (the Mersenne Twister and its index)
+    RNG_STATE_SIZE = 625
+
     # Time complexity: O(1), sets up attributes and initializes data structures
-    def __init__(self) -> None:
+    def __init__(self, rng=None, round_cache: RoundCache = None) -> None:
+        # Random source of the tower and its enemies: a random.Random, or the global random module by default
+        self.rng = random if rng is None else rng
+        # Optional cache of round outcomes shared by every battle of the tower
+        self.round_cache = round_cache
         self.my_trainer = None
-        self.enemy_trainers = CircularQueue(10)  
-        self.enemy_lives = ArrayStack(10)
+        # Every enemy with its lives, in fighting order
+        self.enemy_trainers = EnemyRoster()
         self.my_lives = 0
         self.enemies_defeated_count = 0
+        self.battles_fought = 0
 
     # Time complexity: O(1), sets the player's trainer and initializes the player's lives
     def set_my_trainer(self, trainer: Trainer) -> None:
         self.my_trainer = trainer
-        self.my_lives = random.randint(BattleTower.MIN_LIVES, BattleTower.MAX_LIVES)
+        self.my_lives = self.rng.randint(BattleTower.MIN_LIVES, BattleTower.MAX_LIVES)
 
     # Time complexity: O(n), where n is the number of teams to generate
     def generate_enemy_trainers(self, num_teams: int) -> None:
+        # Teams are drawn as picking a random team would, but only kept as specs until they fight
+        drawer = PokeTeam(self.rng)
         for _ in range(num_teams):
-            enemy_trainer = Trainer(f"Enemy_{_ + 1}")
-            enemy_trainer.pick_team("Random")
-            self.enemy_trainers.append(enemy_trainer)
-            self.enemy_lives.push(random.randint(BattleTower.MIN_LIVES, BattleTower.MAX_LIVES))
+            spec = drawer.random_spec()
+            lives = self.rng.randint(BattleTower.MIN_LIVES, BattleTower.MAX_LIVES)
+            self.enemy_trainers.append(Enemy(f"Enemy_{_ + 1}", lives, spec))
+
+    # Time complexity: O(1) amortised, adds the enemy at the back of the roster
+    def add_enemy_trainer(self, trainer: Trainer, lives: int = None) -> None:
+        # Add a given enemy, e.g. one of TeamEvolution.to_trainers, with random lives by default
+        if lives is None:
+            lives = self.rng.randint(BattleTower.MIN_LIVES, BattleTower.MAX_LIVES)
+        self.enemy_trainers.append(Enemy(trainer.get_name(), lives, trainer=trainer))
 
     # Time complexity: O(1), checks if there are battles remaining
     def battles_remaining(self) -> bool:
-        return not self.my_lives == 0 and not self.enemy_lives.is_empty()
+        return not self.my_lives == 0 and not self.enemy_trainers.is_empty()
 
     # Time complexity: O(n)
     def simulate_battle(self, player: Trainer, enemy: Trainer) -> Tuple[BattleResult, int, int]:
         # Initialize the battle with ROTATE mode
-        battle = Battle(player, enemy, BattleMode.ROTATE, criterion=None)
+        battle = Battle(player, enemy, BattleMode.ROTATE, criterion=None, round_cache=self.round_cache)
 
         # Commence the battle and capture the winner
         winner = battle.commence_battle()
@@ -69,48 +164,263 @@ class BattleTower:
         # Return the outcome, along with lives lost for both player and enemy
         return battle_result, player_lives_lost, enemy_lives_lost
 
-    # Time complexity: O(1), returns the next battle result
-    # Worst case time complexity: O(m + 2n), where m is the number of enemy trainers and n is the size of the team
+    # Time complexity: O(n), where n is the size of the team
     def next_battle(self) -> Tuple[BattleResult, Trainer, Trainer, int, int]:
-        if self.enemy_trainers.is_empty():
-            # Re-queue trainers that still have lives.
-            for _ in range(self.enemy_lives.length()):
-                lives = self.enemy_lives.pop()
-                if lives > 0:
-                    trainer = self.enemy_trainers.serve()  # Assuming serve() also dequeues.
-                    self.enemy_trainers.append(trainer)
-                    self.enemy_lives.push(lives)
-
-        if self.enemy_trainers.is_empty():
+        battle_result, enemy_trainer, enemy_lives = self._fight_next()
+        if enemy_trainer is None:
             # No more enemies to fight.
             return BattleResult.DRAW, self.my_trainer, None, self.my_lives, 0
 
-        enemy_trainer = self.enemy_trainers.serve()
-        enemy_lives = self.enemy_lives.pop()
+        # Log the battle result.
+        print(f"Battle result: {battle_result}. Player lives: {self.my_lives}. Enemy lives: {enemy_lives}.")
+
+        return battle_result, self.my_trainer, enemy_trainer, self.my_lives, enemy_lives
+
+    # Time complexity: O(b) per battle, where b is the cost of a battle (see next_battle); O(batch_size) memory
+    def run(self, batch_size: int = None, checkpoint: str = None, checkpoint_every: int = 1000):
+        """
+        Fights the remaining battles of the tower lazily, without printing, and yields a
+        TowerRecord for each one, or lists of up to batch_size records if batch_size is
+        given. A battle is only fought when its record is asked for, so the consumer
+        (e.g. ratings.tower_records or a file writer) can stop the run at any time.
+
+        If checkpoint is given, the tower is saved to that file (see save_checkpoint)
+        once at least checkpoint_every battles have been fought since the last save, and
+        once more when the run ends. A save only ever happens after the consumer has
+        received the records of every battle fought, i.e. when it asks for the next
+        record or batch, so a tower resumed from the checkpoint never skips a record
+        (it may repeat those received since the save).
+        """
+        if batch_size is not None and batch_size <= 0:
+            raise ValueError("The batch size must be positive.")
+        if checkpoint_every <= 0:
+            raise ValueError("The checkpoint interval must be positive.")
+        saved_at = self.battles_fought
+        batch = []
+        while self.battles_remaining():
+            battle_result, enemy_trainer, enemy_lives = self._fight_next()
+            if enemy_trainer is None:
+                break
+            record = TowerRecord(self.battles_fought, battle_result, enemy_trainer.get_name(),
+                                 self.my_lives, enemy_lives)
+            if batch_size is None:
+                yield record
+            else:
+                batch.append(record)
+                if len(batch) < batch_size:
+                    continue
+                yield batch
+                batch = []
+            # Every record so far has been received
+            if checkpoint is not None and self.battles_fought - saved_at >= checkpoint_every:
+                self.save_checkpoint(checkpoint)
+                saved_at = self.battles_fought
+        if batch:
+            yield batch
+        if checkpoint is not None:
+            self.save_checkpoint(checkpoint)
+
+    # Time complexity: O(n), where n is the size of the team
+    def _fight_next(self) -> Tuple[BattleResult, Trainer, int]:
+        """
+        Fights the next battle of the tower and returns its result, the enemy and the
+        lives it has left, or (DRAW, None, 0) if there is no enemy left to fight.
+        """
+        if self.enemy_trainers.is_empty():
+            return BattleResult.DRAW, None, 0
+
+        enemy = self.enemy_trainers.serve()
+        enemy_trainer = enemy.get_trainer(self.rng)
 
         # Regenerate both teams before the battle.
-        self.my_trainer.get_team().regenerate_team()
-        enemy_trainer.get_team().regenerate_team()
+        self.my_trainer.get_team().regenerate_team(BattleMode.ROTATE)
+        enemy_trainer.get_team().regenerate_team(BattleMode.ROTATE)
 
         # Simulate the battle.
         battle_result, player_lives_lost, enemy_lives_lost = self.simulate_battle(self.my_trainer, enemy_trainer)
+        self.battles_fought += 1
 
         # Update lives based on the outcome.
         self.my_lives -= player_lives_lost
-        enemy_lives -= enemy_lives_lost
-
-        # Log the battle result.
-        print(f"Battle result: {battle_result}. Player lives: {self.my_lives}. Enemy lives: {enemy_lives}.")
+        enemy.lives -= enemy_lives_lost
 
-        # If the enemy still has lives, put them back in the queue.
-        if enemy_lives > 0:
-            self.enemy_trainers.append(enemy_trainer)
-            self.enemy_lives.push(enemy_lives)
+        # If the enemy still has lives, put it back at the end of the queue.
+        if enemy.lives > 0:
+            self.enemy_trainers.append(enemy)
         else:
             self.enemies_defeated_count += 1
 
-        return battle_result, self.my_trainer, enemy_trainer, self.my_lives, enemy_lives
+        return battle_result, enemy_trainer, enemy.lives
+
+    # Time complexity: O(p + e), where p is the number of Pokemon of the built trainers and e the number of enemies
+    def save_checkpoint(self, filename: str) -> None:
+        """
+        Saves the state of the tower (see to_bytes) to a binary file, atomically.
+        """
+        with atomic_write(filename, 'wb') as file:
+            file.write(self.to_bytes())
+
+    # Time complexity: O(p + e), see save_checkpoint
+    @classmethod
+    def load_checkpoint(cls, filename: str, rng=None, round_cache: RoundCache = None) -> 'BattleTower':
+        """
+        Resumes a tower from a file saved by save_checkpoint; see from_bytes.
+        """
+        with open(filename, 'rb') as file:
+            return cls.from_bytes(file.read(), rng, round_cache)
+
+    # Time complexity: O(p + e), see save_checkpoint
+    def to_bytes(self) -> bytes:
+        """
+        Returns the state of the tower: its counters, the state of its random generator,
+        the player and every enemy, with its lives, in fighting order. The player and the
+        enemies that have fought are kept with the full state of their Pokemon (see
+        TeamColumns) and pokedex; the other enemies only by their team spec.
+
+        Layout: CHECKPOINT_HEADER, the generator's state (624 + 1 uint32), the trainer
+        names (uint16 length and UTF-8 bytes each, player first), a TRAINER_ROW and the
+        TeamColumns of every built trainer, then the enemy columns: lives (uint32), built
+        flag (uint8), and, for the enemies not built, spec lengths (uint8) and species
+        IDs (uint16), all little-endian.
+        """
+        rng_version, internal, gauss = self.rng.getstate()
+        if rng_version != 3 or len(internal) != self.RNG_STATE_SIZE:
+            raise ValueError("Unsupported random generator state.")
+        enemies = list(self.enemy_trainers)
+        trainers = [] if self.my_trainer is None else [self.my_trainer]
+        trainers += [enemy.trainer for enemy in enemies if enemy.trainer is not None]
+        names = [] if self.my_trainer is None else [self.my_trainer.get_name()]
+        names += [enemy.name for enemy in enemies]
+
+        teams = TeamColumns()
+        trainer_rows = []
+        for trainer in trainers:
+            team = trainer.get_team()
+            teams.add_team(team)
+            trainer_rows.append(self.TRAINER_ROW.pack(trainer.pokedex.elems, _team_structure(team).value,
+                                                      PokeTeam.CRITERION_LIST.index(team.criterion),
+                                                      team.team_count))
+        species = array('H')
+        for enemy in enemies:
+            if enemy.trainer is None:
+                species.extend(enemy.spec)
+
+        chunks = [self.CHECKPOINT_HEADER.pack(self.CHECKPOINT_MAGIC, self.CHECKPOINT_VERSION, self.my_lives,
+                                              self.enemies_defeated_count, self.battles_fought, len(enemies),
+                                              len(trainers), self.my_trainer is not None, gauss is not None,
+                                              0.0 if gauss is None else gauss),
+                  _column_bytes(array('I', internal))]
+        for name in names:
+            encoded = name.encode('utf-8')
+            chunks.append(struct.pack('<H', len(encoded)) + encoded)
+        chunks += trainer_rows
+        chunks.append(teams.to_bytes())
+        chunks.append(_column_bytes(array('I', (enemy.lives for enemy in enemies))))
+        chunks.append(_column_bytes(array('B', (enemy.trainer is not None for enemy in enemies))))
+        chunks.append(_column_bytes(array('B', (len(enemy.spec) for enemy in enemies if enemy.trainer is None))))
+        chunks.append(_column_bytes(species))
+        return b''.join(chunks)
+
+    # Time complexity: O(p + e), see save_checkpoint
+    @classmethod
+    def from_bytes(cls, data, rng=None, round_cache: RoundCache = None) -> 'BattleTower':
+        """
+        Rebuilds a tower saved by to_bytes, which then fights exactly the battles the
+        saved tower would have. The saved random state is loaded into rng, a new
+        random.Random if None.
+
+        Raises:
+            ValueError: If data is not a tower checkpoint of this version.
+        """
+        if len(data) < cls.CHECKPOINT_HEADER.size:
+            raise ValueError("Not a tower checkpoint.")
+        magic, version, my_lives, defeated, battles, enemy_count, trainer_count, has_player, has_gauss, gauss = \
+            cls.CHECKPOINT_HEADER.unpack_from(data)
+        if magic != cls.CHECKPOINT_MAGIC or version != cls.CHECKPOINT_VERSION:
+            raise ValueError("Not a tower checkpoint of this version.")
+        offset = cls.CHECKPOINT_HEADER.size
+        internal, offset = _read_column('I', data, offset, cls.RNG_STATE_SIZE)
+        names = []
+        for _ in range(has_player + enemy_count):
+            if len(data) < offset + 2:
+                raise ValueError("Truncated tower checkpoint.")
+            (length,) = struct.unpack_from('<H', data, offset)
+            names.append(bytes(data[offset + 2:offset + 2 + length]).decode('utf-8'))
+            offset += 2 + length
+        if len(data) < offset + trainer_count * cls.TRAINER_ROW.size:
+            raise ValueError("Truncated tower checkpoint.")
+        trainer_rows = [cls.TRAINER_ROW.unpack_from(data, offset + i * cls.TRAINER_ROW.size)
+                        for i in range(trainer_count)]
+        offset += trainer_count * cls.TRAINER_ROW.size
+        teams, offset = TeamColumns.from_bytes(data, offset)
+        lives, offset = _read_column('I', data, offset, enemy_count)
+        built, offset = _read_column('B', data, offset, enemy_count)
+        spec_lengths, offset = _read_column('B', data, offset, enemy_count - sum(built))
+        species, offset = _read_column('H', data, offset, sum(spec_lengths))
+        if offset != len(data) or teams.team_count() != trainer_count:
+            raise ValueError("Invalid tower checkpoint.")
+
+        tower = cls(random.Random() if rng is None else rng, round_cache)
+        tower.rng.setstate((3, tuple(internal), gauss if has_gauss else None))
+        tower.my_lives = my_lives
+        tower.enemies_defeated_count = defeated
+        tower.battles_fought = battles
+
+        def build(index: int, name: str) -> Trainer:
+            pokedex, structure, criterion, team_count = trainer_rows[index]
+            trainer = Trainer(name, tower.rng)
+            trainer.team = teams.to_team(index, BattleMode(structure), PokeTeam.CRITERION_LIST[criterion])
+            trainer.team.rng = tower.rng
+            trainer.team.criterion = PokeTeam.CRITERION_LIST[criterion]
+            trainer.team.team_count = team_count
+            trainer.set_pokedex(pokedex)
+            return trainer
+
+        if has_player:
+            tower.my_trainer = build(0, names[0])
+        trainer_index = has_player
+        position = 0
+        specs = iter(spec_lengths)
+        for name, enemy_lives, enemy_built in zip(names[has_player:], lives, built):
+            if enemy_built:
+                tower.enemy_trainers.append(Enemy(name, enemy_lives, trainer=build(trainer_index, name)))
+                trainer_index += 1
+            else:
+                length = next(specs)
+                tower.enemy_trainers.append(Enemy(name, enemy_lives, tuple(species[position:position + length])))
+                position += length
+        return tower
 
     # Time complexity: O(1), returns the number of enemies defeated
     def enemies_defeated(self) -> int:
-        return self.enemies_defeated_count
\ No newline at end of file
+        return self.enemies_defeated_count
+
+
+# Time complexity: O(1), checks the type of the team structure
+def _team_structure(team: PokeTeam) -> BattleMode:
+    # The battle mode whose structure the team is in: a stack, a queue or a sorted list
+    if isinstance(team.team, ArrayStack):
+        return BattleMode.SET
+    if isinstance(team.team, ArraySortedList):
+        return BattleMode.OPTIMISE
+    return BattleMode.ROTATE
+
+# Time complexity: O(n), where n is the length of the column
+def _column_bytes(values: array) -> bytes:
+    # The raw little-endian contents of an array
+    if sys.byteorder == 'big' and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+# Time complexity: O(n), where n is the number of values read
+def _read_column(typecode: str, data, offset: int, count: int):
+    # Reads count little-endian values of a type from data at offset; returns them and the offset past them
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    if len(data) < end:
+        raise ValueError("Truncated tower checkpoint.")
+    values.frombytes(bytes(data[offset:end]))
+    if sys.byteorder == 'big' and values.itemsize > 1:
+        values.byteswap()
+    return values, end
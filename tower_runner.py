@@ -0,0 +1,216 @@
+"""
+This module contains TowerRunner, which runs many independent BattleTowers, one per
+player, spread over a pool of worker processes, and merges their statistics.
+
+The towers are split into shards of consecutive towers and every worker runs a whole
+shard. Each tower draws from its own random generator, derived from the runner seed
+and the tower's index (see rng.spawn_rng), so the merged statistics do not depend on
+the number of shards or workers. A shard only sends back its TowerStats, never the
+towers or their trainers.
+"""
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from executors import NoExecutor
+from poke_team import PokeTeam, Trainer
+from pokemon_base import SpeciesRegistry
+from rng import spawn_rng
+from round_cache import RoundCache
+from tower import BattleTower, BattleResult
+
+class TowerStats:
+    """
+    Aggregate statistics of any number of tower runs, which can be merged.
+
+    Attributes:
+        towers (int): The number of towers run.
+        battles (int): The number of battles fought.
+        wins, draws, losses (int): The results of the battles, for the players.
+        enemies_defeated (int): The number of enemies defeated over all towers.
+        defeated_counts (Counter): The number of towers by number of enemies defeated.
+        starting_lives (Counter): The number of towers by the player's starting lives.
+        lives_left (Counter): The number of towers by the lives the player had left at
+            the end, 0 if the player ran out of lives before the enemies did.
+        species_battles, species_wins (Counter): The number of battles fought and won
+            by the players whose team started with a species, by species ID; a species
+            appearing several times in a team counts once.
+    """
+    def __init__(self) -> None:
+        self.towers = 0
+        self.battles = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.enemies_defeated = 0
+        self.defeated_counts = Counter()
+        self.starting_lives = Counter()
+        self.lives_left = Counter()
+        self.species_battles = Counter()
+        self.species_wins = Counter()
+
+    def add_tower(self, tower: BattleTower, spec: tuple) -> None:
+        """
+        Runs a tower whose player and enemies are set to its end and adds its
+        statistics; spec is the starting team spec of the player.
+
+        Time Complexity: O(b * s), where b is the number of battles fought and s the
+            number of species in the player's team, plus the cost of the battles
+        """
+        species = set(spec)
+        self.starting_lives[tower.my_lives] += 1
+        wins = battles = 0
+        for record in tower.run():
+            battles += 1
+            if record.result == BattleResult.WIN:
+                wins += 1
+            elif record.result == BattleResult.DRAW:
+                self.draws += 1
+            else:
+                self.losses += 1
+        self.towers += 1
+        self.battles += battles
+        self.wins += wins
+        self.enemies_defeated += tower.enemies_defeated()
+        self.defeated_counts[tower.enemies_defeated()] += 1
+        self.lives_left[tower.my_lives] += 1
+        for species_id in species:
+            self.species_battles[species_id] += battles
+            self.species_wins[species_id] += wins
+
+    def merge(self, other: 'TowerStats') -> 'TowerStats':
+        """
+        Adds the statistics of other to these ones and returns them.
+        """
+        for name in ('towers', 'battles', 'wins', 'draws', 'losses', 'enemies_defeated'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for name in ('defeated_counts', 'starting_lives', 'lives_left', 'species_battles', 'species_wins'):
+            getattr(self, name).update(getattr(other, name))
+        return self
+
+    def win_rate(self) -> float:
+        """
+        Returns the fraction of battles won by the players, 0 if none was fought.
+        """
+        return self.wins / self.battles if self.battles else 0.0
+
+    def mean_enemies_defeated(self) -> float:
+        """
+        Returns the mean number of enemies defeated per tower, 0 if none was run.
+        """
+        return self.enemies_defeated / self.towers if self.towers else 0.0
+
+    def species_win_rates(self) -> dict:
+        """
+        Returns the win rate of the players by species of their starting team, by
+        species name, from best to worst.
+        """
+        rates = [(SpeciesRegistry.get_by_id(species_id).__name__, self.species_wins[species_id] / battles)
+                 for species_id, battles in self.species_battles.items() if battles]
+        rates.sort(key=lambda rate: (-rate[1], rate[0]))
+        return dict(rates)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TowerStats) and vars(self) == vars(other)
+
+    def __str__(self) -> str:
+        return (f"{self.towers} towers, {self.battles} battles ({self.wins}W {self.draws}D {self.losses}L), "
+                f"{self.mean_enemies_defeated():.2f} enemies defeated per tower")
+
+def run_shard(task) -> TowerStats:
+    """
+    Runs the towers of a shard in a worker. The task is a tuple (seed, first tower
+    index, number of towers, enemies per tower, player team spec or None for random
+    teams, round cache size or 0 for none).
+    """
+    seed, first, count, enemies, player_spec, round_cache_size = task
+    round_cache = RoundCache(round_cache_size) if round_cache_size else None
+    stats = TowerStats()
+    for index in range(first, first + count):
+        rng = spawn_rng(seed, index)
+        tower = BattleTower(rng, round_cache)
+        spec = PokeTeam(rng).random_spec() if player_spec is None else player_spec
+        tower.set_my_trainer(Trainer.from_spec((f"Player_{index + 1}", spec, 0), rng))
+        tower.generate_enemy_trainers(enemies)
+        stats.add_tower(tower, spec)
+    return stats
+
+class TowerRunner:
+    """
+    Runs a number of player towers with the same number of enemies each, in shards over
+    a pool of worker processes; see the module.
+    """
+    def __init__(self, towers: int, enemies: int, seed: int = 0, player_spec: tuple = None,
+                 shards: int = None, max_workers: int = None, round_cache_size: int = 0) -> None:
+        """
+        Parameters:
+            towers (int): The number of towers, i.e. of players.
+            enemies (int): The number of enemies of every tower.
+            seed (int): The seed every tower's random generator is derived from.
+            player_spec (tuple): The team spec of every player, a random team per
+                player if None.
+            shards (int): The number of shards, four per worker if None.
+            max_workers (int): The number of worker processes, as many as CPUs if None.
+                With 0 the towers are run in this process.
+            round_cache_size (int): The size of the RoundCache of every shard, none is
+                used if 0.
+
+        Raises:
+            ValueError: If a count is negative or shards is not positive.
+        """
+        if towers < 0 or enemies < 0 or (shards is not None and shards <= 0):
+            raise ValueError("Invalid number of towers, enemies or shards.")
+        self.towers = towers
+        self.enemies = enemies
+        self.seed = seed
+        self.player_spec = None if player_spec is None else tuple(player_spec)
+        self.shards = shards
+        self.max_workers = max_workers
+        self.round_cache_size = round_cache_size
+
+    def shard_tasks(self) -> list:
+        """
+        Returns the tasks of run_shard, splitting the towers into shards of consecutive
+        towers whose sizes differ by at most one.
+        """
+        shards = self.shards
+        if shards is None:
+            shards = 4 * (self.max_workers or os.cpu_count() or 1)
+        shards = max(1, min(shards, self.towers))
+        tasks = []
+        first = 0
+        for shard in range(shards):
+            count = self.towers // shards + (shard < self.towers % shards)
+            tasks.append((self.seed, first, count, self.enemies, self.player_spec, self.round_cache_size))
+            first += count
+        return tasks
+
+    def run(self) -> TowerStats:
+        """
+        Runs every tower and returns the merged statistics.
+        """
+        stats = TowerStats()
+        tasks = self.shard_tasks()
+        with self._executor() as executor:
+            results = map(run_shard, tasks) if executor is None else executor.map(run_shard, tasks)
+            for shard_stats in results:
+                stats.merge(shard_stats)
+        return stats
+
+    def _executor(self):
+        """
+        Returns the process pool to run the shards in, or a context holding None to run
+        them in this process.
+        """
+        if self.max_workers == 0:
+            return NoExecutor()
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+if __name__ == '__main__':
+    towers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    enemies = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    stats = TowerRunner(towers, enemies).run()
+    print(stats)
+    print("Lives left:", dict(sorted(stats.lives_left.items())))
+    for name, rate in list(stats.species_win_rates().items())[:10]:
+        print(f"{name:<12} {rate:.3f}")
@@ -0,0 +1,113 @@
+"""
+This module estimates the probability that one trainer beats another by Monte Carlo
+simulation: battles are sampled in batches, fought with BatchBattle, and sampling stops
+as soon as the Wilson confidence interval of the win rate is narrow enough.
+"""
+import random
+import time
+from math import sqrt
+from statistics import NormalDist
+from typing import NamedTuple
+from batch_battle import BatchBattle, DRAW
+from battle_mode import BattleMode
+from poke_team import PokeTeam, Trainer
+
+# What is randomised from one sample to the next
+ORDERINGS = "orderings"
+TEAMS = "teams"
+
+class WinEstimate(NamedTuple):
+    """
+    The estimated probability that the first trainer wins (draws are not wins), its
+    confidence interval, the tally of the samples and the sampling throughput.
+    """
+    probability: float
+    lower: float
+    upper: float
+    wins: int
+    draws: int
+    losses: int
+    samples: int
+    seconds: float
+    samples_per_second: float
+
+def wilson_interval(successes: int, samples: int, z: float):
+    """
+    Returns the Wilson score interval (lower, upper) of a binomial proportion, (0, 1)
+    without samples.
+    """
+    if samples == 0:
+        return 0.0, 1.0
+    proportion = successes / samples
+    denominator = 1 + z * z / samples
+    centre = (proportion + z * z / (2 * samples)) / denominator
+    margin = z * sqrt(proportion * (1 - proportion) / samples + z * z / (4 * samples * samples)) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+def estimate_win_probability(trainer_1: Trainer, trainer_2: Trainer, battle_mode: BattleMode,
+                             criterion: str = "health", sampling: str = ORDERINGS,
+                             confidence: float = 0.95, margin: float = 0.02, batch_size: int = 256,
+                             min_samples: int = None, max_samples: int = 100000, rng=None) -> WinEstimate:
+    """
+    Estimates the probability that trainer_1 beats trainer_2.
+
+    Every sample is a battle between new Pokemon, starting from the trainers' current
+    pokedexes. With ORDERINGS sampling each trainer keeps the species of its team, in a
+    random order; with TEAMS sampling each trainer gets a new random team, drawn as
+    PokeTeam.choose_randomly does. The trainers themselves are left untouched.
+
+    Parameters:
+        trainer_1, trainer_2 (Trainer): The trainers, with their teams picked.
+        battle_mode (BattleMode): The mode of every battle.
+        criterion (str): The criterion of OPTIMISE battles.
+        sampling (str): ORDERINGS or TEAMS.
+        confidence (float): The confidence level of the interval.
+        margin (float): Sampling stops once the interval is at most 2 * margin wide.
+        batch_size (int): The number of battles fought at once.
+        min_samples (int): The number of samples taken in any case, batch_size if None.
+        max_samples (int): The number of samples after which sampling stops regardless.
+        rng: The random source, a random.Random or the global random module if None.
+
+    Returns:
+        WinEstimate: The estimate.
+
+    Raises:
+        ValueError: If sampling, confidence, margin or batch_size is invalid.
+    """
+    if sampling not in (ORDERINGS, TEAMS):
+        raise ValueError(f"Sampling must be '{ORDERINGS}' or '{TEAMS}'.")
+    if not 0 < confidence < 1 or margin <= 0 or batch_size <= 0:
+        raise ValueError("Invalid confidence, margin or batch size.")
+    rng = random if rng is None else rng
+    min_samples = batch_size if min_samples is None else min_samples
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    specs = (trainer_1.to_spec(), trainer_2.to_spec())
+    drawer = PokeTeam(rng)
+    wins = draws = samples = 0
+    lower, upper = 0.0, 1.0
+    start = time.perf_counter()
+    while samples < max_samples:
+        pairs = []
+        for _ in range(min(batch_size, max_samples - samples)):
+            pair = []
+            for name, team_spec, pokedex in specs:
+                if sampling == TEAMS:
+                    team_spec = drawer.random_spec()
+                else:
+                    team_spec = list(team_spec)
+                    rng.shuffle(team_spec)
+                pair.append(Trainer.from_spec((name, team_spec, pokedex), rng))
+            pairs.append(pair)
+        for result in BatchBattle.from_trainers(pairs, battle_mode, criterion).run():
+            if result == 1:
+                wins += 1
+            elif result == DRAW:
+                draws += 1
+        samples += len(pairs)
+        lower, upper = wilson_interval(wins, samples, z)
+        if samples >= min_samples and upper - lower <= 2 * margin:
+            break
+    seconds = time.perf_counter() - start
+    return WinEstimate(wins / samples if samples else 0.0, lower, upper, wins, draws,
+                       samples - wins - draws, samples, seconds,
+                       samples / seconds if seconds > 0 else float('inf'))